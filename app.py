@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import os
 import pyttsx3
 import speech_recognition as sr
@@ -7,8 +7,6 @@ import datetime
 import subprocess
 import playsound
 from gtts import gTTS
-import requests
-from bs4 import BeautifulSoup
 import difflib
 import json
 import time
@@ -19,26 +17,68 @@ import face_recognition
 import numpy as np
 from PIL import Image
 import random
+from jobs import JobManager, JobQueueFull
+from dialog import DialogEngine, COMMAND_TEMPLATES, get_best_command_match, no_report
+from tts_stream import speak_pipelined
+import barge_in
+import audio_out
+from audio_arbiter import (AudioArbiter, AudioBusy, AudioTimeout,
+                           PRIORITY_INTERACTIVE, PRIORITY_RESPONSE, PRIORITY_NOTIFICATION,
+                           PRIORITY_BACKGROUND)
+import wake_word
+import audio_preprocess
+import _thread
+from runtime import Runtime
+import server
+import argparse
+import metrics
+import journal
+import frame_source
+import face_profiles
+import face_vote
+from frame_prep import FramePrep
+import inference_pool
 
 # Initialize face recognition variables
 known_faces = {}  # Dictionary to store known faces and their names
 current_user = None  # Currently recognized user
 
-# Command templates for better matching
-COMMAND_TEMPLATES = {
-    "open_file": ["open file", "open the file", "open document", "open a file"],
-    "search_file": ["search in file", "search file", "find in file", "search for in file"],
-    "calculator": ["open calculator", "launch calculator", "start calculator", "calculator"],
-    "notepad": ["open notepad", "launch notepad", "start notepad", "notepad"],
-    "chrome": ["open chrome", "launch chrome", "start chrome", "chrome"],
-    "google_search": ["search google for", "google search", "search for", "search", "find"],
-    "youtube_search": ["search youtube for", "youtube search", "find on youtube", "youtube"],
-    "time": ["what is the time", "current time", "time now", "tell me the time"],
-    "exit": ["exit", "stop", "quit", "goodbye", "bye"]
-}
-
-def speak(text):
+# Owns the microphone and speaker; every speak/listen goes through it
+audio = AudioArbiter()
+metrics.gauge("assistant_audio_queue_depth", "Requests waiting for the audio device").set_function(
+    lambda: audio.stats()["queue_depth"])
+
+def speak(text, priority=PRIORITY_RESPONSE):
+    """Speak the given text once the audio device is free.
+
+    Returns True if the user interrupted by talking over it.
+    """
+    try:
+        with metrics.timed("assistant_speak_seconds", "Time from speak() to the end of playback"):
+            interrupted = audio.run(_speak, text, priority=priority)
+    except (AudioBusy, AudioTimeout) as e:
+        print(f"Skipping speech ({str(e)}): {text}")
+        metrics.counter("assistant_speech_skipped_total", "Speech dropped because the audio device was busy").inc()
+        return False
+    if interrupted:
+        metrics.counter("assistant_speech_interrupted_total", "Speech cut short by the user talking").inc()
+    return interrupted
+
+def listen(priority=PRIORITY_INTERACTIVE, calibrate=True):
+    """Listen for voice input once the audio device is free"""
+    try:
+        # The journal turn lives on this thread; hand it to the audio worker
+        return audio.run(_listen, calibrate, journal.current(), priority=priority)
+    except (AudioBusy, AudioTimeout) as e:
+        print(f"Skipping listening: {str(e)}")
+        return ""
+
+FIRST_AUDIO_HELP = "Time from starting to speak to the first audible audio"
+
+def _speak(text):
     """Speak the given text using pyttsx3 with female voice"""
+    interrupted = threading.Event()
+    start = time.perf_counter()
     try:
         engine = pyttsx3.init()
         voices = engine.getProperty('voices')
@@ -59,51 +99,110 @@ def speak(text):
         engine.setProperty('rate', 150)    # Speed of speech
         engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
         
-        engine.say(text)
-        engine.runAndWait()
+        # Stop speaking as soon as the user starts talking
+        with barge_in.watch(engine.stop) as watch:
+            token = engine.connect('started-word', lambda name, location, length:
+                                   watch.triggered.is_set() and engine.stop())
+            started = engine.connect('started-utterance', lambda name: metrics.histogram(
+                "assistant_speak_first_audio_seconds", FIRST_AUDIO_HELP).observe(
+                    time.perf_counter() - start, engine="pyttsx3"))
+            try:
+                engine.say(text)
+                engine.runAndWait()
+            finally:
+                engine.disconnect(token)
+                engine.disconnect(started)
+        return watch.triggered.is_set()
     except Exception as e:
         print(f"Error in speech synthesis: {str(e)}")
-        # Fallback to gTTS if pyttsx3 fails
+        # Fallback to gTTS if pyttsx3 fails; sentences are downloaded one
+        # ahead of playback so long responses start playing straight away
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                tts = gTTS(text=text, lang='en')
-                tts.save(fp.name)
-                playsound.playsound(fp.name)
-                os.unlink(fp.name)
+            with barge_in.watch(interrupted.set):
+                _speak_gtts(text, interrupted)
         except Exception as e2:
             print(f"Error in fallback speech synthesis: {str(e2)}")
+        return interrupted.is_set()
+
+def _speak_gtts(text, interrupted):
+    """Play gTTS speech from memory, or through temp files if that isn't available"""
+    if audio_out.available():
+        engine = "gtts_memory"
+        stats = speak_pipelined(text, audio_out.synthesize_pcm,
+                                lambda pcm: audio_out.player.play(pcm, cancel=interrupted),
+                                cancel=interrupted)
+    else:
+        engine = "gtts_files"
+        stats = speak_pipelined(text, _synthesize_gtts, playsound.playsound,
+                                cleanup=os.unlink, cancel=interrupted)
+    if stats["time_to_first_audio"] is not None:
+        metrics.histogram("assistant_speak_first_audio_seconds", FIRST_AUDIO_HELP).observe(
+            stats["time_to_first_audio"], engine=engine)
 
-def listen():
+def _synthesize_gtts(text):
+    """Synthesize one chunk with gTTS and return the path of the MP3"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
+        gTTS(text=text, lang='en').write_to_fp(fp)
+    return fp.name
+
+# Kept between calls so a barge-in can skip recalibration
+recognizer = sr.Recognizer()
+# Opens the audio source for listening; replay.py swaps in recorded audio
+microphone_factory = sr.Microphone
+
+LISTEN_HELP = "Time spent in each listening stage"
+listen_errors = metrics.counter("assistant_listen_errors_total", "Failed listening attempts by reason")
+
+def _listen(calibrate=True, turn=None):
     """Listen for voice input with improved error handling"""
-    recognizer = sr.Recognizer()
     text = ""
     error_count = 0
     max_retries = 3
 
     while not text and error_count < max_retries:
         try:
-            with sr.Microphone() as source:
-                print("Adjusting for ambient noise...")
-                recognizer.adjust_for_ambient_noise(source, duration=1.0)  # Increased from 0.5 to 1.0
+            with microphone_factory() as source:
+                if calibrate:
+                    print("Adjusting for ambient noise...")
+                    recognizer.adjust_for_ambient_noise(source, duration=1.0)  # Increased from 0.5 to 1.0
                 print("Listening...")
                 try:
-                    audio = recognizer.listen(source, timeout=15, phrase_time_limit=20)  # Increased timeouts
+                    with metrics.timed("assistant_listen_seconds", LISTEN_HELP, stage="capture"):
+                        audio = barge_in.listen(recognizer, source, timeout=15, phrase_time_limit=20)  # Increased timeouts
+                    if turn:
+                        turn.mark("captured")
                     print("Processing speech...")
                     try:
-                        text = recognizer.recognize_google(audio).lower()
+                        # Trimmed 16 kHz mono audio uploads faster
+                        preprocessed = audio_preprocess.next_mode()
+                        with metrics.timed("assistant_listen_seconds", LISTEN_HELP, stage="preprocess"):
+                            audio = audio_preprocess.preprocess(audio, enabled=preprocessed)
+                        if audio is None:
+                            raise sr.UnknownValueError()
+                        start = time.perf_counter()
+                        text, nbest = journal.recognize(recognizer, audio)
+                        elapsed = time.perf_counter() - start
+                        metrics.histogram("assistant_listen_seconds", LISTEN_HELP).observe(elapsed, stage="recognize")
+                        audio_preprocess.log_recognition(elapsed, preprocessed)
+                        if turn:
+                            turn.mark("recognized")
+                            turn.heard(text, nbest)
                         print(f"Recognized: {text}")
                     except sr.UnknownValueError:
+                        listen_errors.inc(reason="unknown_value")
                         error_count += 1
                         if error_count < max_retries:
                             speak("I didn't catch that. Please try again.")
                         continue
                     except sr.RequestError as e:
                         print(f"Could not request results; {e}")
+                        listen_errors.inc(reason="request_error")
                         error_count += 1
                         if error_count < max_retries:
                             speak("There was an error with the speech recognition service.")
                         continue
                 except sr.WaitTimeoutError:
+                    listen_errors.inc(reason="timeout")
                     error_count += 1
                     if error_count < max_retries:
                         speak("Listening timeout. Please try again.")
@@ -118,197 +217,197 @@ def listen():
 
     return text if text else ""
 
-def get_best_command_match(user_input):
-    """Find the best matching command template with improved matching"""
-    best_match = None
-    highest_ratio = 0
-    
-    for command_type, templates in COMMAND_TEMPLATES.items():
-        for template in templates:
-            # Try exact match first
-            if template in user_input:
-                return command_type
-            
-            # If no exact match, try fuzzy matching
-            ratio = difflib.SequenceMatcher(None, user_input, template).ratio()
-            if ratio > highest_ratio and ratio > 0.6:  # Increased threshold for better accuracy
-                highest_ratio = ratio
-                best_match = command_type
-    
-    return best_match
+dialog_engine = DialogEngine(get_best_command_match)
 
-def process_command(command):
-    """Process voice commands with improved error handling"""
+def process_command(command, report=no_report):
+    """Process voice commands, asking for missing details out loud
+
+    report(stage, **data) is called with progress updates for job clients.
+    """
     if not command:
         return "I didn't hear anything. Please try again."
 
-    best_match = get_best_command_match(command)
-    
     try:
-        if best_match == "open_file":
-            speak("Please say the file name.")
-            file_name = listen()
-            if file_name:
-                file_path = os.path.join(os.path.expanduser("~"), "Documents", f"{file_name}.txt")
-                if os.path.exists(file_path):
-                    os.startfile(file_path)
-                    return f"Opening {file_name}"
-                return "File not found."
-            return "I couldn't understand the file name."
-        
-        elif best_match == "search_file":
-            speak("Say the file name.")
-            file_name = listen()
-            if file_name:
-                file_path = os.path.join(os.path.expanduser("~"), "Documents", f"{file_name}.txt")
-                if not os.path.exists(file_path):
-                    return "File not found."
-                
-                speak("Say the word to search.")
-                keyword = listen()
-                if keyword:
-                    with open(file_path, "r", encoding="utf-8") as file:
-                        content = file.read().lower()
-                        words = content.split()
-                        keyword_parts = keyword.lower().split()
-                        matches = []
-                        
-                        for i in range(len(words)):
-                            if all(kw in ' '.join(words[i:i+len(keyword_parts)]).lower() for kw in keyword_parts):
-                                matches.append(' '.join(words[i:i+len(keyword_parts)]))
-                        
-                        if matches:
-                            return f"Found matches: {', '.join(matches[:3])}"
-                    return f"No matches found for '{keyword}'"
-                return "I couldn't understand the search keyword."
-            return "I couldn't understand the file name."
-        
-        elif best_match == "calculator":
-            subprocess.Popen("calc")
-            return "Opening Calculator."
-        
-        elif best_match == "notepad":
-            subprocess.Popen("notepad")
-            return "Opening Notepad."
-        
-        elif best_match == "chrome":
-            subprocess.Popen("start chrome", shell=True)
-            return "Opening Google Chrome."
-        
-        elif best_match == "google_search":
-            query = command.replace("search google for", "").strip()
-            if not query:
-                speak("What would you like to search for?")
-                query = listen()
-                if not query:
-                    return "I couldn't understand your search query."
-            
-            webbrowser.open(f"https://www.google.com/search?q={query}")
-            return f"Searching Google for {query}"
-        
-        elif best_match == "youtube_search":
-            query = command.replace("search youtube for", "").strip()
-            if not query:
-                speak("What would you like to search for on YouTube?")
-                query = listen()
-                if not query:
-                    return "I couldn't understand your search query."
-            
-            webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
-            return f"Searching YouTube for {query}"
-        
-        elif best_match == "time":
-            return f"The time is {datetime.datetime.now().strftime('%H:%M')}"
-        
-        elif best_match == "exit":
-            return "Goodbye!"
-        
-        return "I didn't understand. Please try again."
-    
+        reply = dialog_engine.start(command, report)
+        while reply.need_slot:
+            speak(reply.response, priority=PRIORITY_INTERACTIVE)
+            reply = dialog_engine.answer(reply.session_id, listen(), report)
+        return reply.response
     except Exception as e:
         print(f"Error processing command: {str(e)}")
         return f"An error occurred: {str(e)}"
 
+SCAN_DEADLINE = 5.0  # Seconds to look for the user at startup
+SCAN_ATTEMPTS = 2    # Inconclusive scans are retried before giving up
+
 def initialize_face_recognition():
     """Initialize face recognition by capturing and encoding the user's face"""
     global known_faces, current_user
     
     print("Initializing face recognition...")
-    speak("Let me take a look at you to recognize you.")
+    speak("Let me take a look at you to recognize you.", priority=PRIORITY_NOTIFICATION)
     
-    cap = cv2.VideoCapture(0)
+    cap = frame_source.open_source()
     if not cap.isOpened():
         print("Error: Could not open camera")
         speak("I'm having trouble accessing the camera. Please make sure it's connected and try again.")
         return False
     
-    face_found = False
-    frame_count = 0
-    max_attempts = 30  # Try for 30 frames before giving up
+    try:
+        return _scan_for_user(cap, SCAN_DEADLINE)
+    finally:
+        # Released even if startup is interrupted mid-scan
+        cap.release()
+
+def _scan_for_user(cap, deadline):
+    """Decide who is in front of the camera within deadline seconds, enrolling a new face"""
+    global current_user
+    seen = {}
+    prep = FramePrep()
     
-    while not face_found and frame_count < max_attempts:
-        ret, frame = cap.read()
-        if not ret:
-            frame_count += 1
-            continue
+    def encode_frame(frame):
+        pool = inference_pool.get_pool(inference_pool.encode_faces, frame.shape)
+        if pool:
+            # Workers find the faces; each result carries its frame for enrolling
+            seen["pool"] = pool
+            pool.submit(frame, tag=frame, block=not cap.live)
+            finished = pool.results()
+            if not finished:
+                return None
+            for result in finished:
+                if result.value:
+                    seen["frame"] = result.tag
+            return [encoding for result in finished for encoding in result.value]
         
-        # Find faces in the frame
-        face_locations = face_recognition.face_locations(frame)
-        if face_locations:
-            # Get face encoding
-            face_encodings = face_recognition.face_encodings(frame, face_locations)
-            if face_encodings:
-                # Check if this face matches any known faces
-                for name, known_encoding in known_faces.items():
-                    matches = face_recognition.compare_faces([known_encoding], face_encodings[0])
-                    if matches[0]:
-                        current_user = name
-                        speak(f"Welcome back, {name}!")
-                        face_found = True
-                        break
-                
-                if not face_found:
-                    # New face detected
-                    speak("I don't recognize you. What's your name?")
-                    name = listen()
-                    if name:
-                        name = name.capitalize()
-                        # Save the face encoding and name
-                        known_faces[name] = face_encodings[0]
-                        current_user = name
-                        
-                        # Save the face image
-                        if not os.path.exists("known_faces"):
-                            os.makedirs("known_faces")
-                        cv2.imwrite(f"known_faces/{name}.jpg", frame)
-                        
-                        speak(f"Nice to meet you, {name}! I'll remember your face.")
-                        face_found = True
-                    else:
-                        speak("I'll call you User then!")
-                        name = "User"
-                        known_faces[name] = face_encodings[0]
-                        current_user = name
-                        face_found = True
-        
-        frame_count += 1
-        time.sleep(0.1)  # Add small delay to prevent CPU overuse
+        # BGR -> RGB once per frame, shared by detection and encoding
+        prep.load(frame)
+        face_locations = face_profiles.detect(prep)
+        if not face_locations:
+            return []
+        seen["frame"] = frame
+        return face_profiles.encode(prep, face_locations)
     
-    cap.release()
-    return face_found
-
-def continuous_listen():
-    """Continuously listen for commands"""
-    while True:
-        command = listen()
-        if command:
-            response = process_command(command)
-            speak(response)
-            if response == "Goodbye!":
+    names = list(known_faces)
+    for attempt in range(SCAN_ATTEMPTS):
+        try:
+            decision = face_vote.recognize(cap, [known_faces[name] for name in names], names,
+                                           encode_frame, deadline)
+        finally:
+            if "pool" in seen:
+                # Don't leave this scan's frames for the next one
+                seen["pool"].discard()
+        if not decision.timed_out or decision.encoding is None:
+            break
+        print("Face scan inconclusive, looking again")
+    
+    if decision.name:
+        current_user = decision.name
+        speak(f"Welcome back, {decision.name}!", priority=PRIORITY_NOTIFICATION)
+        return True
+    if decision.encoding is None:
+        # Nobody in view before the deadline
+        return False
+    if decision.timed_out:
+        # Faces seen but never clearly new (or clearly anyone): don't enrol a known user again under another name
+        current_user = "User"
+        speak("I couldn't get a clear look at you, so I'll call you User for now.",
+              priority=PRIORITY_NOTIFICATION)
+        return True
+    
+    # New face detected
+    speak("I don't recognize you. What's your name?", priority=PRIORITY_INTERACTIVE)
+    name = listen()
+    if name:
+        name = name.capitalize()
+        # Save the face encoding and name
+        known_faces[name] = decision.encoding
+        current_user = name
+        
+        # Save the face image
+        if not os.path.exists("known_faces"):
+            os.makedirs("known_faces")
+        cv2.imwrite(f"known_faces/{name}.jpg", seen["frame"])
+        
+        speak(f"Nice to meet you, {name}! I'll remember your face.")
+    else:
+        speak("I'll call you User then!")
+        name = "User"
+        known_faces[name] = decision.encoding
+        current_user = name
+    return True
+
+WAKE_BUSY_BACKOFF = 0.2  # Seconds to wait before retrying the wake word gate when audio is busy
+
+def wait_for_wake_word(gate, runtime):
+    """Wait for the wake word in short slices so other audio requests can interleave
+
+    Returns False if the runtime shut down first.
+    """
+    while not runtime.stopping:
+        try:
+            if audio.run(gate.wait, 1.0, priority=PRIORITY_BACKGROUND):
+                return True
+        except (AudioBusy, AudioTimeout):
+            # Something else has the audio; the gate keeps buffering the microphone meanwhile
+            runtime.sleep(WAKE_BUSY_BACKOFF)
+    return False
+
+def _calibrate():
+    """Measure the room's noise level once, before anyone is talking"""
+    with microphone_factory() as source:
+        print("Adjusting for ambient noise...")
+        recognizer.adjust_for_ambient_noise(source, duration=1.0)
+
+def continuous_listen(runtime):
+    """Continuously listen for commands until the runtime shuts down"""
+    interrupted = False
+    wake_gate = wake_word.load_gate()
+    if wake_gate:
+        runtime.on_shutdown(wake_gate.close)
+        # The command follows the wake word straight away, so there's no time to calibrate per turn
+        try:
+            audio.run(_calibrate, priority=PRIORITY_BACKGROUND)
+        except Exception as e:
+            print(f"Could not calibrate the microphone: {str(e)}")
+    while not runtime.stopping:
+        # Only wake the cloud recognizer after the wake word
+        if wake_gate and not interrupted:
+            if not wait_for_wake_word(wake_gate, runtime):
                 break
-        time.sleep(0.1)  # Small delay to prevent CPU overuse
+        # After a barge-in or the wake word the user is already talking, so skip calibration
+        turn = journal.begin(source="voice", barge_in=interrupted)
+        command = listen(calibrate=not interrupted and not wake_gate)
+        interrupted = False
+        if not command:
+            journal.finish(turn)
+            continue
+        response = process_command(command)
+        turn.mark("handled")
+        interrupted = speak(response)
+        turn.mark("spoken")
+        journal.finish(turn, result=response, interrupted=interrupted)
+        if response == "Goodbye!":
+            runtime.request_shutdown("goodbye")
+
+def run_text_job(command, session_id, answer, report):
+    """Job body for /process: run one text-mode dialog step.
+
+    Never speaks or listens; a missing slot comes back as a need_slot reply
+    that the client answers with its next request.
+    """
+    turn = journal.begin(source="web", session_id=session_id,
+                         transcript=answer if session_id else command)
+    if session_id:
+        reply = dialog_engine.answer(session_id, answer, report)
+    else:
+        reply = dialog_engine.start(command, report)
+    turn.mark("handled")
+    journal.finish(turn, result=reply.response, need_slot=reply.need_slot)
+    report("result", response=reply.response, need_slot=reply.need_slot)
+    return reply._asdict()
 
 app = Flask(__name__)
+jobs = JobManager()
 
 @app.route('/')
 def index():
@@ -316,17 +415,100 @@ def index():
 
 @app.route('/process', methods=['POST'])
 def process():
+    """Queue a command (or a slot answer) and return its job id straight away
+
+    Send {"command": ...} to start a turn, or {"session_id": ..., "answer": ...}
+    to answer the need_slot prompt of a previous result.
+    """
     try:
         data = request.get_json()
         command = data.get("command", "").lower()
-        if command:
-            response = process_command(command)
-            return jsonify({"response": response, "success": True})
-        return jsonify({"response": "No command received", "success": False})
+        session_id = data.get("session_id")
+        if not command and not session_id:
+            return jsonify({"response": "No command received", "success": False}), 400
+        job_id = jobs.submit(run_text_job, command, session_id, data.get("answer", ""))
+        return jsonify({"job_id": job_id,
+                        "status_url": f"/jobs/{job_id}",
+                        "events_url": f"/jobs/{job_id}/events",
+                        "success": True}), 202
+    except JobQueueFull:
+        return jsonify({"response": "The assistant is busy. Please try again.", "success": False}), 503
     except Exception as e:
-        return jsonify({"response": f"Error: {str(e)}", "success": False})
+        return jsonify({"response": f"Error: {str(e)}", "success": False}), 500
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Poll a job's status, stage updates and final result"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"response": "Unknown job", "success": False}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events stream of a job's stage updates"""
+    if jobs.get(job_id) is None:
+        return jsonify({"response": "Unknown job", "success": False}), 404
+
+    def generate():
+        for kind, payload in jobs.stream(job_id):
+            if kind == "event":
+                yield f"event: {payload['stage']}\ndata: {json.dumps(payload)}\n\n"
+            elif kind == "heartbeat":
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: end\ndata: {json.dumps(payload)}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache"})
+
+@app.route('/audio/stats')
+def audio_stats():
+    """Audio device contention: queue depth and wait times"""
+    return jsonify(audio.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Stage timings and counters in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def load_known_faces():
+    """Load saved faces so the gallery is ready before any worker is forked"""
+    if not os.path.exists("known_faces"):
+        return
+    for image_file in os.listdir("known_faces"):
+        if image_file.endswith((".jpg", ".jpeg", ".png")):
+            image = face_recognition.load_image_file(os.path.join("known_faces", image_file))
+            encodings = face_profiles.encode(image, role="enroll")
+            if encodings:
+                known_faces[os.path.splitext(image_file)[0]] = encodings[0]
+    print(f"Loaded {len(known_faces)} known faces")
+
+def release_devices():
+    """Close the audio streams on shutdown (the camera is released after each use)"""
+    audio_out.player.close()
+    audio.stop(timeout=2.0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Friday voice assistant web app")
+    parser.add_argument("--prod", action="store_true",
+                        help="serve without the debugger and reloader")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=server.worker_count, default=1,
+                        help="forked worker processes (POSIX only, with --prod); jobs and dialog "
+                             "sessions live in the worker that created them, so put more than "
+                             "one behind sticky routing")
+    parser.add_argument("--no-threads", action="store_true",
+                        help="handle one request at a time in each worker")
+    args = parser.parse_args()
+
+    # With the debug reloader this process only watches files and restarts a
+    # child that serves; initialise the camera and audio only in that child
+    if not args.prod and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        app.run(debug=True, host=args.host, port=args.port)
+        return
 
-if __name__ == '__main__':
     # Check if PyAudio is installed
     try:
         import pyaudio
@@ -336,20 +518,45 @@ if __name__ == '__main__':
         print("On Windows, you may need to install it using: pip install pipwin")
         print("Then: pipwin install pyaudio")
     
+    # Gallery and dlib models are loaded once, before serving
+    load_known_faces()
+    
     # First initialize face recognition
-    if initialize_face_recognition():
-        # After recognizing the user, introduce the assistant
-        time.sleep(1)  # Small pause for natural conversation
-        speak(f"Hello {current_user}! I am Friday, your personal AI assistant. "
-              "I can help you with various tasks like opening applications, "
-              "searching the web, and much more. How can I assist you today?")
-        
-        # Start continuous listening in a separate thread
-        listen_thread = threading.Thread(target=continuous_listen)
-        listen_thread.daemon = True
-        listen_thread.start()
+    if not initialize_face_recognition():
+        speak("I'm having trouble with face recognition. Please make sure your camera is working properly.")
+        return
+    
+    # After recognizing the user, introduce the assistant
+    time.sleep(1)  # Small pause for natural conversation
+    speak(f"Hello {current_user}! I am Friday, your personal AI assistant. "
+          "I can help you with various tasks like opening applications, "
+          "searching the web, and much more. How can I assist you today?",
+          priority=PRIORITY_NOTIFICATION)
+    
+    # Continuous listening runs in a separate thread; saying goodbye stops
+    # the web server too
+    runtime = Runtime()
+    if args.prod:
+        runtime.on_shutdown(server.stop)
+        server.serve(app, host=args.host, port=args.port, workers=args.workers,
+                     threaded=not args.no_threads,
+                     on_ready=lambda: runtime.spawn("voice", continuous_listen, runtime),
+                     on_shutdown=lambda: runtime.request_shutdown("server stopped"))
+    else:
+        server_running = threading.Event()
+        runtime.on_shutdown(lambda: server_running.is_set() and _thread.interrupt_main())
+        runtime.spawn("voice", continuous_listen, runtime)
         
         # Start the Flask app
-        app.run(debug=True)
-    else:
-        speak("I'm having trouble with face recognition. Please make sure your camera is working properly.")
+        server_running.set()
+        try:
+            app.run(debug=True, host=args.host, port=args.port)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server_running.clear()
+    runtime.shutdown()
+    release_devices()
+
+if __name__ == '__main__':
+    main()
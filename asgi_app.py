@@ -0,0 +1,237 @@
+"""ASGI server mode: remote clients stream microphone audio over a WebSocket.
+
+Run with:  hypercorn asgi_app:app --bind 0.0.0.0:8000
+      or:  python asgi_app.py
+
+Protocol on /ws (one utterance at a time, any number of sessions):
+  client -> {"type": "start", "sample_rate": 16000, "sample_width": 2, "partials": false}  (optional)
+  client -> binary frames of mono little-endian PCM
+  client -> {"type": "end"}                    (end of utterance)
+  client -> {"type": "text", "command": "..."} (skip recognition)
+  server -> {"type": "partial", "text": ...} after each new second of audio, if asked for
+  server -> {"type": "final", "text": ...}
+  server -> {"type": "result", "response": ..., "intent": ..., "need_slot": ..., "session_id": ...}
+  server -> {"type": "audio_start", "format": "mp3"}, binary MP3 chunks, {"type": "audio_end"}
+
+When a result has need_slot set, the next utterance answers that slot.
+Partial transcripts cost a recognition call each, so they are off unless the
+client asks. Each partial is a transcript of the utterance so far (its last
+MAX_PARTIAL_WINDOW seconds once it gets long), so it replaces the previous
+partial rather than adding to it; the final transcript replaces them all.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from gtts import gTTS
+
+import audio_preprocess
+from dialog import DialogEngine, get_best_command_match
+
+DEFAULT_SAMPLE_RATE = 16000
+DEFAULT_SAMPLE_WIDTH = 2
+PARTIAL_INTERVAL = 1.0    # Seconds of new audio between partial transcripts
+MAX_PARTIAL_WINDOW = 10.0  # Seconds of the utterance, at most, sent for each partial
+SAMPLE_RATES = (8000, 48000)    # Accepted client sample rate range
+SAMPLE_WIDTHS = (1, 2, 4)       # Accepted bytes per sample
+MAX_UTTERANCE = 30.0      # Seconds of audio kept per utterance
+BLOCKING_WORKERS = 8      # Threads for recognition and synthesis calls
+
+app = FastAPI(title="Friday")
+dialog_engine = DialogEngine(get_best_command_match)
+blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="asgi-io")
+
+
+def recognize(pcm, sample_rate, sample_width):
+    """Blocking Google recognition of raw PCM; returns "" if nothing was understood"""
+    audio = audio_preprocess.preprocess(sr.AudioData(bytes(pcm), sample_rate, sample_width))
+    if audio is None:
+        return ""
+    try:
+        return sr.Recognizer().recognize_google(audio).lower()
+    except sr.UnknownValueError:
+        return ""
+
+
+def synthesize_chunks(text):
+    """Blocking gTTS synthesis, yielding MP3 chunks as they are produced"""
+    return gTTS(text=text, lang='en').stream()
+
+
+async def run_blocking(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_pool, fn, *args)
+
+
+class Session:
+    """State for one connected client"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.sample_width = DEFAULT_SAMPLE_WIDTH
+        self.pcm = bytearray()
+        self.partials = False
+        self.partial_at = 0
+        self.partial_task = None
+        self.dialog_session = None
+
+    @property
+    def bytes_per_second(self):
+        return self.sample_rate * self.sample_width
+
+    def add_audio(self, chunk):
+        limit = int(MAX_UTTERANCE * self.bytes_per_second)
+        self.pcm.extend(chunk)
+        if len(self.pcm) > limit:
+            dropped = len(self.pcm) - limit
+            del self.pcm[:dropped]
+            self.partial_at = max(0, self.partial_at - dropped)
+        if not self.partials:
+            return
+        # Only one partial recognition in flight per session, over the utterance so far
+        due = len(self.pcm) - self.partial_at >= PARTIAL_INTERVAL * self.bytes_per_second
+        if due and (self.partial_task is None or self.partial_task.done()):
+            start = max(0, len(self.pcm) - int(MAX_PARTIAL_WINDOW * self.bytes_per_second))
+            window = bytes(self.pcm[start:])
+            self.partial_at = len(self.pcm)
+            self.partial_task = asyncio.ensure_future(self.send_partial(window))
+
+    def configure(self, data):
+        """Apply a "start" message; returns an error message if a value is unusable"""
+        try:
+            sample_rate = int(data.get("sample_rate", DEFAULT_SAMPLE_RATE))
+            sample_width = int(data.get("sample_width", DEFAULT_SAMPLE_WIDTH))
+        except (TypeError, ValueError):
+            return "sample_rate and sample_width must be integers"
+        if not SAMPLE_RATES[0] <= sample_rate <= SAMPLE_RATES[1]:
+            return f"sample_rate must be between {SAMPLE_RATES[0]} and {SAMPLE_RATES[1]}"
+        if sample_width not in SAMPLE_WIDTHS:
+            return f"sample_width must be one of {SAMPLE_WIDTHS}"
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.partials = bool(data.get("partials", False))
+        return None
+
+    async def send_partial(self, pcm):
+        try:
+            text = await run_blocking(recognize, pcm, self.sample_rate, self.sample_width)
+            if text:
+                await self.websocket.send_json({"type": "partial", "text": text})
+        except Exception as e:
+            print(f"Error in partial recognition: {str(e)}")
+
+    async def finish_utterance(self):
+        pcm = bytes(self.pcm)
+        self.pcm.clear()
+        self.partial_at = 0
+        if self.partial_task is not None:
+            self.partial_task.cancel()
+            self.partial_task = None
+        if not pcm:
+            return
+        try:
+            text = await run_blocking(recognize, pcm, self.sample_rate, self.sample_width)
+        except sr.UnknownValueError:
+            text = ""
+        except Exception as e:
+            await self.websocket.send_json({"type": "error", "message": f"Recognition failed: {str(e)}"})
+            return
+        await self.websocket.send_json({"type": "final", "text": text})
+        await self.handle_text(text)
+
+    async def handle_text(self, text):
+        if self.dialog_session:
+            reply = await run_blocking(dialog_engine.answer, self.dialog_session, text)
+        elif text:
+            reply = await run_blocking(dialog_engine.start, text)
+        else:
+            reply = None
+        if reply is None:
+            response = {"response": "I didn't hear anything. Please try again.",
+                        "intent": None, "need_slot": None, "session_id": None}
+        else:
+            self.dialog_session = reply.session_id
+            response = reply._asdict()
+        await self.websocket.send_json(dict(response, type="result"))
+        await self.send_speech(response["response"])
+
+    async def send_speech(self, text):
+        """Forward each synthesized chunk to the client as soon as it exists"""
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+
+        def produce():
+            try:
+                for chunk in synthesize_chunks(text):
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            except Exception as e:
+                print(f"Error in speech synthesis: {str(e)}")
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+        producer = loop.run_in_executor(blocking_pool, produce)
+        await self.websocket.send_json({"type": "audio_start", "format": "mp3"})
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            await self.websocket.send_bytes(chunk)
+        await producer
+        await self.websocket.send_json({"type": "audio_end"})
+
+
+@app.websocket("/ws")
+async def voice_socket(websocket: WebSocket):
+    await websocket.accept()
+    session = Session(websocket)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                session.add_audio(message["bytes"])
+                continue
+
+            data = json_message(message.get("text"))
+            kind = data.get("type")
+            if kind == "start":
+                error = session.configure(data)
+                if error:
+                    await websocket.send_json({"type": "error", "message": error})
+            elif kind == "end":
+                await session.finish_utterance()
+            elif kind == "text":
+                await session.handle_text(data.get("command", "").lower())
+            else:
+                await websocket.send_json({"type": "error", "message": f"Unknown message type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if session.partial_task is not None:
+            session.partial_task.cancel()
+
+
+def json_message(text):
+    try:
+        data = json.loads(text or "{}")
+        return data if isinstance(data, dict) else {}
+    except ValueError:
+        return {}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = ["0.0.0.0:8000"]
+    asyncio.run(serve(app, config))
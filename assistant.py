@@ -6,8 +6,6 @@ import datetime
 import subprocess
 import playsound
 from gtts import gTTS
-import requests
-from bs4 import BeautifulSoup
 import difflib
 import json
 import time
@@ -16,6 +14,21 @@ import cv2
 import face_recognition
 import numpy as np
 from pathlib import Path
+import web_search
+import barge_in
+import wake_word
+import audio_preprocess
+from runtime import Runtime
+from startup import Startup
+import metrics
+import journal
+import frame_source
+import face_profiles
+import motion_gate
+import governor
+import face_vote
+from frame_prep import FramePrep
+import inference_pool
 
 # Global variables for face recognition
 KNOWN_FACES_DIR = "known_faces"
@@ -54,7 +67,7 @@ def initialize_face_recognition():
             
             # Load and encode face
             face_image = face_recognition.load_image_file(image_path)
-            face_encodings = face_recognition.face_encodings(face_image)
+            face_encodings = face_profiles.encode(face_image, role="enroll")
             
             if face_encodings:
                 known_face_encodings.append(face_encodings[0])
@@ -63,83 +76,120 @@ def initialize_face_recognition():
     face_recognition_enabled = len(known_face_encodings) > 0
     return face_recognition_enabled
 
-def train_new_face(name):
-    """Train the system to recognize a new face"""
+def train_new_face(name, source=None):
+    """Train the system to recognize a new face; returns True once trained"""
     global known_face_encodings, known_face_names, face_recognition_enabled
     
-    # Initialize camera
-    cap = cv2.VideoCapture(0)
+    # Initialize camera (or recorded footage)
+    cap = frame_source.open_source(source)
     speak(f"Please look at the camera for {name}'s face training")
+    trained = False
+    prep = FramePrep()
     
     while True:
         ret, frame = cap.read()
         if not ret:
+            if cap.exhausted:
+                break
             continue
         
         # Display the frame
-        cv2.imshow('Training Face', frame)
+        key = frame_source.show('Training Face', frame)
         
         # Check for face
-        face_locations = face_recognition.face_locations(frame)
+        prep.load(frame)
+        face_locations = face_profiles.detect(prep, role="enroll")
         if face_locations:
             # Save the image
             image_path = os.path.join(KNOWN_FACES_DIR, f"{name}.jpg")
             cv2.imwrite(image_path, frame)
             
             # Add to known faces
-            face_encoding = face_recognition.face_encodings(frame, face_locations)[0]
+            face_encoding = face_profiles.encode(prep, face_locations[:1], role="enroll")[0]
             known_face_encodings.append(face_encoding)
             known_face_names.append(name)
             
             face_recognition_enabled = True
+            trained = True
             speak(f"Successfully trained face for {name}")
             break
         
         # Break loop on 'q' press
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if key == ord('q'):
             break
     
     cap.release()
-    cv2.destroyAllWindows()
-    return True
+    frame_source.close_windows()
+    return trained
 
-def recognize_face():
-    """Recognize faces in real-time"""
+def recognize_face(source=None, deadline=face_vote.DEADLINE):
+    """Recognize who is in front of the camera, giving up after deadline seconds"""
     if not face_recognition_enabled:
         return None
     
-    cap = cv2.VideoCapture(0)
-    recognized_name = None
+    cap = frame_source.open_source(source)
+    motion = motion_gate.create()
+    speed = governor.create()
+    prep = FramePrep()
+    workers = {}
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            continue
+    def encode_frame(frame):
+        # Convert once; the motion gate, pre-detector and dlib share the buffers
+        prep.load(frame)
         
-        # Find faces in frame
-        face_locations = face_recognition.face_locations(frame)
-        face_encodings = face_recognition.face_encodings(frame, face_locations)
+        # Nobody moving in front of the camera: don't run detection
+        if motion and not motion.check(prep.gray(size=motion.size)):
+            motion.idle(cap)
+            return None
         
-        for face_encoding in face_encodings:
-            matches = face_recognition.compare_faces(known_face_encodings, face_encoding)
-            if True in matches:
-                first_match_index = matches.index(True)
-                recognized_name = known_face_names[first_match_index]
-                break
+        # Keep per-frame cost within the CPU/latency budget
+        if speed and not speed.should_process():
+            return None
         
-        if recognized_name:
-            break
+        overrides = speed.settings if speed else None
+        pool = inference_pool.get_pool(inference_pool.encode_faces, frame.shape)
+        if pool:
+            # Workers find the faces; vote on whichever frames have finished
+            workers["pool"] = pool
+            pool.submit(frame, overrides, block=not cap.live)
+            finished = pool.results()
+            if not finished:
+                return None
+            if speed:
+                for result in finished:
+                    speed.record(result.seconds / pool.workers)
+            return [encoding for result in finished for encoding in result.value]
         
-        # Break loop after 5 seconds if no face recognized
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+        # Find faces in frame
+        inference_start = time.perf_counter()
+        face_locations = face_profiles.detect(prep, overrides=overrides)
+        face_encodings = face_profiles.encode(prep, face_locations)
+        if speed:
+            speed.record(time.perf_counter() - inference_start)
+        return face_encodings
     
-    cap.release()
-    cv2.destroyAllWindows()
-    return recognized_name
+    try:
+        # Votes across frames instead of trusting the first single-frame match
+        decision = face_vote.recognize(cap, known_face_encodings, known_face_names, encode_frame, deadline)
+    finally:
+        print(f"Face recognition read {cap.frames_read} frames at {cap.frames_per_second():.1f} fps")
+        cap.release()
+        if "pool" in workers:
+            # Don't leave this scan's frames for the next one
+            workers["pool"].discard()
+    return decision.name
 
 def get_best_command_match(user_input):
-    """Find the best matching command template"""
+    """Find the best matching command template, recording match time and intent counts"""
+    with metrics.timed("assistant_match_seconds", "Time to match a command to an intent"):
+        best_match, score = match_command(user_input)
+    metrics.counter("assistant_intents_total", "Commands by matched intent").inc(intent=best_match or "none")
+    journal.mark("matched")
+    journal.note(intent=best_match, intent_score=round(score, 3))
+    return best_match
+
+def match_command(user_input):
+    """Find the best matching command template and its similarity score"""
     best_match = None
     highest_ratio = 0
     
@@ -150,67 +200,132 @@ def get_best_command_match(user_input):
                 highest_ratio = ratio
                 best_match = command_type
     
-    return best_match
+    return best_match, highest_ratio
+
+# Voice picked once by init_tts()
+tts_voice_id = None
+
+def init_tts():
+    """Load the TTS driver and pick the voice once, so speak() doesn't have to"""
+    global tts_voice_id
+    engine = pyttsx3.init()
+    
+    # Get available voices
+    voices = engine.getProperty('voices')
+    
+    # Set female voice (usually index 1)
+    female_voice = None
+    for voice in voices:
+        if "female" in voice.name.lower():
+            female_voice = voice.id
+            break
+    
+    if female_voice:
+        tts_voice_id = female_voice
+    elif len(voices) > 1:
+        # If no female voice found, try to use the second voice (usually female)
+        tts_voice_id = voices[1].id
+    return engine
 
 def speak(text):
+    """Speak the text; returns True if the user interrupted by talking"""
+    with metrics.timed("assistant_speak_seconds", "Time from speak() to the end of playback"):
+        interrupted = _speak(text)
+    if interrupted:
+        metrics.counter("assistant_speech_interrupted_total", "Speech cut short by the user talking").inc()
+    return interrupted
+
+def _speak(text):
+    """Speak the text with pyttsx3, stopping early on barge-in"""
     try:
         # Initialize pyttsx3 engine
         engine = pyttsx3.init()
-        
-        # Get available voices
-        voices = engine.getProperty('voices')
-        
-        # Set female voice (usually index 1)
-        female_voice = None
-        for voice in voices:
-            if "female" in voice.name.lower():
-                female_voice = voice.id
-                break
-        
-        if female_voice:
-            engine.setProperty('voice', female_voice)
-        else:
-            # If no female voice found, try to use the second voice (usually female)
-            if len(voices) > 1:
-                engine.setProperty('voice', voices[1].id)
+        if tts_voice_id is None:
+            init_tts()
+        if tts_voice_id:
+            engine.setProperty('voice', tts_voice_id)
         
         # Set properties for better voice quality
         engine.setProperty('rate', 150)    # Speed of speech
         engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
         
-        # Speak the text
-        engine.say(text)
-        engine.runAndWait()
+        # Speak the text, stopping as soon as the user starts talking
+        with barge_in.watch(engine.stop) as watch:
+            # Also stop at the next word boundary in case the driver ignored
+            # the stop request from the monitor thread
+            token = engine.connect('started-word', lambda name, location, length:
+                                   watch.triggered.is_set() and engine.stop())
+            try:
+                engine.say(text)
+                engine.runAndWait()
+            finally:
+                engine.disconnect(token)
+        return watch.triggered.is_set()
     except Exception as e:
         print(f"Error in speech synthesis: {str(e)}")
         # If pyttsx3 fails, just print the text
         print(f"Text to speak: {text}")
+        return False
+
+# Kept between calls so calibration only has to happen once
+recognizer = sr.Recognizer()
+# Opens the audio source for listening; replay.py swaps in recorded audio
+microphone_factory = sr.Microphone
+microphone_calibrated = False
+
+LISTEN_HELP = "Time spent in each listening stage"
+listen_errors = metrics.counter("assistant_listen_errors_total", "Failed listening attempts by reason")
+
+def calibrate_microphone():
+    """Measure ambient noise once; the recognizer keeps adapting while listening"""
+    global microphone_calibrated
+    with microphone_factory() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+    microphone_calibrated = True
 
-def listen():
-    recognizer = sr.Recognizer()
+def listen(calibrate=None):
+    """Listen for a command; calibrate=None calibrates only if that never happened"""
+    if calibrate is None:
+        calibrate = not microphone_calibrated
     text = ""
     error_count = 0
     max_retries = 3
 
     while not text and error_count < max_retries:
         try:
-            with sr.Microphone() as source:
-                print("Adjusting for ambient noise...")
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            with microphone_factory() as source:
+                if calibrate:
+                    print("Adjusting for ambient noise...")
+                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
                 print("Listening...")
                 try:
-                    audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
+                    with metrics.timed("assistant_listen_seconds", LISTEN_HELP, stage="capture"):
+                        audio = barge_in.listen(recognizer, source, timeout=5, phrase_time_limit=10)
+                    journal.mark("captured")
                     print("Processing speech...")
-                    # Try Google recognition
+                    # Try Google recognition on trimmed 16 kHz mono audio
                     try:
-                        text = recognizer.recognize_google(audio).lower()
+                        preprocessed = audio_preprocess.next_mode()
+                        with metrics.timed("assistant_listen_seconds", LISTEN_HELP, stage="preprocess"):
+                            audio = audio_preprocess.preprocess(audio, enabled=preprocessed)
+                        if audio is None:
+                            raise sr.UnknownValueError()
+                        start = time.perf_counter()
+                        text, nbest = journal.recognize(recognizer, audio)
+                        elapsed = time.perf_counter() - start
+                        metrics.histogram("assistant_listen_seconds", LISTEN_HELP).observe(elapsed, stage="recognize")
+                        audio_preprocess.log_recognition(elapsed, preprocessed)
+                        journal.mark("recognized")
+                        journal.heard(text, nbest)
                         print(f"Recognized: {text}")
                     except:
+                        listen_errors.inc(reason="unrecognized")
                         error_count += 1
                         if error_count < max_retries:
                             speak("I didn't catch that. Please try again.")
                         continue
                 except sr.WaitTimeoutError:
+                    listen_errors.inc(reason="timeout")
                     error_count += 1
                     if error_count < max_retries:
                         speak("Listening timeout. Please try again.")
@@ -261,16 +376,8 @@ def search_file(file_name, keyword):
 
 def google_search(query):
     try:
-        url = f"https://www.google.com/search?q={query}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-        results = []
-        for g in soup.find_all('div', class_='BNeawe s3v9rd AP7Wnd'):
-            results.append(g.text)
-        return results[:3] if results else ["No results found"]
+        result = web_search.first_answer(query)
+        return [result.answer] if result else ["No results found"]
     except Exception as e:
         print(f"Error in Google search: {str(e)}")
         return [f"Error performing search: {str(e)}"]
@@ -288,7 +395,12 @@ def process_command(command):
         return "I didn't hear anything. Please try again."
 
     best_match = get_best_command_match(command)
-    
+    with metrics.timed("assistant_handler_seconds", "Time spent in each intent handler",
+                       intent=best_match or "none"):
+        return _run_command(command, best_match)
+
+def _run_command(command, best_match):
+    """Run the branch for the matched command type"""
     try:
         if best_match == "open_file":
             speak("Please say the file name.")
@@ -358,7 +470,10 @@ def process_command(command):
                 if not query:
                     return "I couldn't understand your search query."
             
-            webbrowser.open(f"https://www.google.com/search?q={query}")
+            # Open the browser in the background so it doesn't delay the spoken answer
+            threading.Thread(target=webbrowser.open,
+                             args=(f"https://www.google.com/search?q={query}",),
+                             daemon=True).start()
             results = google_search(query)
             return "Here are the top results: " + " ".join(results)
         
@@ -384,33 +499,45 @@ def process_command(command):
         print(f"Error processing command: {str(e)}")
         return f"An error occurred: {str(e)}"
 
-def continuous_listen():
-    """Continuously listen for commands"""
-    while True:
-        command = listen()
-        if command:
-            response = process_command(command)
-            speak(response)
-            if response == "Goodbye!":
-                break
-        time.sleep(0.1)  # Small delay to prevent CPU overuse
+def continuous_listen(interrupted=False, runtime=None):
+    """Continuously listen for commands until the runtime shuts down"""
+    runtime = runtime or Runtime()
+    wake_gate = wake_word.load_gate()
+    if wake_gate:
+        runtime.on_shutdown(wake_gate.close)
+    while not runtime.stopping:
+        # Only wake the cloud recognizer after the wake word
+        if wake_gate and not interrupted:
+            if not wake_gate.wait(timeout=1.0):
+                continue
+        # After a barge-in the user is already talking, so skip calibration
+        turn = journal.begin(source="voice", barge_in=interrupted)
+        command = listen(calibrate=False if interrupted else None)
+        interrupted = False
+        if not command:
+            journal.finish(turn)
+            continue
+        response = process_command(command)
+        turn.mark("handled")
+        interrupted = speak(response)
+        turn.mark("spoken")
+        journal.finish(turn, result=response, interrupted=interrupted)
+        if response == "Goodbye!":
+            runtime.request_shutdown("goodbye")
 
-def main():
-    # Check if PyAudio is installed
-    try:
-        import pyaudio
-        print("PyAudio is installed.")
-    except ImportError:
-        print("PyAudio is not installed. Please install it using: pip install pyaudio")
-        print("On Windows, you may need to install it using: pip install pipwin")
-        print("Then: pipwin install pyaudio")
-    
-    # Initialize face recognition
-    if initialize_face_recognition():
-        speak("Face recognition system initialized")
-    
-    speak("Hello! My name is Friday, I am your assistant.\n"
-          "Here are my functionalities:")
+def warm_up_face_models():
+    """Run dlib once on a blank image so the first real frame isn't slowed by setup"""
+    blank = np.zeros((64, 64, 3), dtype=np.uint8)
+    for role in ("probe", "enroll"):
+        face_profiles.detect(blank, role)
+        face_profiles.encode(blank, [(0, 63, 63, 0)], role)
+
+def greet_and_listen(startup, runtime):
+    """Speak the greeting, then listen for commands; talking over the greeting
+    skips the rest of it and becomes the first command"""
+    greeting = "Hello! My name is Friday, I am your assistant.\nHere are my functionalities:"
+    if startup.done("gallery") and startup.wait("gallery"):
+        greeting = "Face recognition system initialized. " + greeting
     functionalities = [
         "Open files",
         "Search in files",
@@ -424,19 +551,41 @@ def main():
         "Recognize people"
     ]
     
-    for func in functionalities:
-        speak(func)
+    # One utterance instead of one per item
+    interrupted = speak(greeting + "\n" + ".\n".join(functionalities) +
+                        ".\nWhat would you like me to do?")
+    continuous_listen(interrupted, runtime)
+
+def main():
+    # Slow setup steps run side by side instead of one after another
+    startup = Startup()
+    startup.add("gallery", initialize_face_recognition)
+    startup.add("face_models", warm_up_face_models)
+    startup.add("microphone", calibrate_microphone)
+    # pyttsx3 drivers (SAPI5 COM, NSSpeechSynthesizer) belong to the thread
+    # that created them, so TTS loads here while the others run in the pool
+    startup.run("tts", init_tts)
     
-    speak("What would you like me to do?")
+    # Check if PyAudio is installed
+    try:
+        import pyaudio
+        print("PyAudio is installed.")
+    except ImportError:
+        print("PyAudio is not installed. Please install it using: pip install pyaudio")
+        print("On Windows, you may need to install it using: pip install pipwin")
+        print("Then: pipwin install pyaudio")
     
-    # Start continuous listening in a separate thread
-    listen_thread = threading.Thread(target=continuous_listen)
-    listen_thread.daemon = True
-    listen_thread.start()
+    # Listen as soon as the audio path is ready; faces keep loading meanwhile
+    startup.wait("tts", "microphone")
     
-    # Keep the main thread alive
-    while True:
-        time.sleep(0.1)
+    # The voice thread greets and then listens until something asks for
+    # shutdown (e.g. the "exit" command); the main thread sleeps till then
+    runtime = Runtime()
+    runtime.spawn("voice", greet_and_listen, startup, runtime)
+    # The barge-in monitor hears the user from the greeting's first word
+    startup.mark("first_listen")
+    startup.finish()
+    runtime.wait()
 
 if __name__ == "__main__":
     main()
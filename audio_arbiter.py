@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import metrics
+
+# Lower numbers are served first
+PRIORITY_INTERACTIVE = 0   # Slot prompts and the listening that follows them
+PRIORITY_RESPONSE = 5      # Answers to commands
+PRIORITY_NOTIFICATION = 10 # Greetings and status announcements
+PRIORITY_BACKGROUND = 20   # Idle wake-word listening
+
+MAX_QUEUE = 16       # Requests waiting for the device before new ones are refused
+QUEUE_TIMEOUT = 30.0 # Seconds a request may wait for the device
+
+
+class AudioBusy(Exception):
+    """Raised when the audio queue is full"""
+
+
+class AudioTimeout(Exception):
+    """Raised when a request waited too long for the audio device"""
+
+
+class AudioArbiter:
+    """Single owner of the microphone and speaker.
+
+    speak/listen calls from any thread are queued by priority and executed one
+    at a time on a dedicated worker thread, so run loops and audio streams
+    never overlap.
+    """
+
+    def __init__(self, max_queue=MAX_QUEUE, queue_timeout=QUEUE_TIMEOUT):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._stopped = False
+        self._stats = {
+            "submitted": 0,
+            "started": 0,
+            "completed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="audio-arbiter", daemon=True)
+            self._worker.start()
+
+    def submit(self, fn, *args, priority=PRIORITY_RESPONSE):
+        """Queue fn(*args) for the audio device and return a Future"""
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise AudioBusy("Audio arbiter is stopped")
+            if len(self._queue) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise AudioBusy(f"Audio queue is full ({len(self._queue)} waiting)")
+            self._ensure_worker()
+            heapq.heappush(self._queue, (priority, next(self._seq), time.perf_counter(), future, fn, args))
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._queue))
+            self._cond.notify()
+        return future
+
+    def run(self, fn, *args, priority=PRIORITY_RESPONSE, timeout=None):
+        """Run fn(*args) with exclusive use of the audio device and return its result.
+
+        Raises AudioBusy if the queue is full and AudioTimeout if the request
+        could not start within the queue timeout.
+        """
+        # Audio code that calls speak/listen itself (e.g. listen's retry
+        # prompts) already owns the device
+        if threading.current_thread() is self._worker:
+            return fn(*args)
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        future = self.submit(fn, *args, priority=priority)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            if future.cancel():
+                with self._cond:
+                    self._queue = [item for item in self._queue if item[3] is not future]
+                    heapq.heapify(self._queue)
+                    self._stats["timed_out"] += 1
+                raise AudioTimeout(f"Waited more than {timeout:.0f}s for the audio device")
+            # Already running; wait for it to finish
+            return future.result()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped and not self._queue:
+                    return
+                priority, _, queued_at, future, fn, args = heapq.heappop(self._queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            waited = time.perf_counter() - queued_at
+            with self._cond:
+                self._stats["started"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            metrics.histogram("assistant_audio_wait_seconds",
+                              "Time requests waited for the audio device").observe(waited, priority=priority)
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            with self._cond:
+                self._stats["completed"] += 1
+
+    def stats(self):
+        """Queue depth and wait-time figures"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._queue)
+            stats["busy"] = stats["started"] > stats["completed"]
+            started = stats["started"]
+            stats["wait_seconds_avg"] = stats["wait_seconds_total"] / started if started else 0.0
+        return stats
+
+    def stop(self, timeout=None):
+        """Finish queued requests and stop the worker"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
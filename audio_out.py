@@ -0,0 +1,110 @@
+import io
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+
+from gtts import gTTS
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None    # Falls back to an ffmpeg process per utterance
+
+SAMPLE_RATE = 24000      # gTTS produces 24 kHz mono MP3
+BLOCK_FRAMES = 1024      # Frames per write (~43 ms), also the cancel granularity
+PCM_CACHE_SIZE = 64      # Decoded utterances kept for repeated prompts
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def available():
+    """True if in-memory decoding and stream playback can be used"""
+    try:
+        import pyaudio
+    except ImportError:
+        return False
+    return miniaudio is not None or shutil.which("ffmpeg") is not None
+
+
+def decode_mp3(data, sample_rate=SAMPLE_RATE):
+    """Decode MP3 bytes to 16-bit mono PCM, in-process with miniaudio if it is installed"""
+    if miniaudio is not None:
+        decoded = miniaudio.decode(data, output_format=miniaudio.SampleFormat.SIGNED16,
+                                   nchannels=1, sample_rate=sample_rate)
+        return decoded.samples.tobytes()
+    return _decode_with_ffmpeg(data, sample_rate)
+
+
+def _decode_with_ffmpeg(data, sample_rate):
+    """Decode through ffmpeg pipes (no temp files), one process per call"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg is not installed")
+    result = subprocess.run([ffmpeg, "-loglevel", "error", "-i", "pipe:0",
+                             "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+                            input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
+
+
+def synthesize_pcm(text, lang='en'):
+    """Synthesize text with gTTS into memory and return decoded PCM, cached by text"""
+    key = (text, lang)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    mp3 = io.BytesIO()
+    gTTS(text=text, lang=lang).write_to_fp(mp3)
+    pcm = decode_mp3(mp3.getvalue())
+
+    with _cache_lock:
+        _cache[key] = pcm
+        while len(_cache) > PCM_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pcm
+
+
+class PcmPlayer:
+    """Plays PCM through one output stream that stays open between utterances"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, stream=None):
+        self.sample_rate = sample_rate
+        self._audio = None
+        self._stream = stream   # Opened with pyaudio on first use unless given
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._stream is None:
+            import pyaudio
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(format=pyaudio.paInt16, channels=1,
+                                            rate=self.sample_rate, output=True,
+                                            frames_per_buffer=BLOCK_FRAMES)
+        return self._stream
+
+    def play(self, pcm, cancel=None):
+        """Play 16-bit mono PCM; returns False if cancel was set mid-way"""
+        block = BLOCK_FRAMES * 2
+        with self._lock:
+            stream = self._open()
+            for offset in range(0, len(pcm), block):
+                if cancel is not None and cancel.is_set():
+                    return False
+                stream.write(pcm[offset:offset + block])
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+                if self._audio is not None:
+                    self._audio.terminate()
+                self._stream = None
+                self._audio = None
+
+
+player = PcmPlayer()
@@ -0,0 +1,132 @@
+import itertools
+import os
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from vad import to_samples
+
+PREPROCESS_ENABLED = True
+# Alternate raw and preprocessed uploads so one run measures both:  PREPROCESS_AB=1 python app.py
+AB_TEST = os.environ.get("PREPROCESS_AB", "0") not in ("", "0")
+TARGET_RATE = 16000     # What the recognizer needs for speech
+TRIM_THRESHOLD = 300    # Frame RMS that counts as speech when trimming (lower than barge-in)
+FRAME_MS = 20
+PADDING_MS = 200        # Silence kept around the speech
+NORMALIZE_GAIN = False
+TARGET_PEAK = 0.9       # Fraction of full scale after normalisation
+
+# Running totals so the saving can be compared across runs
+stats = {
+    "calls": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "preprocess_seconds": 0.0,
+    "recognitions": {True: [0, 0.0], False: [0, 0.0]},  # preprocessed -> [count, seconds]
+}
+_stats_lock = threading.Lock()     # Updated from the audio worker and the ASGI thread pool
+_ab_turns = itertools.count()
+
+
+def next_mode():
+    """Whether to preprocess the next recording: alternates under A/B testing"""
+    if AB_TEST:
+        return next(_ab_turns) % 2 == 0
+    return PREPROCESS_ENABLED
+
+
+def _lowpass(samples, cutoff):
+    """Windowed-sinc low-pass; cutoff is a fraction of the sample rate"""
+    taps = 63
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(samples, kernel, mode="same")
+
+
+def resample(samples, rate, target=TARGET_RATE):
+    if rate == target:
+        return samples
+    if rate > target:
+        samples = _lowpass(samples, 0.5 * target / rate)
+    duration = len(samples) / rate
+    positions = np.arange(int(duration * target)) * (rate / target)
+    return np.interp(positions, np.arange(len(samples)), samples)
+
+
+def trim_silence(samples, rate):
+    """Cut leading and trailing non-speech; returns None if there is no speech.
+
+    A fixed threshold rather than the adaptive EnergyVAD: that takes its noise
+    floor from the first frame, so a clip starting mid-word (a barge-in
+    capture, push-to-talk) would never count as speech.
+    """
+    frame = rate * FRAME_MS // 1000
+    count = len(samples) // frame
+    if not count:
+        return None
+    frames = samples[:count * frame].reshape(count, frame)
+    voiced = np.flatnonzero(np.sqrt(np.mean(np.square(frames), axis=1)) > TRIM_THRESHOLD) * frame
+    if not len(voiced):
+        return None
+    pad = rate * PADDING_MS // 1000
+    return samples[max(0, voiced[0] - pad):min(len(samples), voiced[-1] + frame + pad)]
+
+
+def preprocess(audio, channels=1, normalize=NORMALIZE_GAIN, enabled=None):
+    """Trim, downmix, resample to 16 kHz and optionally normalise an AudioData.
+
+    Returns a 16-bit mono AudioData, or None if no speech was found (so the
+    recognizer doesn't need to be called at all). enabled=False returns the
+    audio untouched (default: PREPROCESS_ENABLED).
+    """
+    if not (PREPROCESS_ENABLED if enabled is None else enabled):
+        return audio
+    start = time.perf_counter()
+    raw = audio.get_raw_data()
+    samples = to_samples(raw, audio.sample_width)
+
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    samples = resample(samples, audio.sample_rate)
+    samples = trim_silence(samples, TARGET_RATE)
+
+    with _stats_lock:
+        stats["calls"] += 1
+        stats["bytes_in"] += len(raw)
+        stats["preprocess_seconds"] += time.perf_counter() - start
+    if samples is None:
+        print(f"No speech in {len(raw)} bytes of audio, skipping recognition")
+        return None
+
+    if normalize:
+        peak = np.abs(samples).max()
+        if peak > 0:
+            samples = samples * (TARGET_PEAK * 32767 / peak)
+    pcm = np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+    with _stats_lock:
+        stats["bytes_out"] += len(pcm)
+    saved = 100.0 * (1 - len(pcm) / len(raw)) if raw else 0.0
+    print(f"Audio {len(raw)} -> {len(pcm)} bytes ({saved:.0f}% saved) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return sr.AudioData(pcm, TARGET_RATE, 2)
+
+
+def log_recognition(seconds, preprocessed=None):
+    """Record a recognizer round trip and print the average for raw vs preprocessed audio.
+
+    preprocessed is the mode that recording used (see next_mode()).
+    """
+    if preprocessed is None:
+        preprocessed = PREPROCESS_ENABLED
+    with _stats_lock:
+        entry = stats["recognitions"][bool(preprocessed)]
+        entry[0] += 1
+        entry[1] += seconds
+        totals = [(mode, count, total) for mode, (count, total) in stats["recognitions"].items() if count]
+    averages = ", ".join(f"{'preprocessed' if mode else 'raw'} avg {total / count * 1000:.0f} ms"
+                         for mode, count, total in totals)
+    print(f"Recognition took {seconds * 1000:.0f} ms ({averages})")
@@ -0,0 +1,131 @@
+import collections
+import threading
+import time
+
+import speech_recognition as sr
+
+from vad import EnergyVAD
+
+BARGE_IN_ENABLED = True
+SAMPLE_RATE = 16000
+FRAME_MS = 20            # VAD frame length
+SPEECH_FRAMES = 3        # Consecutive speech frames that count as barge-in (~60 ms)
+PLAYBACK_THRESHOLD = 1500  # Higher than normal so our own voice doesn't trigger it
+PRE_ROLL_FRAMES = 15     # Frames kept from before the trigger (~300 ms), so the first word isn't clipped
+MAX_CAPTURE = 10.0       # Seconds of interrupting speech kept for the next listen()
+PENDING_MAX_AGE = 5.0    # Captured speech older than this isn't used
+CONTINUE_TIMEOUT = 1.0   # How long listen() waits for the user to keep talking after a barge-in
+
+_pending = None          # (captured_at, pcm) from the last barge-in or wake word
+_pending_lock = threading.Lock()
+
+
+class BargeInWatch:
+    """Watches the microphone while audio plays and fires on user speech"""
+
+    def __init__(self, on_speech, vad=None, stream=None):
+        self.on_speech = on_speech
+        self.vad = vad or EnergyVAD(threshold=PLAYBACK_THRESHOLD)
+        self.triggered = threading.Event()
+        self.detected_at = None
+        self.captured = []      # 16-bit PCM frames from just before the trigger onwards
+        self._stream = stream   # Opened with pyaudio unless given
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if BARGE_IN_ENABLED:
+            self._thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.triggered.is_set() and self.captured:
+            # The user is mid-sentence; the next listen() starts with what they already said
+            set_pending(b"".join(self.captured))
+        return False
+
+    def _run(self):
+        frames_per_buffer = SAMPLE_RATE * FRAME_MS // 1000
+        audio = None
+        stream = self._stream
+        try:
+            if stream is None:
+                try:
+                    import pyaudio
+                except ImportError:
+                    return
+                audio = pyaudio.PyAudio()
+                stream = audio.open(format=pyaudio.paInt16, channels=1, rate=SAMPLE_RATE,
+                                    input=True, frames_per_buffer=frames_per_buffer)
+            recent = collections.deque(maxlen=PRE_ROLL_FRAMES)
+            max_frames = int(MAX_CAPTURE * 1000 / FRAME_MS)
+            speech_run = 0
+            while not self._stop.is_set():
+                frame = stream.read(frames_per_buffer, exception_on_overflow=False)
+                if self.triggered.is_set():
+                    # Keep recording the interruption until playback has stopped
+                    if len(self.captured) >= max_frames:
+                        break
+                    self.captured.append(frame)
+                    continue
+                recent.append(frame)
+                speech_run = speech_run + 1 if self.vad.is_speech(frame) else 0
+                if speech_run >= SPEECH_FRAMES:
+                    self.detected_at = time.perf_counter()
+                    self.captured = list(recent)
+                    self.triggered.set()
+                    print("Barge-in detected, stopping playback")
+                    self.on_speech()
+        except Exception as e:
+            print(f"Error in barge-in monitor: {str(e)}")
+        finally:
+            if audio is not None:
+                if stream is not None:
+                    stream.stop_stream()
+                    stream.close()
+                audio.terminate()
+
+
+def watch(on_speech):
+    """Context manager that calls on_speech() if the user talks over playback"""
+    return BargeInWatch(on_speech)
+
+
+def set_pending(pcm):
+    """Hand speech to the next listen(); pcm is 16 kHz 16-bit bytes, or a function
+    returning them (or None) when the audio is still being recorded"""
+    global _pending
+    with _pending_lock:
+        _pending = (time.monotonic(), pcm)
+
+
+def take_pending():
+    """16 kHz 16-bit speech captured by the last barge-in or wake word, or None;
+    each capture is returned once"""
+    global _pending
+    with _pending_lock:
+        pending, _pending = _pending, None
+    if pending is None or time.monotonic() - pending[0] > PENDING_MAX_AGE:
+        return None
+    pcm = pending[1]
+    return pcm() if callable(pcm) else pcm
+
+
+def listen(recognizer, source, **kwargs):
+    """recognizer.listen(), prefixed with the speech that cut off the last playback
+    or followed the wake word.
+
+    If the user already stopped talking, the captured speech is used on its own.
+    """
+    pending = take_pending()
+    if pending is None:
+        return recognizer.listen(source, **kwargs)
+    try:
+        audio = recognizer.listen(source, **dict(kwargs, timeout=CONTINUE_TIMEOUT))
+    except sr.WaitTimeoutError:
+        return sr.AudioData(pending, SAMPLE_RATE, 2)
+    return sr.AudioData(pending + audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2), SAMPLE_RATE, 2)
@@ -0,0 +1,28 @@
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def face_recognition_stub(monkeypatch):
+    """face_recognition, or an empty stand-in where dlib isn't installed.
+
+    Tests import the modules that need it (face_profiles, assistant...) after
+    requesting this; project modules imported meanwhile are dropped again
+    afterwards, so no later test sees the stand-in.
+    """
+    try:
+        import face_recognition
+    except ImportError:
+        face_recognition = types.ModuleType("face_recognition")
+    loaded = set(sys.modules)
+    monkeypatch.setitem(sys.modules, "face_recognition", face_recognition)
+    yield face_recognition
+    for name in set(sys.modules) - loaded:
+        path = getattr(sys.modules[name], "__file__", None) or ""
+        if os.path.dirname(os.path.abspath(path)) == ROOT:
+            del sys.modules[name]
@@ -0,0 +1,232 @@
+import datetime
+import difflib
+import os
+import subprocess
+import threading
+import time
+import uuid
+import webbrowser
+from collections import namedtuple
+
+import journal
+import metrics
+
+SESSION_TIMEOUT = 300  # Seconds an unanswered slot prompt stays valid
+
+# Command templates for better matching
+COMMAND_TEMPLATES = {
+    "open_file": ["open file", "open the file", "open document", "open a file"],
+    "search_file": ["search in file", "search file", "find in file", "search for in file"],
+    "calculator": ["open calculator", "launch calculator", "start calculator", "calculator"],
+    "notepad": ["open notepad", "launch notepad", "start notepad", "notepad"],
+    "chrome": ["open chrome", "launch chrome", "start chrome", "chrome"],
+    "google_search": ["search google for", "google search", "search for", "search", "find"],
+    "youtube_search": ["search youtube for", "youtube search", "find on youtube", "youtube"],
+    "time": ["what is the time", "current time", "time now", "tell me the time"],
+    "exit": ["exit", "stop", "quit", "goodbye", "bye"]
+}
+
+# A handler returns either the final response text or a NeedSlot continuation
+NeedSlot = namedtuple("NeedSlot", ["slot", "prompt"])
+Reply = namedtuple("Reply", ["response", "need_slot", "session_id", "intent"])
+
+
+def get_best_command_match(user_input):
+    """Find the best matching command template, recording match time and intent counts"""
+    with metrics.timed("assistant_match_seconds", "Time to match a command to an intent"):
+        intent, score = match_command(user_input)
+    metrics.counter("assistant_intents_total", "Commands by matched intent").inc(intent=intent or "none")
+    journal.mark("matched")
+    journal.note(intent=intent, intent_score=round(score, 3))
+    return intent
+
+
+def match_command(user_input):
+    """Best matching command type and its score (1.0 for a template contained in the input)"""
+    best_match = None
+    highest_ratio = 0
+    
+    for command_type, templates in COMMAND_TEMPLATES.items():
+        for template in templates:
+            # Try exact match first
+            if template in user_input:
+                return command_type, 1.0
+            
+            # If no exact match, try fuzzy matching
+            ratio = difflib.SequenceMatcher(None, user_input, template).ratio()
+            if ratio > highest_ratio and ratio > 0.6:  # Increased threshold for better accuracy
+                highest_ratio = ratio
+                best_match = command_type
+    
+    return best_match, highest_ratio
+
+
+def _documents_path(file_name):
+    return os.path.join(os.path.expanduser("~"), "Documents", f"{file_name}.txt")
+
+
+def handle_open_file(command, slots):
+    if "file_name" not in slots:
+        return NeedSlot("file_name", "Please say the file name.")
+    file_name = slots["file_name"]
+    if not file_name:
+        return "I couldn't understand the file name."
+    file_path = _documents_path(file_name)
+    if os.path.exists(file_path):
+        os.startfile(file_path)
+        return f"Opening {file_name}"
+    return "File not found."
+
+
+def handle_search_file(command, slots):
+    if "file_name" not in slots:
+        return NeedSlot("file_name", "Say the file name.")
+    file_name = slots["file_name"]
+    if not file_name:
+        return "I couldn't understand the file name."
+    file_path = _documents_path(file_name)
+    if not os.path.exists(file_path):
+        return "File not found."
+
+    if "keyword" not in slots:
+        return NeedSlot("keyword", "Say the word to search.")
+    keyword = slots["keyword"]
+    if not keyword:
+        return "I couldn't understand the search keyword."
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        words = file.read().lower().split()
+    keyword_parts = keyword.lower().split()
+    matches = []
+    for i in range(len(words)):
+        if all(kw in ' '.join(words[i:i+len(keyword_parts)]) for kw in keyword_parts):
+            matches.append(' '.join(words[i:i+len(keyword_parts)]))
+    if matches:
+        return f"Found matches: {', '.join(matches[:3])}"
+    return f"No matches found for '{keyword}'"
+
+
+def handle_calculator(command, slots):
+    subprocess.Popen("calc")
+    return "Opening Calculator."
+
+
+def handle_notepad(command, slots):
+    subprocess.Popen("notepad")
+    return "Opening Notepad."
+
+
+def handle_chrome(command, slots):
+    subprocess.Popen("start chrome", shell=True)
+    return "Opening Google Chrome."
+
+
+def handle_google_search(command, slots):
+    query = slots.get("query", command.replace("search google for", "").strip())
+    if "query" not in slots and not query:
+        return NeedSlot("query", "What would you like to search for?")
+    if not query:
+        return "I couldn't understand your search query."
+    webbrowser.open(f"https://www.google.com/search?q={query}")
+    return f"Searching Google for {query}"
+
+
+def handle_youtube_search(command, slots):
+    query = slots.get("query", command.replace("search youtube for", "").strip())
+    if "query" not in slots and not query:
+        return NeedSlot("query", "What would you like to search for on YouTube?")
+    if not query:
+        return "I couldn't understand your search query."
+    webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
+    return f"Searching YouTube for {query}"
+
+
+def handle_time(command, slots):
+    return f"The time is {datetime.datetime.now().strftime('%H:%M')}"
+
+
+def handle_exit(command, slots):
+    return "Goodbye!"
+
+
+HANDLERS = {
+    "open_file": handle_open_file,
+    "search_file": handle_search_file,
+    "calculator": handle_calculator,
+    "notepad": handle_notepad,
+    "chrome": handle_chrome,
+    "google_search": handle_google_search,
+    "youtube_search": handle_youtube_search,
+    "time": handle_time,
+    "exit": handle_exit,
+}
+
+
+def no_report(stage, **data):
+    pass
+
+
+class DialogEngine:
+    """Text-mode dialog: handlers ask for missing slots instead of listening.
+
+    A turn that needs more input returns a Reply with need_slot and a
+    session_id; the caller answers it with answer(session_id, text). The
+    engine never touches the microphone or speakers, so many clients can hold
+    conversations at once.
+    """
+
+    def __init__(self, match, handlers=None, session_timeout=SESSION_TIMEOUT):
+        self.match = match
+        self.handlers = HANDLERS if handlers is None else handlers
+        self.session_timeout = session_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def start(self, command, report=no_report):
+        """Begin a turn for a new command"""
+        intent = self.match(command)
+        report("matched", intent=intent)
+        return self._step(None, intent, command, {}, report)
+
+    def answer(self, session_id, text, report=no_report):
+        """Fill the slot a previous reply asked for and continue the turn"""
+        with self._lock:
+            self._expire()
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return Reply("That conversation has expired. Please start again.", None, None, None)
+        slots = dict(session["slots"])
+        slots[session["slot"]] = (text or "").strip().lower()
+        return self._step(session_id, session["intent"], session["command"], slots, report)
+
+    def _step(self, session_id, intent, command, slots, report):
+        handler = self.handlers.get(intent)
+        if handler is None:
+            return Reply("I didn't understand. Please try again.", None, None, intent)
+        journal.note(slots=dict(slots))
+        try:
+            with metrics.timed("assistant_handler_seconds", "Time spent in each intent handler", intent=intent):
+                result = handler(command, slots)
+        except Exception as e:
+            print(f"Error processing command: {str(e)}")
+            metrics.counter("assistant_handler_errors_total", "Intent handlers that raised").inc(intent=intent)
+            return Reply(f"An error occurred: {str(e)}", None, None, intent)
+
+        if isinstance(result, NeedSlot):
+            session_id = session_id or uuid.uuid4().hex
+            with self._lock:
+                self._sessions[session_id] = {
+                    "intent": intent,
+                    "command": command,
+                    "slots": slots,
+                    "slot": result.slot,
+                    "expires": time.time() + self.session_timeout,
+                }
+            report("awaiting_slot", slot=result.slot, prompt=result.prompt)
+            return Reply(result.prompt, result.slot, session_id, intent)
+        return Reply(result, None, None, intent)
+
+    def _expire(self):
+        now = time.time()
+        for session_id in [s for s, session in self._sessions.items() if session["expires"] < now]:
+            del self._sessions[session_id]
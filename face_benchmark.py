@@ -0,0 +1,191 @@
+"""Benchmark face detection and identification settings on labelled images.
+
+The gallery is a directory of <name>.jpg files (like known_faces/). Probes
+are a directory of <name>/ subfolders; images under unknown/ should not
+match anyone. Every combination of the chosen settings is run and reported
+as a table, and optionally as JSON:
+
+    python face_benchmark.py --gallery known_faces --probes probes \\
+        --models hog cnn --upsample 0 1 --jitters 1 5 --landmarks small large \\
+        --scales 1.0 0.5 --json benchmark.json
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+
+import cv2
+import face_recognition
+import numpy as np
+
+import face_profiles
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+UNKNOWN_LABEL = "unknown"
+TOLERANCE = 0.6   # face_recognition's default match distance
+
+
+def _images(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def load_gallery(directory):
+    """[(name, path)] for every image in the gallery directory"""
+    return [(os.path.splitext(os.path.basename(path))[0], path) for path in _images(directory)]
+
+
+def load_probes(directory):
+    """[(label, path)] from one subdirectory per person"""
+    probes = []
+    for label in sorted(os.listdir(directory)):
+        folder = os.path.join(directory, label)
+        if os.path.isdir(folder):
+            probes.extend((label, path) for path in _images(folder))
+    return probes
+
+
+def _resize(image, scale):
+    if scale == 1.0:
+        return image
+    return cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _encode(image, config):
+    """Face locations and encodings for one RGB image under a configuration"""
+    image = _resize(image, config["scale"])
+    locations = face_recognition.face_locations(
+        image, number_of_times_to_upsample=config["upsample"], model=config["model"])
+    encodings = face_recognition.face_encodings(
+        image, locations, num_jitters=config["jitters"], model=config["landmarks"])
+    return locations, encodings
+
+
+def run_config(config, gallery, probes, tolerance=TOLERANCE):
+    """Detection recall, identification accuracy and speed for one configuration.
+
+    known_accuracy only counts probes of enrolled people, and unknown_rejection
+    only the unknown/ probes, so a setting can't look good by rejecting everyone.
+    """
+    names, known = [], []
+    for name, path in gallery:
+        _, encodings = _encode(face_recognition.load_image_file(path), config)
+        if encodings:
+            names.append(name)
+            known.append(encodings[0])
+
+    detected = identified = faces = 0
+    known_identified = unknown_rejected = 0
+    labelled = [(label, face_recognition.load_image_file(path)) for label, path in probes]
+    start = time.perf_counter()
+    for label, image in labelled:
+        locations, encodings = _encode(image, config)
+        faces += len(locations)
+        if locations:
+            detected += 1
+        predicted = UNKNOWN_LABEL
+        if encodings and known:
+            distances = face_recognition.face_distance(known, encodings[0])
+            best = int(np.argmin(distances))
+            if distances[best] <= tolerance:
+                predicted = names[best]
+        if predicted == label:
+            identified += 1
+            if label == UNKNOWN_LABEL:
+                unknown_rejected += 1
+            else:
+                known_identified += 1
+    seconds = time.perf_counter() - start
+
+    count = len(labelled)
+    expected = sum(1 for label, _ in labelled if label != UNKNOWN_LABEL)
+    unknown = count - expected
+    return dict(config,
+                probes=count,
+                gallery=len(names),
+                detection_recall=detected / count if count else 0.0,
+                identification_accuracy=identified / count if count else 0.0,
+                known_probes=expected,
+                known_accuracy=known_identified / expected if expected else 0.0,
+                unknown_rejection=unknown_rejected / unknown if unknown else 0.0,
+                ms_per_frame=seconds * 1000 / count if count else 0.0,
+                faces_per_second=faces / seconds if seconds else 0.0)
+
+
+def sweep(gallery, probes, models=("hog",), upsample=(1,), jitters=(1,), landmarks=("large",),
+          scales=(1.0,), tolerance=TOLERANCE):
+    """Run every combination of the settings; a failing one is reported and skipped"""
+    results = []
+    for model, times, jitter, landmark, scale in itertools.product(models, upsample, jitters, landmarks, scales):
+        config = {"model": model, "upsample": times, "jitters": jitter,
+                  "landmarks": landmark, "scale": scale}
+        try:
+            results.append(run_config(config, gallery, probes, tolerance))
+        except Exception as e:
+            print(f"Skipping {config}: {str(e)}")
+        else:
+            print_table(results[-1:], header=len(results) == 1)
+    return results
+
+
+def run_profiles(names, gallery, probes, tolerance=TOLERANCE):
+    """Benchmark named face_profiles settings; a failing one is reported and skipped"""
+    results = []
+    for name in names:
+        try:
+            result = run_config(face_profiles.PROFILES[name], gallery, probes, tolerance)
+        except Exception as e:
+            print(f"Skipping profile {name}: {str(e)}")
+        else:
+            results.append(dict(result, profile=name))
+            print_table(results[-1:], header=len(results) == 1)
+    return results
+
+
+def print_table(results, header=True):
+    if header:
+        print(f"{'model':<6}{'up':>3}{'jit':>4}{'marks':>7}{'scale':>6}"
+              f"{'recall':>8}{'acc':>7}{'known':>7}{'reject':>8}{'ms/frame':>10}{'faces/s':>9}")
+    for r in results:
+        print(f"{r['model']:<6}{r['upsample']:>3}{r['jitters']:>4}{r['landmarks']:>7}{r['scale']:>6.2f}"
+              f"{r['detection_recall']:>8.2f}{r['identification_accuracy']:>7.2f}"
+              f"{r['known_accuracy']:>7.2f}{r['unknown_rejection']:>8.2f}"
+              f"{r['ms_per_frame']:>10.1f}{r['faces_per_second']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep face detection/encoding settings over labelled images")
+    parser.add_argument("--gallery", default="known_faces", help="Directory of <name>.jpg enrollment images")
+    parser.add_argument("--probes", required=True, help="Directory of <name>/ folders of probe images")
+    parser.add_argument("--models", nargs="+", default=["hog"], choices=["hog", "cnn"])
+    parser.add_argument("--upsample", nargs="+", type=int, default=[1])
+    parser.add_argument("--jitters", nargs="+", type=int, default=[1])
+    parser.add_argument("--landmarks", nargs="+", default=["large"], choices=["small", "large"])
+    parser.add_argument("--scales", nargs="+", type=float, default=[1.0])
+    parser.add_argument("--profiles", nargs="+", choices=sorted(face_profiles.PROFILES),
+                        help="Benchmark these named profiles instead of sweeping settings")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    gallery = load_gallery(args.gallery)
+    probes = load_probes(args.probes)
+    print(f"{len(gallery)} gallery images, {len(probes)} probes")
+    if args.profiles:
+        results = run_profiles(args.profiles, gallery, probes, args.tolerance)
+    else:
+        results = sweep(gallery, probes, args.models, args.upsample, args.jitters,
+                        args.landmarks, args.scales, args.tolerance)
+    if results:
+        best = max(results, key=lambda r: (r["identification_accuracy"], -r["ms_per_frame"]))
+        print("\nMost accurate (fastest on ties):")
+        print_table([best])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Cheap OpenCV face proposals that run before dlib.
+
+A proposer looks for face-like regions on a small grayscale copy of the
+frame, given as an RGB array (like face_profiles.detect) or a FramePrep. Frames without proposals skip dlib entirely; otherwise dlib only
+searches the proposed regions (or, with GATE_MODE = "gate", the whole frame).
+
+    FACE_PREDETECTOR=haar|dnn|none
+"""
+import os
+
+import cv2
+
+PREDETECTOR = os.environ.get("FACE_PREDETECTOR", "haar")
+GATE_MODE = os.environ.get("FACE_GATE_MODE", "regions")   # "regions" or "gate"
+PROPOSE_SCALE = 0.5     # Proposals are found on a half-size grayscale frame
+REGION_MARGIN = 0.3     # Regions grow by this fraction on each side for dlib
+MIN_FACE = 40           # Smallest face (pixels, full size) worth proposing
+
+HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+# OpenCV's res10 SSD face detector; the files aren't shipped with opencv-python
+DNN_MODEL = os.environ.get("FACE_DNN_MODEL", "models/res10_300x300_ssd_iter_140000.caffemodel")
+DNN_CONFIG = os.environ.get("FACE_DNN_CONFIG", "models/deploy.prototxt")
+DNN_CONFIDENCE = 0.5
+
+
+def _gray(image, scale):
+    if hasattr(image, "gray"):
+        # A FramePrep shrinks and converts its BGR frame into a reused buffer
+        return image.gray(scale)
+    small = cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale != 1.0 else image
+    # Plain arrays are RGB, as for dlib
+    return small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+
+class HaarProposer:
+    name = "haar"
+
+    def __init__(self, scale=PROPOSE_SCALE, min_face=MIN_FACE):
+        self.scale = scale
+        self.min_size = max(1, int(min_face * scale))
+        self.cascade = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, HAAR_CASCADE))
+        if self.cascade.empty():
+            raise RuntimeError(f"Could not load {HAAR_CASCADE}")
+
+    def propose(self, image):
+        """Face boxes as (top, right, bottom, left) in full-size coordinates"""
+        boxes = self.cascade.detectMultiScale(_gray(image, self.scale), scaleFactor=1.1, minNeighbors=4,
+                                              minSize=(self.min_size, self.min_size))
+        return [_to_trbl(x, y, w, h, self.scale) for x, y, w, h in boxes]
+
+
+class DnnProposer:
+    name = "dnn"
+
+    def __init__(self, model=DNN_MODEL, config=DNN_CONFIG, confidence=DNN_CONFIDENCE):
+        self.net = cv2.dnn.readNetFromCaffe(config, model)
+        self.confidence = confidence
+
+    def propose(self, image):
+        # The network was trained on BGR input; plain arrays are RGB
+        image = image.bgr if hasattr(image, "bgr") else cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        height, width = image.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(image, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+        boxes = []
+        for detection in detections:
+            if detection[2] < self.confidence:
+                continue
+            left, top, right, bottom = (detection[3:7] * [width, height, width, height]).astype(int)
+            boxes.append((max(0, top), min(width, right), min(height, bottom), max(0, left)))
+        return boxes
+
+
+def _to_trbl(x, y, w, h, scale):
+    return (int(y / scale), int((x + w) / scale), int((y + h) / scale), int(x / scale))
+
+
+def expand(box, shape, margin=REGION_MARGIN):
+    """Grow a (top, right, bottom, left) box by margin on each side, clipped to the image"""
+    top, right, bottom, left = box
+    dy, dx = int((bottom - top) * margin), int((right - left) * margin)
+    return (max(0, top - dy), min(shape[1], right + dx), min(shape[0], bottom + dy), max(0, left - dx))
+
+
+def merge(boxes):
+    """Union overlapping boxes so each region is searched once"""
+    merged = []
+    for box in sorted(boxes, key=lambda b: (b[0], b[3])):
+        for i, other in enumerate(merged):
+            if box[0] < other[2] and other[0] < box[2] and box[3] < other[1] and other[3] < box[1]:
+                merged[i] = (min(box[0], other[0]), max(box[1], other[1]),
+                             max(box[2], other[2]), min(box[3], other[3]))
+                break
+        else:
+            merged.append(box)
+    return merged
+
+
+def detect_in_regions(image, regions, detect):
+    """Run detect(crop) -> [(top, right, bottom, left)] inside each region, in image coordinates"""
+    locations = []
+    for top, right, bottom, left in regions:
+        for t, r, b, l in detect(image[top:bottom, left:right]):
+            locations.append((t + top, r + left, b + top, l + left))
+    return locations
+
+
+_proposers = {}
+
+
+def get_proposer(name=None, scale=None):
+    """The named (default: configured) proposer, or None if it is off or unavailable.
+
+    scale is the size Haar searches at (default PROPOSE_SCALE); the DNN has a fixed input size.
+    """
+    name = name or PREDETECTOR
+    scale = scale or PROPOSE_SCALE
+    key = (name, scale if name == "haar" else None)
+    if key not in _proposers:
+        proposer = None
+        try:
+            if name == "haar":
+                proposer = HaarProposer(scale)
+            elif name == "dnn":
+                proposer = DnnProposer()
+        except Exception as e:
+            print(f"Face pre-detector {name} unavailable, using dlib on every frame: {str(e)}")
+        _proposers[key] = proposer
+    return _proposers[key]
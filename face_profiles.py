@@ -0,0 +1,109 @@
+"""Named speed/quality settings for face detection and encoding.
+
+Enrollment runs once per person and can afford to be slow and accurate;
+live probing runs on every frame and has to be cheap. Each role picks a
+profile, which can be changed in the environment:
+
+    FACE_ENROLL_PROFILE=enroll FACE_PROBE_PROFILE=low_power python assistant.py
+
+Profile keys match face_benchmark.py, so measured settings can be copied in.
+"""
+import os
+
+import cv2
+import face_recognition
+import numpy as np
+
+import face_gate
+from frame_prep import FramePrep, as_rgb
+import metrics
+
+PROFILES = {
+    # Once per person: find small faces, average several jittered encodings
+    "enroll": {"model": "hog", "upsample": 2, "jitters": 10, "landmarks": "large", "scale": 1.0},
+    # Every frame: detect on a half-size image, single pass, 5-point landmarks
+    "probe": {"model": "hog", "upsample": 1, "jitters": 1, "landmarks": "small", "scale": 0.5},
+    # Weak hardware: quarter-size detection, no upsampling
+    "low_power": {"model": "hog", "upsample": 0, "jitters": 1, "landmarks": "small", "scale": 0.25},
+}
+
+ENROLL_PROFILE = os.environ.get("FACE_ENROLL_PROFILE", "enroll")
+PROBE_PROFILE = os.environ.get("FACE_PROBE_PROFILE", "probe")
+
+FACE_HELP = "Time spent in each face recognition stage"
+
+
+def profile_for(role):
+    """(name, settings) of the profile configured for "enroll" or "probe" """
+    name = ENROLL_PROFILE if role == "enroll" else PROBE_PROFILE
+    if name not in PROFILES:
+        print(f"Unknown face profile {name}, using {role}")
+        name = role
+    metrics.gauge("assistant_face_profile_info", "Face profile in use for each role").set(
+        1, role=role, profile=name)
+    return name, PROFILES[name]
+
+
+def _scaled(image, scale):
+    if isinstance(image, FramePrep):
+        return image.small(scale)
+    if scale == 1.0:
+        return image
+    return cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _locate(image, profile):
+    """dlib face locations for a profile, in the coordinates of image"""
+    scale = profile["scale"]
+    locations = face_recognition.face_locations(
+        _scaled(image, scale), number_of_times_to_upsample=profile["upsample"], model=profile["model"])
+    if scale == 1.0:
+        return locations
+    return [tuple(int(round(v / scale)) for v in location) for location in locations]
+
+
+def detect(image, role="probe", overrides=None):
+    """Face locations in image coordinates, detected with the role's profile.
+
+    image is an RGB array or a FramePrep holding a camera frame.
+
+    Live probes go through the OpenCV pre-detector first, so dlib is skipped
+    on frames without a face-like region. overrides can change the profile's
+    "scale" and "upsample", and the "predetector" and its "propose_scale"
+    (e.g. from the governor).
+    """
+    name, profile = profile_for(role)
+    overrides = overrides or {}
+    profile = dict(profile, **{key: overrides[key] for key in ("scale", "upsample") if key in overrides})
+    proposer = None
+    if role == "probe":
+        proposer = face_gate.get_proposer(overrides.get("predetector"), overrides.get("propose_scale"))
+    if proposer is None:
+        with metrics.timed("assistant_face_seconds", FACE_HELP, stage="detect", profile=name):
+            return _locate(image, profile)
+
+    with metrics.timed("assistant_face_seconds", FACE_HELP, stage="propose", profile=name):
+        regions = proposer.propose(image)
+    gate = metrics.counter("assistant_face_gate_total", "Frames by pre-detector outcome")
+    if not regions:
+        gate.inc(result="empty", proposer=proposer.name)
+        return []
+    gate.inc(result="proposed", proposer=proposer.name)
+    with metrics.timed("assistant_face_seconds", FACE_HELP, stage="detect", profile=name):
+        if face_gate.GATE_MODE == "gate":
+            return _locate(image, profile)
+        # Regions are already face-sized, so search them at full resolution
+        regions = face_gate.merge([face_gate.expand(region, image.shape) for region in regions])
+        full_size = dict(profile, scale=1.0)
+        return face_gate.detect_in_regions(
+            as_rgb(image), regions, lambda crop: _locate(np.ascontiguousarray(crop), full_size))
+
+
+def encode(image, locations=None, role="probe"):
+    """Encodings of the faces at locations (all faces if None) with the role's profile"""
+    name, profile = profile_for(role)
+    if locations is None:
+        locations = detect(image, role)
+    with metrics.timed("assistant_face_seconds", FACE_HELP, stage="encode", profile=name):
+        return face_recognition.face_encodings(
+            as_rgb(image), locations, num_jitters=profile["jitters"], model=profile["landmarks"])
@@ -0,0 +1,111 @@
+"""Decide who is in front of the camera from several frames, within a deadline.
+
+Each face seen adds evidence for the closest known identity (more for a
+closer match). Recognition returns as soon as one identity is clearly
+ahead, and gives up with an unknown result when the deadline passes, so
+time-to-decision is bounded instead of "first single-frame match or never".
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import metrics
+
+DEADLINE = 5.0      # Seconds before giving up with an unknown result
+EVIDENCE = 1.5      # Score an identity needs (a perfect match adds 1 per frame)
+MARGIN = 1.0        # How far it must lead the runner-up (or unknown)
+TOLERANCE = 0.6     # face_recognition's match distance
+
+# name is None when nobody known was recognised in time; encoding is the
+# last face seen, for enrolling someone new. unknown is True only when the
+# faces were confidently nobody known; timed_out when no confident answer
+# came before the deadline (name is then None too, even if some faces
+# weakly matched someone)
+Decision = namedtuple("Decision", ["name", "score", "frames", "faces", "seconds", "encoding",
+                                   "unknown", "timed_out"])
+
+
+class Vote:
+    """Accumulates per-identity evidence from face encodings"""
+
+    def __init__(self, known_encodings, known_names, tolerance=TOLERANCE, evidence=EVIDENCE, margin=MARGIN):
+        self.names = list(known_names)
+        self.known = np.asarray(known_encodings, dtype=np.float64) if self.names else None
+        self.tolerance = tolerance
+        self.evidence = evidence
+        self.margin = margin
+        self.scores = {}
+        self.unknown = 0.0      # Evidence that the face is nobody we know
+        self.faces = 0
+        self.last_encoding = None
+
+    def add(self, encodings):
+        for encoding in encodings:
+            self.faces += 1
+            self.last_encoding = encoding
+            if not self.names:
+                self.unknown += 1.0
+                continue
+            distances = np.linalg.norm(self.known - np.asarray(encoding), axis=1)
+            best = int(np.argmin(distances))
+            if distances[best] <= self.tolerance:
+                name = self.names[best]
+                self.scores[name] = self.scores.get(name, 0.0) + 1.0 - distances[best] / self.tolerance
+            else:
+                # Half a vote just past the tolerance, a full one well beyond it
+                self.unknown += min(1.0, 0.5 + (distances[best] - self.tolerance) / self.tolerance)
+
+    def leader(self):
+        """(name, score) of a confidently leading identity, else None"""
+        if not self.scores:
+            return None
+        ranked = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+        name, score = ranked[0]
+        runner_up = max(ranked[1][1] if len(ranked) > 1 else 0.0, self.unknown)
+        if score >= self.evidence and score - runner_up >= self.margin:
+            return name, score
+        return None
+
+    def confidently_unknown(self):
+        """True once the faces seen clearly aren't anybody known"""
+        best = max(self.scores.values()) if self.scores else 0.0
+        return self.unknown >= self.evidence and self.unknown - best >= self.margin
+
+
+def recognize(source, known_encodings, known_names, encode_frame, deadline=DEADLINE,
+              evidence=EVIDENCE, margin=MARGIN, tolerance=TOLERANCE, clock=time.monotonic):
+    """Read frames until an identity wins, the faces are clearly unknown, or the deadline.
+
+    encode_frame(frame) returns the face encodings in a frame, or None to skip it.
+    """
+    vote = Vote(known_encodings, known_names, tolerance, evidence, margin)
+    start = clock()
+    frames = 0
+    winner = None
+    unknown = False
+    while clock() - start < deadline:
+        ok, frame = source.read()
+        if not ok:
+            if getattr(source, "exhausted", False):
+                break
+            continue
+        encodings = encode_frame(frame)
+        if encodings is None:
+            continue
+        frames += 1
+        vote.add(encodings)
+        winner = vote.leader()
+        unknown = not winner and vote.confidently_unknown()
+        if winner or unknown:
+            break
+
+    seconds = clock() - start
+    # Weak matches that never added up are not an identity
+    timed_out = not winner and not unknown
+    name, score = winner if winner else (None, vote.unknown)
+    result = "unknown" if unknown else "timeout" if timed_out else "known"
+    metrics.histogram("assistant_face_decision_seconds", "Time to a face recognition decision").observe(
+        seconds, result=result)
+    print(f"Face decision: {name or 'unknown'} ({result}) after {frames} frames in {seconds * 1000:.0f} ms")
+    return Decision(name, score, frames, vote.faces, seconds, vote.last_encoding, unknown, timed_out)
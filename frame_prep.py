@@ -0,0 +1,88 @@
+"""Per-frame colour conversion and downscaling into reusable buffers.
+
+OpenCV frames are BGR but dlib expects RGB. FramePrep converts each camera
+frame once and derives the downscaled and grayscale copies the detectors
+need on demand, writing into buffers allocated on the first frame. Every
+consumer gets a view of the same buffers, so nothing is converted twice:
+
+    prep = FramePrep()
+    for frame in source:
+        prep.load(frame)
+        face_profiles.detect(prep)      # RGB, downscaled as the profile says
+        frame_source.show(window, prep.bgr)
+
+Buffers are overwritten by the next load(); copy anything kept longer.
+"""
+import cv2
+import numpy as np
+
+
+class FramePrep:
+    def __init__(self):
+        self.bgr = None
+        self._buffers = {}
+        self._fresh = set()    # Buffers already filled from the current frame
+
+    def _buffer(self, key, shape):
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[key] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def load(self, bgr):
+        """Start a new frame; returns self"""
+        self.bgr = bgr
+        self._fresh = set()
+        return self
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def rgb(self):
+        """Full-size RGB copy, for encoding"""
+        buffer = self._buffer("rgb", self.bgr.shape)
+        if "rgb" not in self._fresh:
+            cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=buffer)
+            self._fresh.add("rgb")
+        return buffer
+
+    def small(self, scale):
+        """RGB downscaled by scale, for detection"""
+        if scale == 1.0:
+            return self.rgb
+        key = ("small", scale)
+        size = self._size(scale)
+        buffer = self._buffer(key, (size[1], size[0], 3))
+        if key not in self._fresh:
+            cv2.resize(self.rgb, size, dst=buffer, interpolation=cv2.INTER_AREA)
+            self._fresh.add(key)
+        return buffer
+
+    def _size(self, scale):
+        height, width = self.bgr.shape[:2]
+        return (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+
+    def gray(self, scale=1.0, size=None):
+        """Grayscale at the given scale, or size=(width, height), for the OpenCV
+        pre-detector and motion gate. Made from the BGR frame, so idle frames
+        never pay for the RGB conversion."""
+        size = size or self._size(scale)
+        key = ("gray", size)
+        buffer = self._buffer(key, (size[1], size[0]))
+        if key not in self._fresh:
+            if size == (self.bgr.shape[1], self.bgr.shape[0]):
+                cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY, dst=buffer)
+            else:
+                # Shrink first so the colour conversion runs on the small image
+                small = self._buffer(("bgr", size), (size[1], size[0], 3))
+                cv2.resize(self.bgr, size, dst=small, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=buffer)
+            self._fresh.add(key)
+        return buffer
+
+
+def as_rgb(image):
+    """The RGB pixels of a FramePrep, or an array that is already RGB"""
+    return image.rgb if isinstance(image, FramePrep) else image
@@ -0,0 +1,175 @@
+"""Where face routines get their frames: a camera, a video file or a folder of images.
+
+Sources read like cv2.VideoCapture (read() -> (ok, frame), isOpened(),
+release()), so camera loops can run unattended on recorded footage:
+
+    FRAME_SOURCE=footage/ HEADLESS=1 python test_face.py
+"""
+import os
+import time
+
+import cv2
+
+# Camera index, video file or image directory used when none is given
+DEFAULT_SOURCE = os.environ.get("FRAME_SOURCE", "0")
+# Skip cv2.imshow windows (no display in CI)
+HEADLESS = os.environ.get("HEADLESS", "") not in ("", "0")
+# Deliver recorded frames at their frame rate instead of as fast as possible
+REALTIME = os.environ.get("FRAME_REALTIME", "") not in ("", "0")
+IMAGE_FPS = 10.0       # Nominal frame rate of an image directory
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """Common pacing and frame-rate bookkeeping for all sources.
+
+    live sources (cameras) never run out; recorded ones set exhausted at the
+    end. With realtime=True recorded frames are delivered no faster than
+    their frame rate, like a camera would.
+    """
+
+    live = False
+
+    def __init__(self, fps=None, realtime=False, loop=False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.exhausted = False
+        self.frames_read = 0
+        self._started = None
+
+    def read(self):
+        if self._started is None:
+            self._started = time.perf_counter()
+        if self.realtime and self.fps:
+            due = self._started + self.frames_read / self.fps
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        ok, frame = self._read()
+        if not ok and self.loop and not self.live and self.frames_read:
+            self._rewind()
+            ok, frame = self._read()
+        if ok:
+            self.frames_read += 1
+        elif not self.live:
+            self.exhausted = True
+        return ok, frame
+
+    def frames_per_second(self):
+        """Frames actually delivered per second so far"""
+        if not self._started or not self.frames_read:
+            return 0.0
+        return self.frames_read / max(time.perf_counter() - self._started, 1e-9)
+
+    def __iter__(self):
+        while True:
+            ok, frame = self.read()
+            if ok:
+                yield frame
+            elif self.exhausted:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def isOpened(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def _read(self):
+        raise NotImplementedError
+
+    def _rewind(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    live = True
+
+    def __init__(self, index=0, **kwargs):
+        self.capture = cv2.VideoCapture(index)
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or None
+        # The camera paces itself
+        kwargs["realtime"] = False
+        super().__init__(fps=fps, **kwargs)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+    def _read(self):
+        return self.capture.read()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, **kwargs):
+        self.capture = cv2.VideoCapture(path)
+        kwargs.setdefault("fps", self.capture.get(cv2.CAP_PROP_FPS) or None)
+        super().__init__(**kwargs)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+    def _read(self):
+        return self.capture.read()
+
+    def _rewind(self):
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageDirSource(FrameSource):
+    def __init__(self, path, **kwargs):
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        self._index = 0
+        kwargs.setdefault("fps", IMAGE_FPS)
+        super().__init__(**kwargs)
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def _read(self):
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index])
+            self._index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def _rewind(self):
+        self._index = 0
+
+
+def open_source(spec=None, **kwargs):
+    """A frame source for a camera index, video file or image directory"""
+    spec = DEFAULT_SOURCE if spec is None else spec
+    kwargs.setdefault("realtime", REALTIME)
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), **kwargs)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, **kwargs)
+    return VideoFileSource(spec, **kwargs)
+
+
+def show(window, frame, delay=1):
+    """cv2.imshow + waitKey; returns the key pressed, or -1 when headless"""
+    if HEADLESS:
+        return -1
+    cv2.imshow(window, frame)
+    return cv2.waitKey(delay) & 0xFF
+
+
+def close_windows():
+    if not HEADLESS:
+        cv2.destroyAllWindows()
@@ -0,0 +1,117 @@
+"""Adapts the face recognition loop to the machine it runs on.
+
+The governor times each processed frame and walks a ladder of settings,
+from full-size detection on every frame to small images on every fourth
+frame, until inference fits both the per-frame latency target and the
+share of wall time it may use:
+
+    GOVERNOR_TARGET_MS=150 GOVERNOR_CPU_BUDGET=0.5 python assistant.py
+
+Each level sets knobs that change the cost of the default regions mode:
+the pre-detector, the scale it runs at, dlib's upsampling and the frame
+stride. While the governor runs it owns those; the probe profile
+(FACE_PROBE_PROFILE) still sets dlib's scale on whole frames and the
+encoding settings. Use GOVERNOR=0 to run a profile's settings unchanged.
+"""
+import os
+import time
+
+import metrics
+
+GOVERNOR_ENABLED = os.environ.get("GOVERNOR", "1") not in ("", "0")
+TARGET_MS = float(os.environ.get("GOVERNOR_TARGET_MS", "150"))   # Per processed frame
+CPU_BUDGET = float(os.environ.get("GOVERNOR_CPU_BUDGET", "0.5")) # Share of wall time spent on inference
+SMOOTHING = 0.3       # Weight of the newest measurement in the moving averages
+SETTLE_FRAMES = 8     # Processed frames to wait after a change before the next one
+HEADROOM = 0.6        # Step back up only when this far under both targets
+
+# Cheapest last; "predetector" is a face_gate backend name, "propose_scale"
+# the size it searches at, "upsample" dlib's upsampling of the frame or crops
+LADDER = [
+    {"predetector": "none", "propose_scale": 0.5, "upsample": 1, "stride": 1},
+    {"predetector": "haar", "propose_scale": 0.5, "upsample": 1, "stride": 1},
+    {"predetector": "haar", "propose_scale": 0.5, "upsample": 0, "stride": 1},
+    {"predetector": "haar", "propose_scale": 0.25, "upsample": 0, "stride": 1},
+    {"predetector": "haar", "propose_scale": 0.25, "upsample": 0, "stride": 2},
+    {"predetector": "haar", "propose_scale": 0.25, "upsample": 0, "stride": 4},
+]
+START_LEVEL = 1     # The probe profile's upsampling, behind the pre-detector
+
+
+class Governor:
+    def __init__(self, target_ms=TARGET_MS, cpu_budget=CPU_BUDGET, ladder=LADDER, level=START_LEVEL,
+                 clock=time.perf_counter):
+        self.target_ms = target_ms
+        self.cpu_budget = cpu_budget
+        self.ladder = ladder
+        self.level = min(level, len(ladder) - 1)
+        self.clock = clock
+        self.inference_ms = None    # Moving average per processed frame
+        self.interval_ms = None     # Moving average time between frames from the source
+        self._frames = 0
+        self._last_frame = None
+        self._since_change = 0
+        self._publish()
+
+    @property
+    def settings(self):
+        return self.ladder[self.level]
+
+    def should_process(self):
+        """Call once per frame read; False for frames skipped by the stride"""
+        now = self.clock()
+        if self._last_frame is not None:
+            self.interval_ms = _average(self.interval_ms, (now - self._last_frame) * 1000)
+        self._last_frame = now
+        self._frames += 1
+        return (self._frames - 1) % self.settings["stride"] == 0
+
+    def cpu_share(self):
+        """Estimated share of wall time spent on inference at the current stride"""
+        if not self.inference_ms or not self.interval_ms:
+            return 0.0
+        # Frame intervals already include the time spent processing
+        return min(1.0, self.inference_ms / (self.interval_ms * self.settings["stride"]))
+
+    def record(self, seconds):
+        """Report how long a processed frame took; may change the settings"""
+        self.inference_ms = _average(self.inference_ms, seconds * 1000)
+        self._since_change += 1
+        if self._since_change >= SETTLE_FRAMES:
+            over = self.inference_ms > self.target_ms or self.cpu_share() > self.cpu_budget
+            under = (self.inference_ms < self.target_ms * HEADROOM
+                     and self.cpu_share() < self.cpu_budget * HEADROOM)
+            if over and self.level < len(self.ladder) - 1:
+                self._change(self.level + 1, "down")
+            elif under and self.level > 0:
+                self._change(self.level - 1, "up")
+        self._publish()
+
+    def _change(self, level, direction):
+        print(f"Governor: {self.inference_ms:.0f} ms/frame, {self.cpu_share() * 100:.0f}% CPU -> "
+              f"{direction} to {self.ladder[level]}")
+        self.level = level
+        self._since_change = 0
+        metrics.counter("assistant_governor_changes_total", "Governor quality changes").inc(direction=direction)
+
+    def _publish(self):
+        settings = self.settings
+        gauge = metrics.gauge("assistant_governor_setting", "Current governor decisions")
+        gauge.set(self.level, setting="level")
+        gauge.set(settings["propose_scale"], setting="propose_scale")
+        gauge.set(settings["upsample"], setting="upsample")
+        gauge.set(settings["stride"], setting="stride")
+        gauge.set(self.inference_ms or 0.0, setting="inference_ms")
+        gauge.set(self.cpu_share(), setting="cpu_share")
+        backends = metrics.gauge("assistant_governor_predetector", "Pre-detector chosen by the governor")
+        for backend in {step["predetector"] for step in self.ladder}:
+            backends.set(1 if backend == settings["predetector"] else 0, backend=backend)
+
+
+def _average(current, value):
+    return value if current is None else current + SMOOTHING * (value - current)
+
+
+def create():
+    """A governor with the configured targets, or None if it is turned off"""
+    return Governor() if GOVERNOR_ENABLED else None
@@ -0,0 +1,238 @@
+"""Face inference in worker processes, fed through shared-memory frames.
+
+The capture side copies each frame into a free slot of a ring in shared
+memory and queues only the slot index; a worker process runs the job on
+that slot and sends back a small result tagged with the frame id. Frames
+are never pickled, so throughput scales with the number of workers:
+
+    INFERENCE_WORKERS=3 python assistant.py       # 0 (default) runs inline
+
+Jobs are top-level functions job(frame, *args) so they can be sent to the
+workers. Metrics recorded inside a job stay in the worker process.
+"""
+import atexit
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+import metrics
+from frame_prep import FramePrep
+
+WORKERS = int(os.environ.get("INFERENCE_WORKERS", "0"))   # 0 keeps inference in the capturing thread
+SLOTS_PER_WORKER = 2    # One frame being processed and one waiting, per worker
+
+# tag is whatever the caller passed to submit(), kept in this process
+Result = namedtuple("Result", ["frame_id", "tag", "value", "seconds"])
+
+
+class FrameRing:
+    """Fixed-size frame slots in shared memory; pass name to attach to an existing ring"""
+
+    def __init__(self, shape, slots, dtype=np.uint8, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        size = int(np.prod(self.shape)) * self.dtype.itemsize * slots
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def write(self, slot, frame):
+        np.copyto(self.frames[slot], frame)
+
+    def read(self, slot):
+        """A view of the slot; only valid until the slot is reused"""
+        return self.frames[slot]
+
+    def close(self):
+        self.frames = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+# Set in each worker process by _attach
+_ring = None
+_job = None
+_prep = None
+
+
+def _attach(name, shape, slots, dtype, job):
+    global _ring, _job
+    # The pool provides the parallelism; don't let every worker start a thread per core too
+    cv2.setNumThreads(1)
+    _ring = FrameRing(shape, slots, dtype, name=name)
+    _job = job
+
+
+def _run(slot, args):
+    start = time.perf_counter()
+    value = _job(_ring.read(slot), *args)
+    return value, time.perf_counter() - start
+
+
+class InferencePool:
+    def __init__(self, job, shape, workers=None, slots=None, dtype=np.uint8):
+        self.workers = workers or WORKERS or max(1, (os.cpu_count() or 2) - 1)
+        self.ring = FrameRing(shape, slots or self.workers * SLOTS_PER_WORKER, dtype)
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_attach,
+                                             initargs=(self.ring.name, self.ring.shape, self.ring.slots,
+                                                       self.ring.dtype.str, job))
+        self._free = list(range(self.ring.slots))
+        self._pending = {}      # future -> (frame_id, slot, tag, generation)
+        self._finished = []
+        self._next_id = 0
+        self.broken = False     # A worker died; the pool can't take more frames
+        self.generation = 0     # Bumped by discard(); older results are dropped
+
+    @property
+    def shape(self):
+        return self.ring.shape
+
+    def submit(self, frame, *args, tag=None, block=False):
+        """Copy frame into a free slot and queue the job on it.
+
+        Returns the frame id, or None if every slot was busy and block is False,
+        or if the pool is broken.
+        """
+        if frame.shape != self.ring.shape:
+            raise ValueError(f"Frame shape {frame.shape} doesn't match the ring's {self.ring.shape}")
+        self._collect()
+        if self.broken:
+            return None
+        if not self._free and block:
+            self._collect(wait_for_one=True)
+        if not self._free:
+            metrics.counter("assistant_inference_frames_total", "Frames sent to the inference workers").inc(
+                result="dropped")
+            return None
+
+        slot = self._free.pop()
+        self.ring.write(slot, frame)
+        frame_id = self._next_id
+        self._next_id += 1
+        try:
+            future = self._executor.submit(_run, slot, args)
+        except BrokenProcessPool as e:
+            self._free.append(slot)
+            self._mark_broken(e)
+            return None
+        self._pending[future] = (frame_id, slot, tag, self.generation)
+        metrics.counter("assistant_inference_frames_total", "Frames sent to the inference workers").inc(
+            result="queued")
+        return frame_id
+
+    def results(self, wait_all=False):
+        """Results finished since the last call, oldest frame first"""
+        self._collect(wait_all=wait_all)
+        finished, self._finished = self._finished, []
+        return sorted(finished, key=lambda result: result.frame_id)
+
+    def discard(self):
+        """Forget every queued frame without waiting: cancel what hasn't started,
+        and drop the results of what is already running when they arrive"""
+        self.generation += 1
+        for future in self._pending:
+            future.cancel()
+        self._finished = []
+        self._collect()
+
+    def _collect(self, wait_for_one=False, wait_all=False):
+        if self._pending and (wait_for_one or wait_all):
+            wait(list(self._pending), return_when=ALL_COMPLETED if wait_all else FIRST_COMPLETED)
+        for future in [future for future in self._pending if future.done()]:
+            frame_id, slot, tag, generation = self._pending.pop(future)
+            self._free.append(slot)
+            if future.cancelled() or generation != self.generation:
+                continue
+            try:
+                value, seconds = future.result()
+            except BrokenProcessPool as e:
+                self._mark_broken(e)
+                continue
+            except Exception as e:
+                print(f"Inference failed for frame {frame_id}: {str(e)}")
+                metrics.counter("assistant_inference_frames_total", "Frames sent to the inference workers").inc(
+                    result="failed")
+                continue
+            metrics.histogram("assistant_inference_seconds", "Time a worker spent on one frame").observe(seconds)
+            self._finished.append(Result(frame_id, tag, value, seconds))
+        metrics.gauge("assistant_inference_pending", "Frames queued or running in the workers").set(
+            len(self._pending))
+
+    def _mark_broken(self, error):
+        if not self.broken:
+            print(f"Inference worker died, no more frames for this pool: {str(error)}")
+            metrics.counter("assistant_inference_pool_failures_total", "Inference pools lost to a dead worker").inc()
+        self.broken = True
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._pending.clear()
+        self.ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def encode_faces(frame, overrides=None):
+    """Worker job: face encodings in a BGR camera frame, with the live probe profile"""
+    global _prep
+    # Only the workers need dlib
+    import face_profiles
+    if _prep is None:
+        _prep = FramePrep()
+    _prep.load(frame)
+    locations = face_profiles.detect(_prep, overrides=overrides)
+    return face_profiles.encode(_prep, locations)
+
+
+_pools = {}
+
+
+def get_pool(job, shape):
+    """The shared pool running job on frames of shape, or None if inference runs inline"""
+    if not WORKERS:
+        return None
+    key = (job, tuple(shape))
+    if _pools.get(key) is not None and _pools[key].broken:
+        # A worker crashed (e.g. dlib or the OOM killer); don't keep restarting it
+        _pools[key].close()
+        _pools[key] = None
+        print("Inference workers lost, running inline")
+    if key not in _pools:
+        for old in [old for old in _pools if old[0] is job]:
+            # The camera resolution changed; the old ring is the wrong size
+            pool = _pools.pop(old)
+            if pool:
+                pool.close()
+        try:
+            _pools[key] = InferencePool(job, shape)
+            print(f"Face inference running in {_pools[key].workers} worker processes")
+        except Exception as e:
+            print(f"Inference workers unavailable, running inline: {str(e)}")
+            _pools[key] = None
+    return _pools[key]
+
+
+def close_pools():
+    for pool in _pools.values():
+        if pool:
+            pool.close()
+    _pools.clear()
+
+
+atexit.register(close_pools)
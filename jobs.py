@@ -0,0 +1,128 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 4      # Commands processed at the same time
+MAX_PENDING = 32     # Queued + running jobs before new ones are refused
+MAX_FINISHED = 256   # Finished jobs kept around for polling
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued"""
+
+
+class JobManager:
+    """Run commands on a bounded thread pool and track their progress"""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, max_finished=MAX_FINISHED):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._max_pending = max_pending
+        self._max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def submit(self, fn, *args):
+        """Queue fn(*args, report=...) and return the new job id.
+
+        fn receives a report(stage, **data) callback for progress updates.
+        """
+        with self._cond:
+            if self._active >= self._max_pending:
+                raise JobQueueFull("Too many pending jobs")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "events": [],
+                "result": None,
+                "error": None,
+                "created": time.time(),
+                "finished": None,
+            }
+            self._active += 1
+            self._evict()
+        self._executor.submit(self._run, job_id, fn, args)
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        def report(stage, **data):
+            self._add_event(job_id, stage, data)
+
+        self._update(job_id, status="running")
+        try:
+            result = fn(*args, report=report)
+            self._finish(job_id, "done", result=result)
+        except Exception as e:
+            print(f"Error in job {job_id}: {str(e)}")
+            self._finish(job_id, "failed", error=str(e))
+
+    def _add_event(self, job_id, stage, data):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["events"].append({"stage": stage, "data": data, "time": time.time()})
+                self._cond.notify_all()
+
+    def _update(self, job_id, **fields):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+                self._cond.notify_all()
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._cond:
+            self._active -= 1
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=status, result=result, error=error, finished=time.time())
+                self._cond.notify_all()
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["finished"] is not None]
+        for job_id in finished[:max(0, len(finished) - self._max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot["events"] = list(job["events"])
+            return snapshot
+
+    def stream(self, job_id, heartbeat=15.0):
+        """Yield events as they happen until the job finishes.
+
+        Yields ("event", event) for stage updates, ("heartbeat", None) when
+        nothing happened for `heartbeat` seconds and finally ("end", snapshot).
+        """
+        sent = 0
+        while True:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                if len(job["events"]) == sent and job["finished"] is None:
+                    self._cond.wait(heartbeat)
+                    job = self._jobs.get(job_id)
+                    if job is None:
+                        return
+                new_events = job["events"][sent:]
+                finished = job["finished"] is not None
+            sent += len(new_events)
+            for event in new_events:
+                yield "event", event
+            if finished:
+                yield "end", self.get(job_id)
+                return
+            if not new_events:
+                yield "heartbeat", None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
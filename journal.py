@@ -0,0 +1,270 @@
+"""Interaction journal: one JSON record per turn, appended to requests.jsonl.
+
+Turns are built up on the thread handling them (begin/note/mark/finish) and
+handed to a background writer, so the voice loop never waits on the disk.
+
+    python journal.py analyze [path]   # latency percentiles and intent misses
+"""
+import atexit
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+
+import speech_recognition as sr
+
+import metrics
+
+JOURNAL_ENABLED = True
+JOURNAL_PATH = "requests.jsonl"
+MAX_BYTES = 5 * 1024 * 1024   # Rotate the file once it grows past this
+BACKUP_COUNT = 3              # Rotated files kept as requests.jsonl.1, .2, ...
+FLUSH_INTERVAL = 1.0          # Seconds between disk writes
+MAX_PENDING = 1000            # Records buffered before new ones are dropped
+
+_local = threading.local()
+
+
+class Turn:
+    """One interaction: transcript, intent, slots, result and stage timestamps"""
+
+    def __init__(self, **fields):
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.fields = dict(fields)
+        self.stages = {}   # stage -> milliseconds since the turn began
+
+    def note(self, **fields):
+        self.fields.update(fields)
+
+    def mark(self, stage):
+        """Record when a stage was first reached (slot prompts can repeat stages)"""
+        self.stages.setdefault(stage, round((time.perf_counter() - self._start) * 1000, 1))
+
+    def heard(self, text, nbest):
+        """Record a recognition; later ones in the same turn are slot answers"""
+        if "transcript" not in self.fields:
+            self.note(transcript=text, nbest=nbest)
+        else:
+            self.fields.setdefault("answers", []).append({"transcript": text, "nbest": nbest})
+
+    def record(self):
+        record = {"trace_id": self.trace_id, "time": self.started_at}
+        record.update(self.fields)
+        record["stages"] = self.stages
+        return record
+
+
+class Journal:
+    """Appends records to a JSON-lines file from a background thread"""
+
+    def __init__(self, path=JOURNAL_PATH, max_bytes=MAX_BYTES, backups=BACKUP_COUNT,
+                 flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        """Queue a record; never blocks, drops the record if the buffer is full"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.counter("assistant_journal_dropped_total", "Journal records dropped").inc()
+
+    def close(self, timeout=5.0):
+        """Write out everything queued so far and stop the writer"""
+        self._closed.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            closing = self._closed.wait(self.flush_interval)
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._append(batch)
+                except Exception as e:
+                    print(f"Error writing journal: {str(e)}")
+            if closing:
+                return
+
+    def _append(self, records):
+        data = "".join(json.dumps(r, default=str) + "\n" for r in records)
+        if self.max_bytes and os.path.exists(self.path) and \
+                os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self):
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """The shared journal, started on first use"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal()
+            atexit.register(_journal.close)
+        return _journal
+
+
+def set_journal(sink):
+    """Send records to sink.write() instead (e.g. a replay); returns the previous one"""
+    global _journal
+    with _journal_lock:
+        previous, _journal = _journal, sink
+    return previous
+
+
+def begin(**fields):
+    """Start a turn on this thread and return it"""
+    turn = Turn(**fields)
+    _local.turn = turn
+    return turn
+
+
+def current():
+    """The turn in progress on this thread, if any"""
+    return getattr(_local, "turn", None)
+
+
+def note(**fields):
+    turn = current()
+    if turn is not None:
+        turn.note(**fields)
+
+
+def mark(stage):
+    turn = current()
+    if turn is not None:
+        turn.mark(stage)
+
+
+def heard(text, nbest):
+    turn = current()
+    if turn is not None:
+        turn.heard(text, nbest)
+
+
+def finish(turn=None, **fields):
+    """Close the turn and queue its record for writing"""
+    turn = turn or current()
+    if turn is None:
+        return
+    if current() is turn:
+        _local.turn = None
+    turn.note(**fields)
+    turn.mark("done")
+    if JOURNAL_ENABLED:
+        get_journal().write(turn.record())
+
+
+def recognize(recognizer, audio):
+    """Google recognition keeping the alternatives; returns (text, n-best list)
+
+    Raises sr.UnknownValueError like recognize_google when nothing was heard.
+    """
+    result = recognizer.recognize_google(audio, show_all=True)
+    alternatives = result.get("alternative", []) if isinstance(result, dict) else []
+    nbest = [{"transcript": a.get("transcript", ""), "confidence": a.get("confidence")}
+             for a in alternatives]
+    if not nbest or not nbest[0]["transcript"]:
+        raise sr.UnknownValueError()
+    return nbest[0]["transcript"].lower(), nbest
+
+
+def read_records(path=JOURNAL_PATH):
+    """Records from a journal file, skipping lines that aren't turn records"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "trace_id" in record:
+                records.append(record)
+    return records
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def analyze(records):
+    """Stage latency percentiles and intent-miss rates for a list of records"""
+    durations = {}
+    for record in records:
+        previous = 0.0
+        for stage, at in sorted(record.get("stages", {}).items(), key=lambda item: item[1]):
+            durations.setdefault(stage, []).append(at - previous)
+            previous = at
+        if record.get("stages"):
+            durations.setdefault("total", []).append(max(record["stages"].values()))
+
+    heard = [r for r in records if r.get("transcript")]
+    missed = [r for r in heard if not r.get("intent")]
+    return {
+        "turns": len(records),
+        "not_heard_rate": 1 - len(heard) / len(records) if records else 0.0,
+        "intent_miss_rate": len(missed) / len(heard) if heard else 0.0,
+        "missed_transcripts": [r["transcript"] for r in missed],
+        "stages_ms": {stage: {"count": len(values),
+                              "p50": percentile(values, 0.5),
+                              "p90": percentile(values, 0.9),
+                              "p99": percentile(values, 0.99)}
+                      for stage, values in durations.items()},
+    }
+
+
+def print_report(path=JOURNAL_PATH):
+    report = analyze(read_records(path))
+    print(f"{report['turns']} turns in {path}")
+    print(f"Nothing heard: {report['not_heard_rate'] * 100:.1f}%  "
+          f"Intent misses: {report['intent_miss_rate'] * 100:.1f}%")
+    print(f"{'stage':<14}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for stage, row in sorted(report["stages_ms"].items(), key=lambda item: item[1]["p50"] or 0):
+        print(f"{stage:<14}{row['count']:>7}{row['p50']:>10.1f}{row['p90']:>10.1f}{row['p99']:>10.1f}")
+    for transcript in report["missed_transcripts"][:10]:
+        print(f"  missed: {transcript}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "analyze":
+        print_report(sys.argv[2] if len(sys.argv) > 2 else JOURNAL_PATH)
+    else:
+        print("Usage: python journal.py analyze [path]")
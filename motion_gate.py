@@ -0,0 +1,72 @@
+"""Skip face detection while nothing in front of the camera is moving.
+
+Each frame is shrunk to a small blurred grayscale image and compared with
+the previous one. Detection runs while motion was seen within the cooldown;
+otherwise the frame is skipped and a live loop can sleep between reads.
+"""
+import os
+import time
+
+import cv2
+
+import metrics
+
+MOTION_GATE_ENABLED = os.environ.get("MOTION_GATE", "1") not in ("", "0")
+SENSITIVITY = float(os.environ.get("MOTION_SENSITIVITY", "0.01"))  # Fraction of pixels that must change
+COOLDOWN = float(os.environ.get("MOTION_COOLDOWN", "2.0"))          # Seconds to keep detecting after motion
+PIXEL_THRESHOLD = 25      # Grey-level change that counts as a changed pixel
+GATE_SIZE = (160, 120)    # Frames are compared at this size
+IDLE_INTERVAL = 0.2       # Seconds a live loop sleeps between frames while idle
+
+
+class MotionGate:
+    def __init__(self, sensitivity=SENSITIVITY, cooldown=COOLDOWN, pixel_threshold=PIXEL_THRESHOLD,
+                 size=GATE_SIZE, idle_interval=IDLE_INTERVAL, clock=time.monotonic):
+        self.sensitivity = sensitivity
+        self.cooldown = cooldown
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.idle_interval = idle_interval
+        self.clock = clock
+        self.last_motion = None
+        self.changed = 0.0        # Fraction of pixels changed in the last frame
+        self._previous = None
+
+    def _small(self, frame):
+        small = frame
+        if small.shape[:2] != (self.size[1], self.size[0]):
+            small = cv2.resize(small, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def check(self, frame):
+        """True if the frame should go through face detection.
+
+        frame is a BGR frame, or already gray at self.size (e.g. FramePrep.gray(size=gate.size)).
+        """
+        small = self._small(frame)
+        now = self.clock()
+        if self._previous is None:
+            self.changed = 1.0
+        else:
+            diff = cv2.absdiff(small, self._previous)
+            self.changed = cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255,
+                                                          cv2.THRESH_BINARY)[1]) / diff.size
+        self._previous = small
+        if self.changed >= self.sensitivity:
+            self.last_motion = now
+        active = self.last_motion is not None and now - self.last_motion <= self.cooldown
+        metrics.counter("assistant_motion_frames_total", "Camera frames by motion gate outcome").inc(
+            result="active" if active else "idle")
+        return active
+
+    def idle(self, source=None):
+        """Sleep between reads while idle; recorded footage isn't slowed down"""
+        if source is None or getattr(source, "live", True):
+            time.sleep(self.idle_interval)
+
+
+def create():
+    """A gate with the configured settings, or None if motion gating is off"""
+    return MotionGate() if MOTION_GATE_ENABLED else None
@@ -0,0 +1,252 @@
+"""Replay recorded WAV files through the voice loop without any audio hardware.
+
+Each WAV in the fixture directory is one utterance, played in name order into
+listen(); a .txt file with the same name holds what the scripted recognizer
+"hears" (no .txt means it hears nothing). Speech goes to a null sink, and the
+journal records of every turn are collected for latency figures:
+
+    python replay.py fixtures/ --target assistant --delay 0.4 --realtime
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import threading
+import time
+import wave
+
+import speech_recognition as sr
+
+import journal
+from runtime import Runtime
+
+LEAD_SILENCE = 1.0    # Seconds of silence before each utterance (used up by calibration)
+TRAIL_SILENCE = 1.0   # Seconds after it, so the recognizer hears the phrase end
+
+
+class ReplayFinished(Exception):
+    """Raised by the virtual microphone once every fixture has been played"""
+
+
+def load_fixtures(directory):
+    """[(wav path, transcript or None)] in name order"""
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".wav"):
+            continue
+        path = os.path.join(directory, name)
+        transcript_path = os.path.splitext(path)[0] + ".txt"
+        transcript = None
+        if os.path.exists(transcript_path):
+            with open(transcript_path, encoding="utf-8") as f:
+                transcript = f.read().strip() or None
+        fixtures.append((path, transcript))
+    return fixtures
+
+
+def pad_wav(path, lead=LEAD_SILENCE, trail=TRAIL_SILENCE):
+    """The WAV with silence around it, as an in-memory file"""
+    with wave.open(path, "rb") as src:
+        params = src.getparams()
+        frames = src.readframes(src.getnframes())
+    frame_size = params.sampwidth * params.nchannels
+    out = io.BytesIO()
+    with wave.open(out, "wb") as dst:
+        dst.setparams(params)
+        dst.writeframes(b"\0" * frame_size * int(lead * params.framerate))
+        dst.writeframes(frames)
+        dst.writeframes(b"\0" * frame_size * int(trail * params.framerate))
+    out.seek(0)
+    return out
+
+
+class _PacedStream:
+    """Wraps an AudioFile stream so reads take as long as the audio lasts"""
+
+    def __init__(self, stream, sample_rate):
+        self.stream = stream
+        self.sample_rate = sample_rate
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        if size > 0:
+            time.sleep(size / self.sample_rate)
+        return data
+
+
+class VirtualSource(sr.AudioFile):
+    """An AudioFile that can be read at real-time speed like a microphone"""
+
+    def __init__(self, fileobject, realtime=False):
+        super().__init__(fileobject)
+        self.realtime = realtime
+
+    def __enter__(self):
+        source = super().__enter__()
+        if self.realtime:
+            self.stream = _PacedStream(self.stream, self.SAMPLE_RATE)
+        return source
+
+
+class VirtualMicrophone:
+    """Stands in for sr.Microphone: every open plays the next fixture"""
+
+    def __init__(self, fixtures, realtime=False, on_exhausted=None):
+        self.fixtures = list(fixtures)
+        self.realtime = realtime
+        self.on_exhausted = on_exhausted
+        self.played = 0
+        self.current = None
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            if self.played >= len(self.fixtures):
+                if self.on_exhausted:
+                    self.on_exhausted()
+                raise ReplayFinished("No more recorded utterances")
+            self.current = self.fixtures[self.played]
+            self.played += 1
+        return VirtualSource(pad_wav(self.current[0]), self.realtime)
+
+
+class ScriptedRecognizer(sr.Recognizer):
+    """A Recognizer whose Google call returns scripted transcripts after a delay.
+
+    script() gives the transcript for the current utterance (None for "not
+    understood"); a list is consumed one entry per call instead.
+    """
+
+    def __init__(self, script, delay=0.0):
+        super().__init__()
+        if not callable(script):
+            entries = iter(script)
+            script = lambda: next(entries, None)
+        self.script = script
+        self.delay = delay
+        self.calls = 0
+
+    def recognize_google(self, audio_data, key=None, language="en-US", pfilter=0, show_all=False, **kwargs):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        transcript = self.script()
+        if show_all:
+            return {"alternative": [{"transcript": transcript, "confidence": 0.9}],
+                    "final": True} if transcript else []
+        if not transcript:
+            raise sr.UnknownValueError()
+        return transcript
+
+
+class NullSpeaker:
+    """TTS sink that records what would have been said.
+
+    words_per_second simulates speaking time; None returns immediately.
+    """
+
+    def __init__(self, words_per_second=None):
+        self.words_per_second = words_per_second
+        self.spoken = []
+        self.muted = False
+
+    def __call__(self, text):
+        if self.muted:
+            return False
+        self.spoken.append(text)
+        if self.words_per_second:
+            time.sleep(len(text.split()) / self.words_per_second)
+        return False
+
+
+class Replay:
+    """Drives a module's continuous_listen() from fixtures and collects its journal"""
+
+    def __init__(self, fixtures, target="assistant", delay=0.0, realtime=False, words_per_second=None):
+        self.fixtures = list(fixtures)
+        self.target = target
+        self.runtime = Runtime()
+        self.microphone = VirtualMicrophone(self.fixtures, realtime, on_exhausted=self._finished)
+        self.recognizer = ScriptedRecognizer(self._transcript, delay)
+        self.speaker = NullSpeaker(words_per_second)
+        self.records = []
+        self.seconds = 0.0
+        self._done = False
+
+    def _transcript(self):
+        return self.microphone.current[1] if self.microphone.current else None
+
+    def _finished(self):
+        # Anything after the last fixture is the loop winding down
+        self._done = True
+        self.speaker.muted = True
+        self.runtime.request_shutdown("replay finished")
+
+    def write(self, record):
+        """Journal sink: keep the records of turns that used a fixture"""
+        if not self._done:
+            self.records.append(record)
+
+    def run(self):
+        module = importlib.import_module(self.target)
+        patched = {"microphone_factory": self.microphone, "recognizer": self.recognizer,
+                   "_speak": self.speaker}
+        saved = {name: getattr(module, name) for name in patched}
+        previous_journal = journal.set_journal(self)
+        start = time.perf_counter()
+        try:
+            for name, value in patched.items():
+                setattr(module, name, value)
+            module.continuous_listen(runtime=self.runtime)
+        finally:
+            self.seconds = time.perf_counter() - start
+            for name, value in saved.items():
+                setattr(module, name, value)
+            journal.set_journal(previous_journal)
+        return self.report()
+
+    def report(self):
+        report = journal.analyze(self.records)
+        report["utterances"] = self.microphone.played
+        report["recognizer_calls"] = self.recognizer.calls
+        report["spoken"] = len(self.speaker.spoken)
+        report["wall_seconds"] = round(self.seconds, 3)
+        report["turn_ms"] = [{"transcript": r.get("transcript"), "intent": r.get("intent"),
+                              "stages": r.get("stages", {})} for r in self.records]
+        return report
+
+
+def print_report(report):
+    print(f"{report['turns']} turns from {report['utterances']} utterances "
+          f"in {report['wall_seconds']:.2f} s")
+    print(f"Nothing heard: {report['not_heard_rate'] * 100:.1f}%  "
+          f"Intent misses: {report['intent_miss_rate'] * 100:.1f}%")
+    for turn in report["turn_ms"]:
+        stages = ", ".join(f"{stage} {at:.0f}" for stage, at in turn["stages"].items())
+        print(f"  {turn['transcript']!r} -> {turn['intent']}: {stages}")
+    print(f"{'stage':<14}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for stage, row in sorted(report["stages_ms"].items(), key=lambda item: item[1]["p50"] or 0):
+        print(f"{stage:<14}{row['count']:>7}{row['p50']:>10.1f}{row['p90']:>10.1f}{row['p99']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded utterances through the voice loop")
+    parser.add_argument("fixtures", help="Directory of .wav utterances with matching .txt transcripts")
+    parser.add_argument("--target", default="assistant", choices=["assistant", "app"])
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated recognizer latency in seconds")
+    parser.add_argument("--realtime", action="store_true", help="Play the audio at real-time speed")
+    parser.add_argument("--wps", type=float, default=None, help="Simulated speaking rate in words per second")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    replay = Replay(load_fixtures(args.fixtures), args.target, args.delay, args.realtime, args.wps)
+    report = replay.run()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import atexit
+import os
+import threading
+import time
+
+JOIN_TIMEOUT = 5.0   # Seconds to wait for each worker thread on shutdown
+
+# Blocking lock waits can't be interrupted by Ctrl+C on Windows, so the main
+# thread wakes up once a second there; elsewhere it sleeps until signalled
+_MAIN_WAIT = 1.0 if os.name == "nt" else None
+
+
+class Runtime:
+    """Owns the worker threads and coordinates a clean shutdown.
+
+    Any thread can call request_shutdown(); the main thread blocks in wait()
+    on an event (no polling), runs the shutdown hooks and joins the workers.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._threads = []
+        self._hooks = []
+        self._lock = threading.Lock()
+        self.reason = None
+        self.shutdown_requested_at = None
+        global _current
+        _current = self
+
+    @property
+    def stopping(self):
+        return self._stop.is_set()
+
+    def spawn(self, name, target, *args):
+        """Start a worker thread; an uncaught error in it shuts everything down"""
+        def run():
+            try:
+                target(*args)
+            except Exception as e:
+                print(f"Error in {name} thread: {str(e)}")
+                self.request_shutdown(f"{name} failed")
+
+        thread = threading.Thread(target=run, name=name, daemon=True)
+        with self._lock:
+            self._threads.append(thread)
+        thread.start()
+        return thread
+
+    def on_shutdown(self, hook):
+        """Call hook() from the requesting thread once shutdown is requested"""
+        with self._lock:
+            self._hooks.append(hook)
+
+    def request_shutdown(self, reason="requested"):
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self.reason = reason
+            self.shutdown_requested_at = time.perf_counter()
+            self._stop.set()
+            hooks = list(self._hooks)
+        print(f"Shutting down ({reason})")
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"Error in shutdown hook: {str(e)}")
+
+    def sleep(self, seconds):
+        """Sleep that ends early on shutdown; returns True if shutting down"""
+        return self._stop.wait(seconds)
+
+    def wait(self):
+        """Block until shutdown is requested, then join the workers"""
+        try:
+            while not self._stop.wait(_MAIN_WAIT):
+                pass
+        except KeyboardInterrupt:
+            self.request_shutdown("interrupted")
+        self.shutdown()
+
+    def shutdown(self):
+        self.request_shutdown()
+        with self._lock:
+            threads = list(self._threads)
+        current = threading.current_thread()
+        for thread in threads:
+            if thread is not current:
+                thread.join(JOIN_TIMEOUT)
+                if thread.is_alive():
+                    print(f"Thread {thread.name} did not stop in time")
+        print(f"Shutdown completed in {self.elapsed() * 1000:.0f} ms")
+
+    def elapsed(self):
+        """Seconds since shutdown was requested"""
+        if self.shutdown_requested_at is None:
+            return 0.0
+        return time.perf_counter() - self.shutdown_requested_at
+
+
+# The most recent Runtime; one exit hook reports on it, however many were made
+_current = None
+
+
+def _report_exit():
+    runtime = _current
+    if runtime is not None and runtime.shutdown_requested_at is not None:
+        print(f"Process exit {runtime.elapsed() * 1000:.0f} ms after shutdown request ({runtime.reason})")
+
+
+atexit.register(_report_exit)
@@ -0,0 +1,126 @@
+"""Production serving for the Flask app: no debugger, no reloader.
+
+One process serves requests on threads by default. With workers > 1 (POSIX
+only) the parent loads everything once, opens the listening socket and then
+forks, so workers share the loaded gallery and models copy-on-write.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+
+from werkzeug.serving import make_server
+
+SHUTDOWN_SIGNALS = [signal.SIGINT, signal.SIGTERM]
+
+# Stops whatever serve() is currently running; replaced once serving starts
+_stop = None
+
+
+def worker_count(text):
+    """argparse type for --workers: a whole number of processes, at least 1"""
+    try:
+        workers = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a number of workers")
+    if workers < 1:
+        raise argparse.ArgumentTypeError("at least one worker is needed")
+    return workers
+
+
+def stop():
+    """Ask the running server to shut down gracefully (callable from any thread)"""
+    if _stop is not None:
+        _stop(None, None)
+
+
+def _serve_one(app, host, port, threaded, fd=None, on_ready=None):
+    """Serve until SIGINT/SIGTERM, then stop accepting and return"""
+    global _stop
+    server = make_server(host, port, app, threaded=threaded, fd=fd)
+
+    def shutdown(signum, frame):
+        # shutdown() waits for serve_forever to exit, so it can't run on the
+        # thread that is serving
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    _stop = shutdown
+    for sig in SHUTDOWN_SIGNALS:
+        signal.signal(sig, shutdown)
+    if on_ready:
+        on_ready()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return server
+
+
+def serve(app, host="127.0.0.1", port=5000, workers=1, threaded=True, on_ready=None, on_shutdown=None):
+    """Serve app until a shutdown signal or stop(), then call on_shutdown().
+
+    on_ready() runs in the serving (parent) process once workers are forked;
+    start background threads there rather than before serve(), since fork()
+    only copies the calling thread.
+    """
+    if workers > 1 and not hasattr(os, "fork"):
+        print("Multiple workers need fork(); serving from one threaded process instead")
+        workers = 1
+
+    try:
+        if workers <= 1:
+            print(f"Serving on http://{host}:{port} ({'threaded' if threaded else 'single-threaded'})")
+            _serve_one(app, host, port, threaded, on_ready=on_ready)
+        else:
+            _serve_forked(app, host, port, workers, threaded, on_ready)
+    finally:
+        if on_shutdown:
+            on_shutdown()
+
+
+def _serve_forked(app, host, port, workers, threaded, on_ready):
+    global _stop
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    print(f"Serving on http://{host}:{port} with {workers} workers")
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve_one(app, host, port, threaded, fd=sock.fileno())
+            except Exception as e:
+                print(f"Worker {os.getpid()} failed: {str(e)}")
+                code = 1
+            finally:
+                os._exit(code)
+        children.append(pid)
+    sock.close()
+
+    def shutdown(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    _stop = shutdown
+    for sig in SHUTDOWN_SIGNALS:
+        signal.signal(sig, shutdown)
+    if on_ready:
+        on_ready()
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class Startup:
+    """Runs independent startup steps concurrently and times them.
+
+    Steps start as soon as they are added; wait() blocks only on the steps a
+    caller actually needs, so e.g. listening can begin while the face gallery
+    is still loading. Steps that must stay on the calling thread (e.g. a TTS
+    driver with thread affinity) go through run() instead of add().
+    """
+
+    def __init__(self, max_workers=4):
+        self.started = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self._futures = {}
+        self.timings = {}    # step -> seconds it took
+        self.marks = {}      # milestone -> seconds since start
+
+    def add(self, name, fn, *args):
+        """Start a step on a pool thread"""
+        self._futures[name] = self._executor.submit(self._timed, name, fn, *args)
+
+    def run(self, name, fn, *args):
+        """Run a step on the calling thread; wait() and done() see it like any other"""
+        future = Future()
+        try:
+            future.set_result(self._timed(name, fn, *args))
+        except Exception as e:
+            future.set_exception(e)
+        self._futures[name] = future
+
+    def _timed(self, name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+            print(f"Startup: {name} finished in {self.timings[name] * 1000:.0f} ms")
+
+    def wait(self, *names, timeout=None):
+        """Results of the named steps; a failed step returns None"""
+        results = []
+        for name in names:
+            try:
+                results.append(self._futures[name].result(timeout))
+            except Exception as e:
+                print(f"Startup step {name} failed: {str(e)}")
+                results.append(None)
+        return results[0] if len(results) == 1 else results
+
+    def done(self, name):
+        return self._futures[name].done()
+
+    def mark(self, milestone):
+        """Record a milestone such as the first listen"""
+        self.marks[milestone] = time.perf_counter() - self.started
+        print(f"Startup: {milestone} after {self.marks[milestone] * 1000:.0f} ms")
+
+    def finish(self):
+        """Let background steps complete and release the threads"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,101 @@
+import speech_recognition as sr
+from fastapi.testclient import TestClient
+
+import asgi_app
+
+SECOND = 16000 * 2      # Bytes of 16 kHz 16-bit audio
+
+
+def receive_until(ws, kind):
+    """Messages up to and including the first of the given type; binary frames are skipped"""
+    messages = []
+    while True:
+        message = ws.receive()
+        if message.get("text") is None:
+            continue
+        data = asgi_app.json_message(message["text"])
+        messages.append(data)
+        if data["type"] == kind:
+            return messages
+
+
+def stub(monkeypatch, recognize):
+    calls = []
+
+    def recognize_stub(pcm, sample_rate, sample_width):
+        calls.append(len(pcm))
+        return recognize(pcm)
+
+    monkeypatch.setattr(asgi_app, "recognize", recognize_stub)
+    monkeypatch.setattr(asgi_app, "synthesize_chunks", lambda text: iter([b"mp3-1", b"mp3-2"]))
+    return calls
+
+
+def test_text_command_gets_a_result_and_speech(monkeypatch):
+    stub(monkeypatch, lambda pcm: "")
+    with TestClient(asgi_app.app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "text", "command": "Tell me the time"})
+        result = receive_until(ws, "result")[-1]
+        assert result["intent"] == "time"
+        assert ws.receive_json() == {"type": "audio_start", "format": "mp3"}
+        assert ws.receive_bytes() == b"mp3-1"
+        assert ws.receive_bytes() == b"mp3-2"
+        assert ws.receive_json() == {"type": "audio_end"}
+
+
+def test_bad_start_values_are_reported_without_closing(monkeypatch):
+    stub(monkeypatch, lambda pcm: "")
+    with TestClient(asgi_app.app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "start", "sample_rate": "fast"})
+        assert "integers" in ws.receive_json()["message"]
+        ws.send_json({"type": "start", "sample_rate": 16000, "sample_width": 3})
+        assert "sample_width" in ws.receive_json()["message"]
+        ws.send_json({"type": "text", "command": "tell me the time"})
+        assert receive_until(ws, "result")[-1]["intent"] == "time"
+
+
+def test_unrecognized_speech_keeps_the_socket(monkeypatch):
+    def not_understood(pcm):
+        raise sr.UnknownValueError()
+
+    stub(monkeypatch, not_understood)
+    with TestClient(asgi_app.app).websocket_connect("/ws") as ws:
+        ws.send_bytes(bytes(SECOND))
+        ws.send_json({"type": "end"})
+        messages = receive_until(ws, "result")
+        assert {"type": "final", "text": ""} in messages
+        assert "didn't hear" in messages[-1]["response"]
+
+
+def test_partials_are_opt_in_and_cover_the_utterance_so_far(monkeypatch):
+    calls = stub(monkeypatch, lambda pcm: "what time")
+    with TestClient(asgi_app.app).websocket_connect("/ws") as ws:
+        for _ in range(3):
+            ws.send_bytes(bytes(SECOND))
+        ws.send_json({"type": "end"})
+        assert [m["type"] for m in receive_until(ws, "result")] == ["final", "result"]
+        assert calls == [3 * SECOND]
+
+    del calls[:]
+    with TestClient(asgi_app.app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "start", "partials": True})
+        for _ in range(3):
+            ws.send_bytes(bytes(SECOND))
+            assert receive_until(ws, "partial")[-1]["text"] == "what time"
+        ws.send_json({"type": "end"})
+        receive_until(ws, "result")
+    # Each partial covers the utterance so far, superseding the previous one
+    assert calls == [SECOND, 2 * SECOND, 3 * SECOND, 3 * SECOND]
+
+
+def test_partials_are_capped_to_the_latest_window(monkeypatch):
+    calls = stub(monkeypatch, lambda pcm: "what time")
+    monkeypatch.setattr(asgi_app, "MAX_PARTIAL_WINDOW", 2.0)
+    with TestClient(asgi_app.app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "start", "partials": True})
+        for _ in range(4):
+            ws.send_bytes(bytes(SECOND))
+            receive_until(ws, "partial")
+        ws.send_json({"type": "end"})
+        receive_until(ws, "result")
+    assert calls == [SECOND, 2 * SECOND, 2 * SECOND, 2 * SECOND, 4 * SECOND]
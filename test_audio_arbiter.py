@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from audio_arbiter import (AudioArbiter, AudioBusy, AudioTimeout,
+                           PRIORITY_INTERACTIVE, PRIORITY_NOTIFICATION)
+
+
+def test_requests_never_overlap():
+    """Calls from many threads run one at a time"""
+    arbiter = AudioArbiter()
+    active = []
+    overlaps = []
+
+    def use_device():
+        active.append(1)
+        if len(active) > 1:
+            overlaps.append(1)
+        time.sleep(0.01)
+        active.pop()
+
+    threads = [threading.Thread(target=arbiter.run, args=(use_device,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not overlaps
+    assert arbiter.stats()["completed"] == 8
+    arbiter.stop()
+
+
+def test_interactive_requests_go_first():
+    arbiter = AudioArbiter()
+    release = threading.Event()
+    order = []
+
+    blocker = arbiter.submit(release.wait)
+    time.sleep(0.05)
+    notification = arbiter.submit(order.append, "notification", priority=PRIORITY_NOTIFICATION)
+    prompt = arbiter.submit(order.append, "prompt", priority=PRIORITY_INTERACTIVE)
+    assert arbiter.stats()["queue_depth"] == 2
+    release.set()
+    for future in (blocker, notification, prompt):
+        future.result(timeout=1)
+
+    assert order == ["prompt", "notification"]
+    arbiter.stop()
+
+
+def test_admission_control_and_timeout():
+    arbiter = AudioArbiter(max_queue=1, queue_timeout=0.05)
+    release = threading.Event()
+    arbiter.submit(release.wait)
+    time.sleep(0.05)
+
+    with pytest.raises(AudioTimeout):
+        arbiter.run(print, "late")
+    arbiter.submit(print, "queued")
+    with pytest.raises(AudioBusy):
+        arbiter.submit(print, "rejected")
+
+    release.set()
+    arbiter.stop()
+    stats = arbiter.stats()
+    assert stats["timed_out"] == 1
+    assert stats["rejected"] == 1
+    assert stats["wait_seconds_max"] > 0
+
+
+def test_nested_calls_run_inline():
+    """speak() inside listen() must not deadlock on the worker"""
+    arbiter = AudioArbiter()
+    assert arbiter.run(lambda: arbiter.run(lambda: "inner")) == "inner"
+    arbiter.stop()
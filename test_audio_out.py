@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+import audio_out
+from audio_out import BLOCK_FRAMES, PcmPlayer
+
+# One silent MPEG-2 Layer III frame: 24 kHz mono 32 kbit/s, 96 bytes, 576 samples
+SILENT_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC0]) + bytes(92)
+
+
+class FakeStream:
+    def __init__(self, on_write=None):
+        self.blocks = []
+        self.on_write = on_write
+        self.closed = False
+
+    def write(self, data):
+        self.blocks.append(bytes(data))
+        if self.on_write:
+            self.on_write(len(self.blocks))
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_decodes_mp3_in_process():
+    pytest.importorskip("miniaudio")
+    pcm = audio_out.decode_mp3(SILENT_FRAME * 10)
+    assert len(pcm) == 10 * 576 * 2
+    assert not any(pcm)
+
+
+def test_falls_back_to_ffmpeg(monkeypatch):
+    calls = []
+
+    class Result:
+        stdout = b"\x01\x00" * 4
+
+    def run(args, input=None, **kwargs):
+        calls.append((args, input))
+        return Result()
+
+    monkeypatch.setattr(audio_out, "miniaudio", None)
+    monkeypatch.setattr(audio_out.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(audio_out.subprocess, "run", run)
+    assert audio_out.decode_mp3(b"mp3", sample_rate=16000) == b"\x01\x00" * 4
+    args, data = calls[0]
+    assert data == b"mp3" and args[0] == "/usr/bin/ffmpeg" and "16000" in args
+
+
+def test_repeated_text_is_decoded_once(monkeypatch):
+    decoded = []
+
+    class FakeTTS:
+        def __init__(self, text, lang):
+            self.text = text
+
+        def write_to_fp(self, fp):
+            fp.write(self.text.encode())
+
+    monkeypatch.setattr(audio_out, "gTTS", FakeTTS)
+    monkeypatch.setattr(audio_out, "decode_mp3", lambda data: decoded.append(data) or data * 2)
+    monkeypatch.setattr(audio_out, "_cache", audio_out.OrderedDict())
+    assert audio_out.synthesize_pcm("hello") == b"hellohello"
+    assert audio_out.synthesize_pcm("hello") == b"hellohello"
+    assert decoded == [b"hello"]
+
+
+def test_player_writes_blocks_to_one_stream():
+    stream = FakeStream()
+    player = PcmPlayer(stream=stream)
+    pcm = bytes(BLOCK_FRAMES * 2 * 3 + 10)
+    assert player.play(pcm)
+    assert player.play(pcm)
+    assert [len(block) for block in stream.blocks[:4]] == [BLOCK_FRAMES * 2] * 3 + [10]
+    assert b"".join(stream.blocks) == pcm * 2
+    player.close()
+    assert stream.closed
+
+
+def test_player_stops_when_cancelled():
+    cancel = threading.Event()
+    stream = FakeStream(on_write=lambda count: count == 2 and cancel.set())
+    player = PcmPlayer(stream=stream)
+    assert not player.play(bytes(BLOCK_FRAMES * 2 * 10), cancel=cancel)
+    assert len(stream.blocks) == 2
@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+import speech_recognition as sr
+
+import audio_preprocess
+from audio_preprocess import TARGET_RATE, preprocess, resample, trim_silence
+
+
+def tone(seconds, rate, amplitude=8000, hz=440):
+    t = np.arange(int(seconds * rate)) / rate
+    return np.sin(2 * np.pi * hz * t) * amplitude
+
+
+def reset_stats(monkeypatch):
+    monkeypatch.setattr(audio_preprocess, "stats", {
+        "calls": 0, "bytes_in": 0, "bytes_out": 0, "preprocess_seconds": 0.0,
+        "recognitions": {True: [0, 0.0], False: [0, 0.0]},
+    })
+
+
+def test_resample_keeps_duration_and_pitch():
+    samples = resample(tone(1.0, 44100), 44100)
+    assert len(samples) == TARGET_RATE
+    spectrum = np.abs(np.fft.rfft(samples))
+    assert abs(np.argmax(spectrum) - 440) <= 1
+    assert resample(samples, TARGET_RATE) is samples
+
+
+def test_trim_keeps_speech_and_padding():
+    quiet = np.zeros(TARGET_RATE)
+    samples = np.concatenate([quiet, tone(0.5, TARGET_RATE), quiet])
+    trimmed = trim_silence(samples, TARGET_RATE)
+    pad = TARGET_RATE * audio_preprocess.PADDING_MS // 1000
+    assert abs(len(trimmed) - (TARGET_RATE // 2 + 2 * pad)) <= TARGET_RATE * audio_preprocess.FRAME_MS // 1000
+    assert trim_silence(quiet, TARGET_RATE) is None
+
+
+
+def test_clip_that_starts_with_speech_is_kept(monkeypatch):
+    """Barge-in and push-to-talk clips have no leading silence to learn a noise floor from"""
+    reset_stats(monkeypatch)
+    samples = np.concatenate([tone(1.0, TARGET_RATE, hz=220), np.zeros(TARGET_RATE // 2)])
+    trimmed = trim_silence(samples, TARGET_RATE)
+    pad = TARGET_RATE * audio_preprocess.PADDING_MS // 1000
+    assert abs(len(trimmed) - (TARGET_RATE + pad)) <= TARGET_RATE * audio_preprocess.FRAME_MS // 1000
+    audio = preprocess(sr.AudioData(samples.astype(np.int16).tobytes(), TARGET_RATE, 2))
+    assert audio is not None
+
+def test_preprocess_converts_to_16_khz_16_bit(monkeypatch):
+    reset_stats(monkeypatch)
+    quiet = np.zeros(44100)
+    samples = np.concatenate([quiet, tone(0.5, 44100), quiet]).astype(np.int16)
+    audio = preprocess(sr.AudioData(samples.tobytes(), 44100, 2))
+    assert audio.sample_rate == TARGET_RATE and audio.sample_width == 2
+    assert len(audio.get_raw_data()) < TARGET_RATE * 2
+    assert audio_preprocess.stats["calls"] == 1
+    assert audio_preprocess.stats["bytes_out"] == len(audio.get_raw_data())
+    assert preprocess(sr.AudioData(bytes(4000), 16000, 2)) is None
+
+
+def test_preprocess_can_be_skipped_per_call():
+    audio = sr.AudioData(bytes(4000), 16000, 2)
+    assert preprocess(audio, enabled=False) is audio
+
+
+def test_ab_testing_alternates_and_records_both_modes(monkeypatch):
+    reset_stats(monkeypatch)
+    monkeypatch.setattr(audio_preprocess, "AB_TEST", True)
+    modes = [audio_preprocess.next_mode() for _ in range(4)]
+    assert sorted(modes) == [False, False, True, True]
+    assert modes[0] != modes[1]
+    for mode in modes:
+        audio_preprocess.log_recognition(0.5 if mode else 1.0, mode)
+    assert audio_preprocess.stats["recognitions"] == {True: [2, 1.0], False: [2, 2.0]}
+
+
+def test_stats_are_safe_across_threads(monkeypatch):
+    reset_stats(monkeypatch)
+
+    def record():
+        for _ in range(500):
+            audio_preprocess.log_recognition(0.001, True)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert audio_preprocess.stats["recognitions"][True][0] == 4000
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+import barge_in
+from barge_in import BargeInWatch
+
+FRAME = barge_in.SAMPLE_RATE * barge_in.FRAME_MS // 1000
+
+
+def frame(amplitude, marker):
+    samples = (np.sin(np.arange(FRAME) / 3.0) * amplitude).astype(np.int16)
+    samples[0] = marker
+    return samples.tobytes()
+
+
+class FakeStream:
+    """Quiet frames, then the user talking; frames are numbered in their first sample"""
+
+    def __init__(self, quiet=20, loud=200):
+        self.frames = [frame(50, i) for i in range(quiet)] + [frame(6000, quiet + i) for i in range(loud)]
+
+    def read(self, frames, exception_on_overflow=True):
+        time.sleep(0.001)
+        return self.frames.pop(0) if self.frames else frame(0, -1)
+
+
+def markers(pcm):
+    return [int(np.frombuffer(pcm[i:i + FRAME * 2], dtype=np.int16)[0]) for i in range(0, len(pcm), FRAME * 2)]
+
+
+def test_monitor_stops_playback_and_keeps_the_interrupting_speech():
+    barge_in.take_pending()
+    stopped = threading.Event()
+    with BargeInWatch(stopped.set, stream=FakeStream()) as watch:
+        assert stopped.wait(2.0)
+        time.sleep(0.05)    # Playback takes a moment to stop
+    assert watch.triggered.is_set()
+    captured = markers(barge_in.take_pending())
+    # Starts before the trigger (pre-roll) and carries on after it, without gaps
+    assert captured[0] < 20 + barge_in.SPEECH_FRAMES - 1
+    assert captured == list(range(captured[0], captured[0] + len(captured)))
+    assert captured[-1] > 20 + barge_in.SPEECH_FRAMES
+    assert barge_in.take_pending() is None
+
+
+def test_quiet_playback_leaves_nothing_pending():
+    barge_in.take_pending()
+    with BargeInWatch(lambda: None, stream=FakeStream(quiet=100, loud=0)) as watch:
+        time.sleep(0.05)
+    assert not watch.triggered.is_set()
+    assert barge_in.take_pending() is None
+
+
+class FakeRecognizer:
+    def __init__(self, audio=None):
+        self.audio = audio
+        self.timeouts = []
+
+    def listen(self, source, timeout=None, phrase_time_limit=None):
+        self.timeouts.append(timeout)
+        if self.audio is None:
+            raise sr.WaitTimeoutError()
+        return self.audio
+
+
+def test_listen_prefixes_the_captured_speech():
+    barge_in.set_pending(b"\x01\x00" * 10)
+    recognizer = FakeRecognizer(sr.AudioData(b"\x02\x00" * 5, barge_in.SAMPLE_RATE, 2))
+    audio = barge_in.listen(recognizer, None, timeout=15)
+    assert audio.get_raw_data() == b"\x01\x00" * 10 + b"\x02\x00" * 5
+    assert recognizer.timeouts == [barge_in.CONTINUE_TIMEOUT]
+
+
+def test_listen_uses_the_captured_speech_alone_if_the_user_stopped():
+    barge_in.set_pending(b"\x01\x00" * 10)
+    audio = barge_in.listen(FakeRecognizer(), None, timeout=15)
+    assert audio.get_raw_data() == b"\x01\x00" * 10
+
+
+def test_listen_without_a_barge_in_is_unchanged():
+    barge_in.take_pending()
+    recognizer = FakeRecognizer(sr.AudioData(b"\x02\x00", barge_in.SAMPLE_RATE, 2))
+    assert barge_in.listen(recognizer, None, timeout=15) is recognizer.audio
+    assert recognizer.timeouts == [15]
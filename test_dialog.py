@@ -0,0 +1,61 @@
+import os
+
+from dialog import DialogEngine
+
+
+def match(command):
+    if "search file" in command:
+        return "search_file"
+    if "search google" in command:
+        return "google_search"
+    if "time" in command:
+        return "time"
+    return None
+
+
+def test_complete_command():
+    engine = DialogEngine(match)
+    reply = engine.start("what time is it")
+
+    assert reply.need_slot is None
+    assert reply.response.startswith("The time is")
+
+
+def test_unknown_command():
+    reply = DialogEngine(match).start("make me a sandwich")
+    assert reply.response == "I didn't understand. Please try again."
+
+
+def test_missing_slot_returns_continuation(tmp_path, monkeypatch):
+    """A slot is asked for in the reply instead of listening on the server"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    (tmp_path / "Documents").mkdir()
+    (tmp_path / "Documents" / "notes.txt").write_text("buy milk and eggs", encoding="utf-8")
+    engine = DialogEngine(match)
+
+    reply = engine.start("search file")
+    assert reply.need_slot == "file_name"
+    reply = engine.answer(reply.session_id, "notes")
+    assert reply.need_slot == "keyword"
+    reply = engine.answer(reply.session_id, "milk")
+
+    assert reply.need_slot is None
+    assert reply.response == "Found matches: milk"
+
+
+def test_sessions_are_independent():
+    """Two clients can be mid-dialog at the same time"""
+    engine = DialogEngine(match)
+    first = engine.start("search google for")
+    second = engine.start("search google for")
+
+    assert first.session_id != second.session_id
+    assert engine.answer(second.session_id, "").response == "I couldn't understand your search query."
+    assert engine.answer(first.session_id, "").response == "I couldn't understand your search query."
+
+
+def test_expired_session():
+    engine = DialogEngine(match, session_timeout=-1)
+    reply = engine.start("search google for")
+    assert engine.answer(reply.session_id, "cats").session_id is None
@@ -1,12 +1,16 @@
+import argparse
 import cv2
 import os
 import time
 import face_recognition
+import frame_source
+from frame_prep import FramePrep
+import motion_gate
 
-def test_camera():
+def test_camera(source=None):
     """Test if camera is working"""
     print("Opening camera...")
-    cap = cv2.VideoCapture(0)
+    cap = frame_source.open_source(source)
     if not cap.isOpened():
         print("Error: Could not open camera")
         return False
@@ -33,49 +37,68 @@ def test_camera():
     print(f"Saved test image to {test_image_path}")
     
     # Show the image for a few seconds
-    cv2.imshow('Camera Test', frame)
-    cv2.waitKey(3000)  # Wait for 3 seconds
+    frame_source.show('Camera Test', frame, 3000)  # Wait for 3 seconds
     
     # Clean up
     cap.release()
-    cv2.destroyAllWindows()
+    frame_source.close_windows()
     
     print("Camera test: Success")
     return True
 
-def test_face_detection():
+def test_face_detection(source=None, max_frames=None):
     """Test if face detection is working with live preview"""
     print("\nStarting face detection test...")
     print("This will show a live preview with face detection.")
     print("Press 'q' to quit or 's' to save when your face is detected.")
     
-    cap = cv2.VideoCapture(0)
+    cap = frame_source.open_source(source)
     if not cap.isOpened():
         print("Error: Could not open camera")
         return False
     
     face_found = False
     saved_image = False
+    frames_with_faces = 0
+    frames_detected = 0
+    detect_seconds = 0.0
+    motion = motion_gate.create()
+    prep = FramePrep()
     
-    while True:
+    while max_frames is None or cap.frames_read < max_frames:
         ret, frame = cap.read()
         if not ret:
-            print("Error: Could not read frame from camera")
+            if not cap.exhausted:
+                print("Error: Could not read frame from camera")
             break
         
+        # dlib wants RGB; annotations are still drawn on the BGR frame
+        prep.load(frame)
+        
+        # Skip detection while the scene is static
+        if motion and not motion.check(prep.gray(size=motion.size)):
+            if frame_source.show('Face Detection Test', frame) == ord('q'):
+                break
+            motion.idle(cap)
+            continue
+        
         # Find faces in the frame
-        face_locations = face_recognition.face_locations(frame)
+        start = time.perf_counter()
+        face_locations = face_recognition.face_locations(prep.rgb)
+        detect_seconds += time.perf_counter() - start
+        frames_detected += 1
+        if face_locations:
+            frames_with_faces += 1
         
         # Draw rectangles around faces
         for (top, right, bottom, left) in face_locations:
             cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
             face_found = True
         
-        # Display the resulting frame
-        cv2.imshow('Face Detection Test', frame)
-        
-        # Handle key presses
-        key = cv2.waitKey(1) & 0xFF
+        # Display the resulting frame and handle key presses
+        key = frame_source.show('Face Detection Test', frame)
+        if frame_source.HEADLESS and max_frames is None and face_found and cap.live:
+            break
         if key == ord('q'):
             break
         elif key == ord('s') and face_found:
@@ -89,8 +112,12 @@ def test_face_detection():
     
     # Clean up
     cap.release()
-    cv2.destroyAllWindows()
+    frame_source.close_windows()
     
+    if cap.frames_read:
+        print(f"Detection: {cap.frames_read} frames, {frames_detected} checked for faces, "
+              f"faces in {frames_with_faces}, "
+              f"{frames_detected / max(detect_seconds, 1e-9):.1f} detections/sec")
     if face_found:
         print("Face detection test: Success")
         if not saved_image:
@@ -100,7 +127,7 @@ def test_face_detection():
         print("Face detection test: No faces found")
         return False
 
-def test_face_recognition():
+def test_face_recognition(source=None, max_frames=None):
     """Test if face recognition is working with a saved face"""
     print("\nStarting face recognition test...")
     print("This will compare your face with a previously saved face.")
@@ -122,71 +149,108 @@ def test_face_recognition():
     
     known_face_encoding = known_face_encodings[0]
     
-    cap = cv2.VideoCapture(0)
+    cap = frame_source.open_source(source)
     if not cap.isOpened():
         print("Error: Could not open camera")
         return False
     
-    while True:
+    start = time.perf_counter()
+    time_to_identify = None
+    motion = motion_gate.create()
+    prep = FramePrep()
+    while max_frames is None or cap.frames_read < max_frames:
         ret, frame = cap.read()
         if not ret:
-            print("Error: Could not read frame from camera")
+            if not cap.exhausted:
+                print("Error: Could not read frame from camera")
             break
         
+        # dlib wants RGB; annotations are still drawn on the BGR frame
+        prep.load(frame)
+        
+        # Skip detection while the scene is static
+        if motion and not motion.check(prep.gray(size=motion.size)):
+            if frame_source.show('Face Recognition Test', frame) == ord('q'):
+                break
+            motion.idle(cap)
+            continue
+        
         # Find faces in the current frame
-        face_locations = face_recognition.face_locations(frame)
-        face_encodings = face_recognition.face_encodings(frame, face_locations)
+        face_locations = face_recognition.face_locations(prep.rgb)
+        face_encodings = face_recognition.face_encodings(prep.rgb, face_locations)
         
         # Process each face found in the frame
         for (top, right, bottom, left), face_encoding in zip(face_locations, face_encodings):
             # Compare with known face
             matches = face_recognition.compare_faces([known_face_encoding], face_encoding)
             name = "Known Person" if matches[0] else "Unknown"
+            if matches[0] and time_to_identify is None:
+                time_to_identify = time.perf_counter() - start
             
             # Draw rectangle and label
             color = (0, 255, 0) if matches[0] else (0, 0, 255)
             cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
             cv2.putText(frame, name, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
         
-        # Display the resulting frame
-        cv2.imshow('Face Recognition Test', frame)
-        
-        # Handle key press
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        # Display the resulting frame and handle key press
+        if frame_source.show('Face Recognition Test', frame) == ord('q'):
+            break
+        if frame_source.HEADLESS and max_frames is None and time_to_identify is not None:
             break
     
     # Clean up
     cap.release()
-    cv2.destroyAllWindows()
+    frame_source.close_windows()
     
+    print(f"Read {cap.frames_read} frames at {cap.frames_per_second():.1f} fps")
+    if time_to_identify is None:
+        print("Known face was not identified")
+    else:
+        print(f"Time to identify: {time_to_identify * 1000:.0f} ms")
     print("Face recognition test completed")
     return True
 
 def main():
+    parser = argparse.ArgumentParser(description="Camera and face recognition checks")
+    parser.add_argument("--source", default=None,
+                        help="Camera index, video file or image directory (default: FRAME_SOURCE or 0)")
+    parser.add_argument("--headless", action="store_true",
+                        help="No windows or prompts, for running on recorded footage")
+    parser.add_argument("--realtime", action="store_true", help="Deliver recorded frames at their frame rate")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+    if args.headless:
+        frame_source.HEADLESS = True
+    if args.realtime:
+        frame_source.REALTIME = True
+    source = args.source
+
+    def wait_for_enter(message):
+        print(message)
+        if not frame_source.HEADLESS:
+            input()
+
     print("Starting face recognition tests...")
     
     # Test 1: Camera
     print("\nTest 1: Testing camera...")
-    print("Press Enter to start camera test...")
-    input()
+    wait_for_enter("Press Enter to start camera test...")
     
-    if not test_camera():
+    if not test_camera(source):
         return
     
     # Test 2: Face Detection
     print("\nTest 2: Testing face detection...")
-    print("Press Enter to start face detection test...")
-    input()
+    wait_for_enter("Press Enter to start face detection test...")
     
-    if not test_face_detection():
+    if not test_face_detection(source, args.max_frames):
         return
     
     # Test 3: Face Recognition
     print("\nTest 3: Testing face recognition...")
-    print("Press Enter to start face recognition test...")
-    input()
+    wait_for_enter("Press Enter to start face recognition test...")
     
-    if not test_face_recognition():
+    if not test_face_recognition(source, args.max_frames):
         return
     
     print("\nAll tests completed!")
@@ -0,0 +1,66 @@
+import importlib
+
+import numpy as np
+import pytest
+
+# Each image file holds the name of who is in it; "blurry" has no detectable face
+ENCODINGS = {"alice": [1.0, 0.0], "bob": [0.0, 1.0], "stranger": [0.7, 0.7]}
+
+
+@pytest.fixture
+def face_benchmark(face_recognition_stub):
+    return importlib.import_module("face_benchmark")
+
+
+@pytest.fixture
+def face_profiles(face_benchmark):
+    return importlib.import_module("face_profiles")
+
+
+def write_images(face_benchmark, tmp_path):
+    gallery = tmp_path / "gallery"
+    gallery.mkdir()
+    for name in ("alice", "bob"):
+        (gallery / f"{name}.jpg").write_text(name)
+    probes = tmp_path / "probes"
+    for label, files in {"alice": {"a1": "alice", "a2": "blurry"}, "bob": {"b1": "bob"},
+                         "unknown": {"u1": "stranger"}}.items():
+        (probes / label).mkdir(parents=True)
+        for stem, content in files.items():
+            (probes / label / f"{stem}.jpg").write_text(content)
+    return face_benchmark.load_gallery(str(gallery)), face_benchmark.load_probes(str(probes))
+
+
+def stub(monkeypatch, face_benchmark, fail_model=None):
+    def encode(image, config):
+        if config["model"] == fail_model:
+            raise RuntimeError("no CUDA")
+        if image not in ENCODINGS:
+            return [], []
+        return [(0, 10, 10, 0)], [np.array(ENCODINGS[image])]
+
+    recognition = face_benchmark.face_recognition
+    monkeypatch.setattr(recognition, "load_image_file", lambda path: open(path).read(), raising=False)
+    monkeypatch.setattr(recognition, "face_distance",
+                        lambda known, encoding: np.linalg.norm(np.array(known) - encoding, axis=1), raising=False)
+    monkeypatch.setattr(face_benchmark, "_encode", encode)
+
+
+def test_scores_known_and_unknown_probes_separately(tmp_path, monkeypatch, face_benchmark, face_profiles):
+    stub(monkeypatch, face_benchmark)
+    gallery, probes = write_images(face_benchmark, tmp_path)
+    result = face_benchmark.run_config(face_profiles.PROFILES["probe"], gallery, probes)
+    assert result["gallery"] == 2 and result["probes"] == 4 and result["known_probes"] == 3
+    assert result["detection_recall"] == 0.75
+    assert result["identification_accuracy"] == 0.75
+    assert abs(result["known_accuracy"] - 2 / 3) < 1e-9
+    assert result["unknown_rejection"] == 1.0
+
+
+def test_a_failing_profile_is_skipped(tmp_path, monkeypatch, capsys, face_benchmark, face_profiles):
+    stub(monkeypatch, face_benchmark, fail_model="cnn")
+    monkeypatch.setitem(face_profiles.PROFILES, "gpu", dict(face_profiles.PROFILES["probe"], model="cnn"))
+    gallery, probes = write_images(face_benchmark, tmp_path)
+    results = face_benchmark.run_profiles(["gpu", "probe"], gallery, probes)
+    assert [r["profile"] for r in results] == ["probe"]
+    assert "Skipping profile gpu: no CUDA" in capsys.readouterr().out
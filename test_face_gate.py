@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+
+import face_gate
+from frame_prep import FramePrep
+
+
+def test_haar_proposes_the_known_face_and_nothing_on_blank_frames():
+    proposer = face_gate.HaarProposer()
+    image = cv2.cvtColor(cv2.imread("known_faces/test_face.jpg"), cv2.COLOR_BGR2RGB)
+    boxes = proposer.propose(image)
+    assert boxes
+    for top, right, bottom, left in boxes:
+        assert 0 <= top < bottom <= image.shape[0] and 0 <= left < right <= image.shape[1]
+    assert proposer.propose(np.zeros((480, 640, 3), dtype=np.uint8)) == []
+
+
+
+def test_rgb_arrays_and_frame_preps_give_the_same_gray():
+    bgr = np.random.RandomState(0).randint(0, 256, (60, 80, 3), dtype=np.uint8)
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    prep = FramePrep().load(bgr)
+    assert np.array_equal(face_gate._gray(rgb, 1.0), prep.gray())
+    assert np.array_equal(face_gate._gray(rgb, 0.5), prep.gray(0.5))
+
+def test_expand_clips_to_image():
+    assert face_gate.expand((10, 110, 110, 10), (100, 100, 3), margin=0.5) == (0, 100, 100, 0)
+    assert face_gate.expand((40, 60, 60, 40), (100, 100, 3), margin=0.5) == (30, 70, 70, 30)
+
+
+def test_merge_joins_overlapping_boxes():
+    boxes = [(0, 50, 50, 0), (25, 75, 75, 25), (80, 100, 100, 80)]
+    assert face_gate.merge(boxes) == [(0, 75, 75, 0), (80, 100, 100, 80)]
+
+
+def test_detect_in_regions_maps_back_to_frame_coordinates():
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    crops = []
+
+    def detect(crop):
+        crops.append(crop.shape)
+        return [(5, 15, 15, 5)]
+
+    locations = face_gate.detect_in_regions(image, [(10, 80, 60, 40)], detect)
+    assert crops == [(50, 40, 3)]
+    assert locations == [(15, 55, 25, 45)]
+
+
+def test_missing_dnn_model_disables_the_gate(monkeypatch):
+    monkeypatch.setattr(face_gate, "_proposers", {})
+    monkeypatch.setattr(face_gate.DnnProposer.__init__, "__defaults__",
+                        ("missing.caffemodel", "missing.prototxt", 0.5))
+    assert face_gate.get_proposer("dnn") is None
+    assert face_gate.get_proposer("none") is None
+    monkeypatch.setattr(face_gate, "PREDETECTOR", "haar")
+    assert isinstance(face_gate.get_proposer(), face_gate.HaarProposer)
@@ -0,0 +1,120 @@
+import importlib
+
+import numpy as np
+import pytest
+
+import face_gate
+from frame_prep import FramePrep
+
+
+@pytest.fixture
+def face_profiles(face_recognition_stub):
+    return importlib.import_module("face_profiles")
+
+
+class FakeDlib:
+    """Stands in for face_recognition; finds one face at fixed coordinates"""
+
+    def __init__(self, found=((10, 20, 30, 5),)):
+        self.found = list(found)
+        self.calls = []
+
+    def face_locations(self, image, number_of_times_to_upsample=1, model="hog"):
+        self.calls.append((image.shape[:2], number_of_times_to_upsample, model))
+        return list(self.found)
+
+    def face_encodings(self, image, locations, num_jitters=1, model="small"):
+        self.calls.append((image.shape[:2], num_jitters, model))
+        return [np.zeros(128) for _ in locations]
+
+
+class FakeProposer:
+    name = "fake"
+
+    def __init__(self, regions):
+        self.regions = regions
+
+    def propose(self, image):
+        return list(self.regions)
+
+
+def stub(monkeypatch, face_profiles, proposer=None):
+    dlib = FakeDlib()
+    for name in ("face_locations", "face_encodings"):
+        monkeypatch.setattr(face_profiles.face_recognition, name, getattr(dlib, name), raising=False)
+    requested = []
+    monkeypatch.setattr(face_gate, "get_proposer", lambda name=None, scale=None: requested.append((name, scale))
+                        or proposer)
+    return dlib, requested
+
+
+def _image(height=120, width=160):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def test_profile_for_uses_the_configured_profile(monkeypatch, face_profiles):
+    monkeypatch.setattr(face_profiles, "PROBE_PROFILE", "low_power")
+    assert face_profiles.profile_for("probe") == ("low_power", face_profiles.PROFILES["low_power"])
+    assert face_profiles.profile_for("enroll")[0] == face_profiles.ENROLL_PROFILE
+
+
+def test_unknown_profile_falls_back_to_the_role(monkeypatch, capsys, face_profiles):
+    monkeypatch.setattr(face_profiles, "ENROLL_PROFILE", "turbo")
+    assert face_profiles.profile_for("enroll") == ("enroll", face_profiles.PROFILES["enroll"])
+    assert "Unknown face profile turbo" in capsys.readouterr().out
+
+
+def test_profiles_are_picked_from_the_environment(monkeypatch, face_profiles):
+    monkeypatch.setenv("FACE_PROBE_PROFILE", "low_power")
+    monkeypatch.setenv("FACE_ENROLL_PROFILE", "probe")
+    try:
+        module = importlib.reload(face_profiles)
+        assert module.PROBE_PROFILE == "low_power" and module.ENROLL_PROFILE == "probe"
+    finally:
+        monkeypatch.delenv("FACE_PROBE_PROFILE")
+        monkeypatch.delenv("FACE_ENROLL_PROFILE")
+        importlib.reload(face_profiles)
+    assert face_profiles.PROBE_PROFILE == "probe"
+
+
+def test_locations_are_scaled_back_to_the_image(monkeypatch, face_profiles):
+    dlib, _ = stub(monkeypatch, face_profiles)
+    profile = dict(face_profiles.PROFILES["probe"], scale=0.5)
+    assert face_profiles._locate(_image(), profile) == [(20, 40, 60, 10)]
+    assert dlib.calls == [((60, 80), profile["upsample"], "hog")]
+    # A FramePrep is shrunk through its cached buffers, with the same result
+    assert face_profiles._locate(FramePrep().load(_image()), profile) == [(20, 40, 60, 10)]
+    assert face_profiles._locate(_image(), dict(profile, scale=1.0)) == [(10, 20, 30, 5)]
+
+
+def test_detect_applies_overrides(monkeypatch, face_profiles):
+    dlib, requested = stub(monkeypatch, face_profiles)
+    locations = face_profiles.detect(_image(), "enroll", overrides={"scale": 0.25, "upsample": 0})
+    assert locations == [(40, 80, 120, 20)]
+    assert dlib.calls == [((30, 40), 0, "hog")]
+    assert requested == []   # Enrollment never goes through the pre-detector
+
+
+def test_probe_skips_dlib_when_nothing_is_proposed(monkeypatch, face_profiles):
+    dlib, requested = stub(monkeypatch, face_profiles, FakeProposer([]))
+    assert face_profiles.detect(_image(), "probe", overrides={"predetector": "haar", "propose_scale": 0.25}) == []
+    assert requested == [("haar", 0.25)]
+    assert dlib.calls == []
+
+
+def test_probe_searches_proposed_regions_at_full_size(monkeypatch, face_profiles):
+    monkeypatch.setattr(face_gate, "GATE_MODE", "regions")
+    dlib, _ = stub(monkeypatch, face_profiles, FakeProposer([(40, 100, 80, 60)]))
+    locations = face_profiles.detect(FramePrep().load(_image(240, 320)), "probe")
+    assert len(locations) == 1
+    top, right, bottom, left = locations[0]
+    assert (bottom - top, right - left) == (20, 15)   # Not rescaled: the crop was searched at scale 1
+    assert all(shape[0] < 240 and shape[1] < 320 for shape, _, _ in dlib.calls)
+
+
+def test_encode_uses_the_role_profile(monkeypatch, face_profiles):
+    dlib, _ = stub(monkeypatch, face_profiles)
+    encodings = face_profiles.encode(_image(), [(0, 63, 63, 0)], role="enroll")
+    assert len(encodings) == 1
+    profile = face_profiles.PROFILES["enroll"]
+    assert dlib.calls == [((120, 160), profile["jitters"], profile["landmarks"])]
@@ -0,0 +1,93 @@
+import numpy as np
+
+import face_vote
+
+ALICE = np.zeros(128)
+BOB = np.full(128, 0.1)          # ~1.13 away from Alice
+STRANGER = np.full(128, -0.1)
+
+
+class Clock:
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class Frames:
+    """A source that returns the same frame until it runs out"""
+
+    def __init__(self, count):
+        self.left = count
+        self.exhausted = False
+
+    def read(self):
+        if self.left == 0:
+            self.exhausted = True
+            return False, None
+        self.left -= 1
+        return True, "frame"
+
+
+def near(encoding, offset=0.01):
+    return encoding + offset
+
+
+def test_confident_identity_returns_early():
+    encodings = iter([[near(ALICE)]] * 10)
+    decision = face_vote.recognize(Frames(10), [ALICE, BOB], ["Alice", "Bob"],
+                                   lambda frame: next(encodings), clock=Clock(0.01))
+    assert decision.name == "Alice"
+    assert decision.frames == 2           # 2 near-perfect frames clear evidence 1.5 and margin 1.0
+    assert decision.score > 1.5
+
+
+def test_single_frame_match_is_not_enough():
+    vote = face_vote.Vote([ALICE, BOB], ["Alice", "Bob"])
+    vote.add([near(ALICE)])
+    assert vote.leader() is None
+    vote.add([near(ALICE)])
+    assert vote.leader()[0] == "Alice"
+
+
+def test_conflicting_evidence_waits_for_a_margin():
+    vote = face_vote.Vote([ALICE, BOB], ["Alice", "Bob"])
+    for _ in range(3):
+        vote.add([near(ALICE)])
+        vote.add([near(BOB, 0.1 - 0.0001)])
+    assert vote.leader() is None
+
+
+def test_deadline_returns_unknown():
+    decision = face_vote.recognize(Frames(1000), [ALICE], ["Alice"], lambda frame: [],
+                                   deadline=1.0, clock=Clock(0.1))
+    assert decision.name is None and decision.encoding is None
+    assert decision.timed_out and not decision.unknown
+    assert decision.seconds >= 1.0 and decision.frames < 12
+
+
+def test_stranger_is_confidently_unknown():
+    decision = face_vote.recognize(Frames(100), [ALICE], ["Alice"], lambda frame: [STRANGER],
+                                   clock=Clock(0.01))
+    assert decision.name is None and decision.unknown and not decision.timed_out
+    assert decision.frames < 5
+    assert decision.encoding is STRANGER
+
+
+def test_skipped_frames_and_empty_gallery():
+    calls = iter([None, None, [STRANGER], [STRANGER], [STRANGER]])
+    decision = face_vote.recognize(Frames(5), [], [], lambda frame: next(calls), clock=Clock(0.01))
+    assert decision.name is None and decision.frames == 2 and decision.faces == 2
+
+
+def test_weak_matches_at_the_deadline_are_unknown():
+    # Distance 0.5 adds ~0.17 per frame: never enough evidence to name anyone
+    weak = ALICE + 0.5 / np.sqrt(128)
+    decision = face_vote.recognize(Frames(1000), [ALICE, BOB], ["Alice", "Bob"], lambda frame: [weak],
+                                   deadline=0.5, clock=Clock(0.1))
+    assert decision.name is None and decision.timed_out
+    assert not decision.unknown     # Not clearly a stranger either, so nobody is enrolled
+    assert decision.encoding is weak
@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+
+import face_gate
+import motion_gate
+from frame_prep import FramePrep, as_rgb
+
+
+def _frame(seed=0, size=(120, 160)):
+    rng = np.random.RandomState(seed)
+    return rng.randint(0, 256, size + (3,), dtype=np.uint8)
+
+
+def test_rgb_is_channel_swapped_bgr():
+    frame = _frame()
+    prep = FramePrep().load(frame)
+    assert prep.shape == frame.shape
+    assert np.array_equal(prep.rgb, frame[..., ::-1])
+
+
+def test_buffers_are_reused_across_frames():
+    prep = FramePrep()
+    rgb = prep.load(_frame(1)).rgb
+    small = prep.small(0.5)
+    gray = prep.gray(0.5)
+
+    second = _frame(2)
+    prep.load(second)
+    assert prep.rgb is rgb
+    assert prep.small(0.5) is small
+    assert prep.gray(0.5) is gray
+    assert np.array_equal(rgb, second[..., ::-1])
+
+
+def test_conversions_happen_once_per_frame():
+    prep = FramePrep().load(_frame(3))
+    gray = prep.gray(0.5).copy()
+    prep.bgr[:] = 0     # Not reconverted until the next load()
+    assert np.array_equal(prep.gray(0.5), gray)
+    prep.load(prep.bgr)
+    assert not prep.gray(0.5).any()
+
+
+def test_small_and_gray_match_opencv():
+    frame = _frame(4)
+    prep = FramePrep().load(frame)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    small = cv2.resize(rgb, (80, 60), interpolation=cv2.INTER_AREA)
+    assert prep.small(0.5).shape == (60, 80, 3)
+    assert np.array_equal(prep.small(0.5), small)
+    bgr_small = cv2.resize(frame, (80, 60), interpolation=cv2.INTER_AREA)
+    assert np.array_equal(prep.gray(0.5), cv2.cvtColor(bgr_small, cv2.COLOR_BGR2GRAY))
+    assert np.array_equal(prep.gray(), cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    assert prep.small(1.0) is prep.rgb
+
+
+def test_gray_does_not_convert_to_rgb():
+    """Idle frames only feed the motion gate; they shouldn't pay for RGB"""
+    prep = FramePrep().load(_frame(6))
+    gray = prep.gray(size=motion_gate.GATE_SIZE)
+    assert gray.shape == (motion_gate.GATE_SIZE[1], motion_gate.GATE_SIZE[0])
+    assert "rgb" not in prep._fresh and ("small", 0.5) not in prep._fresh
+
+
+def test_as_rgb():
+    frame = _frame(5)
+    prep = FramePrep().load(frame)
+    assert as_rgb(prep) is prep.rgb
+    assert as_rgb(frame) is frame
+
+
+def test_consumers_accept_frame_prep():
+    prep = FramePrep().load(np.zeros((240, 320, 3), dtype=np.uint8))
+    proposer = face_gate.get_proposer("haar")
+    assert proposer.propose(prep) == []
+    gate = motion_gate.MotionGate(clock=lambda: 0.0)
+    assert gate.check(prep.gray(size=gate.size))
+    assert face_gate.expand((10, 50, 50, 10), prep.shape) == (0, 62, 62, 0)
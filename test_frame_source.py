@@ -0,0 +1,60 @@
+import time
+
+import cv2
+import numpy as np
+
+import frame_source
+
+
+def write_images(directory, count):
+    for i in range(count):
+        frame = np.full((48, 64, 3), i * 10, dtype=np.uint8)
+        cv2.imwrite(str(directory / f"{i:03d}.png"), frame)
+    (directory / "notes.txt").write_text("not an image")
+
+
+def test_image_directory_reads_in_order_then_exhausts(tmp_path):
+    write_images(tmp_path, 3)
+    source = frame_source.open_source(str(tmp_path))
+    assert isinstance(source, frame_source.ImageDirSource) and source.isOpened()
+    values = [int(frame[0, 0, 0]) for frame in source]
+    assert values == [0, 10, 20]
+    assert source.exhausted and source.frames_read == 3
+    assert source.read() == (False, None)
+
+
+def test_loop_rewinds_recorded_sources(tmp_path):
+    write_images(tmp_path, 2)
+    source = frame_source.open_source(str(tmp_path), loop=True)
+    values = [int(source.read()[1][0, 0, 0]) for _ in range(5)]
+    assert values == [0, 10, 0, 10, 0]
+    assert not source.exhausted
+
+
+def test_realtime_paces_frames(tmp_path):
+    write_images(tmp_path, 4)
+    source = frame_source.open_source(str(tmp_path), fps=50, realtime=True)
+    start = time.perf_counter()
+    assert len(list(source)) == 4
+    # Frames are due at 0, 20, 40 and 60 ms
+    assert time.perf_counter() - start >= 0.055
+    assert source.frames_per_second() < 80
+
+
+def test_video_file(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), 40 * i, dtype=np.uint8))
+    writer.release()
+    with frame_source.open_source(path) as source:
+        assert isinstance(source, frame_source.VideoFileSource)
+        assert source.fps == 25
+        assert len(list(source)) == 5
+
+
+def test_headless_show_does_not_open_windows(monkeypatch):
+    monkeypatch.setattr(frame_source, "HEADLESS", True)
+    monkeypatch.setattr(cv2, "imshow", lambda *args: (_ for _ in ()).throw(AssertionError("imshow called")))
+    assert frame_source.show("window", np.zeros((4, 4, 3), dtype=np.uint8)) == -1
+    frame_source.close_windows()
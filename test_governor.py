@@ -0,0 +1,113 @@
+import importlib
+
+import numpy as np
+import pytest
+
+import face_gate
+import governor
+import metrics
+from frame_prep import FramePrep
+
+
+@pytest.fixture
+def face_profiles(face_recognition_stub):
+    return importlib.import_module("face_profiles")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_frames(gov, clock, count, inference_ms, interval_ms=33.0):
+    processed = 0
+    for _ in range(count):
+        clock.now += interval_ms / 1000
+        if gov.should_process():
+            processed += 1
+            gov.record(inference_ms / 1000)
+    return processed
+
+
+def test_slow_frames_step_down_the_ladder():
+    clock = Clock()
+    gov = governor.Governor(target_ms=100, cpu_budget=1.0, level=0, clock=clock)
+    run_frames(gov, clock, 200, inference_ms=400, interval_ms=400)
+    assert gov.level == len(governor.LADDER) - 1
+    assert gov.settings["stride"] == 4
+
+
+def test_fast_frames_step_back_up():
+    clock = Clock()
+    gov = governor.Governor(target_ms=100, cpu_budget=1.0, level=4, clock=clock)
+    run_frames(gov, clock, 400, inference_ms=10)
+    assert gov.level == 0
+    assert gov.settings["predetector"] == "none"
+
+
+def test_cpu_budget_limits_even_fast_frames():
+    clock = Clock()
+    gov = governor.Governor(target_ms=1000, cpu_budget=0.25, level=0, clock=clock)
+    # 30 ms of inference on a 33 ms frame interval is ~90% CPU at stride 1
+    run_frames(gov, clock, 400, inference_ms=30)
+    assert gov.settings["stride"] >= 4
+    assert gov.cpu_share() <= 0.25
+
+
+def test_stride_skips_frames():
+    clock = Clock()
+    gov = governor.Governor(level=5, clock=clock)
+    results = []
+    for _ in range(8):
+        clock.now += 0.03
+        results.append(gov.should_process())
+    assert results == [True, False, False, False, True, False, False, False]
+
+
+def test_decisions_are_exported():
+    metrics.reset()
+    clock = Clock()
+    gov = governor.Governor(target_ms=100, cpu_budget=1.0, level=0, clock=clock)
+    run_frames(gov, clock, 12, inference_ms=400, interval_ms=400)
+    text = metrics.render()
+    assert 'assistant_governor_setting{setting="level"} 1' in text
+    assert 'assistant_governor_predetector{backend="haar"} 1' in text
+    assert 'assistant_governor_changes_total{direction="down"} 1' in text
+
+
+class CostProposer:
+    """Counts the pixels a Haar pass would search and proposes one 100 px face"""
+
+    def __init__(self, cost, scale):
+        self.name = "haar"
+        self.cost = cost
+        self.scale = scale
+
+    def propose(self, image):
+        self.cost.append(image.gray(self.scale).size)
+        return [(100, 300, 200, 200)]
+
+
+def test_every_step_down_the_ladder_is_cheaper(monkeypatch, face_profiles):
+    cost = []
+
+    def face_locations(image, number_of_times_to_upsample=1, model="hog"):
+        # dlib's HOG cost grows with the pixels searched, 4x per upsample
+        cost.append(image.shape[0] * image.shape[1] * 4 ** number_of_times_to_upsample)
+        return []
+
+    monkeypatch.setattr(face_profiles.face_recognition, "face_locations", face_locations, raising=False)
+    monkeypatch.setattr(face_gate, "GATE_MODE", "regions")
+    monkeypatch.setattr(face_gate, "get_proposer",
+                        lambda name=None, scale=None: None if name == "none" else CostProposer(cost, scale))
+    prep = FramePrep().load(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    per_frame = []
+    for settings in governor.LADDER:
+        del cost[:]
+        face_profiles.detect(prep, overrides=settings)
+        per_frame.append(sum(cost) / settings["stride"])
+    assert all(cheaper < dearer for dearer, cheaper in zip(per_frame, per_frame[1:])), per_frame
@@ -0,0 +1,110 @@
+import os
+import time
+
+import numpy as np
+
+import inference_pool
+from inference_pool import FrameRing, InferencePool
+
+SHAPE = (12, 16, 3)
+
+
+def first_pixel(frame, offset=0):
+    return int(frame[0, 0, 0]) + offset
+
+
+def slow_first_pixel(frame):
+    time.sleep(0.2)
+    return int(frame[0, 0, 0])
+
+
+def failing(frame):
+    raise RuntimeError("no faces today")
+
+
+def crash(frame):
+    os._exit(1)
+
+
+def _frame(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+def test_ring_attaches_by_name():
+    ring = FrameRing(SHAPE, 3)
+    try:
+        ring.write(1, _frame(7))
+        other = FrameRing(SHAPE, 3, name=ring.name)
+        assert other.read(1)[5, 5, 2] == 7
+        other.write(2, _frame(9))
+        assert ring.read(2)[0, 0, 0] == 9
+        other.close()
+    finally:
+        ring.close()
+
+
+def test_results_come_back_with_frame_ids_and_tags():
+    with InferencePool(first_pixel, SHAPE, workers=2) as pool:
+        ids = [pool.submit(_frame(value), 100, tag=f"frame {value}", block=True) for value in range(10)]
+        results = pool.results(wait_all=True)
+    assert ids == list(range(10))
+    assert [result.frame_id for result in results] == ids
+    assert [result.value for result in results] == [100 + value for value in range(10)]
+    assert [result.tag for result in results] == [f"frame {value}" for value in range(10)]
+    assert all(result.seconds >= 0 for result in results)
+
+
+def test_full_ring_drops_unless_blocking():
+    with InferencePool(slow_first_pixel, SHAPE, workers=1, slots=1) as pool:
+        assert pool.submit(_frame(1)) == 0
+        assert pool.submit(_frame(2)) is None
+        assert pool.submit(_frame(3), block=True) == 1
+        assert [result.value for result in pool.results(wait_all=True)] == [1, 3]
+
+
+def test_failed_jobs_are_reported_not_raised():
+    with InferencePool(failing, SHAPE, workers=1) as pool:
+        pool.submit(_frame(1))
+        assert pool.results(wait_all=True) == []
+        assert pool.submit(_frame(2)) is not None   # The slot was released
+
+
+def test_wrong_shape_is_rejected():
+    with InferencePool(first_pixel, SHAPE, workers=1) as pool:
+        try:
+            pool.submit(np.zeros((4, 4, 3), dtype=np.uint8))
+        except ValueError:
+            pass
+        else:
+            assert False, "expected ValueError"
+
+
+def test_no_pool_when_workers_are_off(monkeypatch):
+    monkeypatch.setattr(inference_pool, "WORKERS", 0)
+    assert inference_pool.get_pool(first_pixel, SHAPE) is None
+
+
+def test_discard_drops_stale_results_without_waiting():
+    with InferencePool(slow_first_pixel, SHAPE, workers=1, slots=4) as pool:
+        for value in range(4):
+            pool.submit(_frame(value))
+        start = time.perf_counter()
+        pool.discard()
+        assert time.perf_counter() - start < 0.1
+        assert pool.submit(_frame(9), block=True) is not None
+        assert [result.value for result in pool.results(wait_all=True)] == [9]
+        assert sorted(pool._free) == list(range(4))
+
+
+def test_dead_worker_breaks_the_pool_and_falls_back_inline(monkeypatch):
+    monkeypatch.setattr(inference_pool, "WORKERS", 1)
+    pool = inference_pool.get_pool(crash, SHAPE)
+    try:
+        assert pool.submit(_frame(1)) == 0
+        assert pool.results(wait_all=True) == []
+        assert pool.broken
+        assert pool.submit(_frame(2)) is None
+        assert sorted(pool._free) == list(range(pool.ring.slots))
+        assert inference_pool.get_pool(crash, SHAPE) is None
+    finally:
+        inference_pool.close_pools()
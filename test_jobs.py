@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from jobs import JobManager, JobQueueFull
+
+
+def echo_job(text, report):
+    report("matched", intent="echo")
+    return {"response": text}
+
+
+def test_job_runs_and_reports():
+    """A job's stages and result are visible through the stream"""
+    manager = JobManager(max_workers=1)
+    job_id = manager.submit(echo_job, "hello")
+
+    items = list(manager.stream(job_id, heartbeat=1.0))
+
+    assert items[0][0] == "event"
+    assert items[0][1]["stage"] == "matched"
+    kind, job = items[-1]
+    assert kind == "end"
+    assert job["status"] == "done"
+    assert job["result"] == {"response": "hello"}
+    manager.shutdown()
+
+
+def test_failed_job():
+    """Exceptions mark the job as failed"""
+    def broken(report):
+        raise RuntimeError("boom")
+
+    manager = JobManager(max_workers=1)
+    job_id = manager.submit(broken)
+    *_, (kind, job) = manager.stream(job_id, heartbeat=1.0)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+    manager.shutdown()
+
+
+def test_admission_limit():
+    """Submissions beyond max_pending are refused"""
+    release = threading.Event()
+
+    def blocked(report):
+        release.wait(5)
+
+    manager = JobManager(max_workers=1, max_pending=2)
+    manager.submit(blocked)
+    manager.submit(blocked)
+    with pytest.raises(JobQueueFull):
+        manager.submit(blocked)
+    release.set()
+    manager.shutdown()
+
+
+def test_unknown_job():
+    manager = JobManager()
+    assert manager.get("missing") is None
+    assert list(manager.stream("missing")) == []
+    manager.shutdown()
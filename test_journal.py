@@ -0,0 +1,81 @@
+import json
+import time
+
+import pytest
+import speech_recognition as sr
+
+import journal
+from dialog import get_best_command_match, match_command
+
+
+def test_writer_appends_and_rotates(tmp_path):
+    path = str(tmp_path / "turns.jsonl")
+    log = journal.Journal(path, max_bytes=200, backups=2, flush_interval=0.01)
+    for i in range(10):
+        log.write({"trace_id": str(i), "transcript": "x" * 40})
+        time.sleep(0.03)
+    log.close()
+    assert (tmp_path / "turns.jsonl.1").exists()
+    assert not (tmp_path / "turns.jsonl.3").exists()
+    records = journal.read_records(path)
+    assert records and records[-1]["trace_id"] == "9"
+
+
+def test_turn_collects_fields_and_stages():
+    turn = journal.begin(source="voice")
+    journal.heard("search google for cats", [{"transcript": "search google for cats", "confidence": 0.9}])
+    assert get_best_command_match("search google for cats") == "google_search"
+    journal.heard("cats", [])
+    journal.mark("recognized")
+    record = turn.record()
+    assert journal.current() is turn
+    assert record["transcript"] == "search google for cats"
+    assert record["answers"] == [{"transcript": "cats", "nbest": []}]
+    assert record["intent"] == "google_search" and record["intent_score"] == 1.0
+    assert list(record["stages"]) == ["matched", "recognized"]
+    journal.JOURNAL_ENABLED, enabled = False, journal.JOURNAL_ENABLED
+    try:
+        journal.finish(turn)
+    finally:
+        journal.JOURNAL_ENABLED = enabled
+    assert journal.current() is None
+
+
+def test_match_command_scores():
+    assert match_command("what is the time please") == ("time", 1.0)
+    intent, score = match_command("xyzzy")
+    assert intent is None and score == 0
+
+
+class FakeRecognizer:
+    def __init__(self, result):
+        self.result = result
+
+    def recognize_google(self, audio, show_all=False):
+        assert show_all
+        return self.result
+
+
+def test_recognize_keeps_alternatives():
+    result = {"alternative": [{"transcript": "Open Notepad", "confidence": 0.8},
+                              {"transcript": "open note pad"}], "final": True}
+    text, nbest = journal.recognize(FakeRecognizer(result), None)
+    assert text == "open notepad"
+    assert [a["transcript"] for a in nbest] == ["Open Notepad", "open note pad"]
+    with pytest.raises(sr.UnknownValueError):
+        journal.recognize(FakeRecognizer([]), None)
+
+
+def test_analyze_percentiles_and_misses(tmp_path):
+    records = [{"trace_id": str(i), "transcript": "hello", "intent": "time" if i % 4 else None,
+                "stages": {"recognized": 100.0 * i, "done": 100.0 * i + 10}} for i in range(1, 9)]
+    records.append({"trace_id": "silent", "stages": {"done": 5.0}})
+    path = tmp_path / "turns.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\nnot json\n")
+    report = journal.analyze(journal.read_records(str(path)))
+    assert report["turns"] == 9
+    assert report["intent_miss_rate"] == 0.25
+    assert report["not_heard_rate"] == pytest.approx(1 / 9)
+    assert report["stages_ms"]["recognized"]["p50"] == 400.0
+    assert report["stages_ms"]["done"]["p90"] == 10.0
+    assert report["stages_ms"]["total"]["p99"] == 810.0
@@ -0,0 +1,44 @@
+import metrics
+
+
+def setup_function():
+    metrics.reset()
+
+
+def test_counter_renders_labels():
+    metrics.counter("intents_total", "Matched intents").inc(intent="time")
+    metrics.counter("intents_total").inc(2, intent="time")
+    metrics.counter("intents_total").inc(intent='say "hi"')
+    text = metrics.render()
+    assert "# HELP intents_total Matched intents" in text
+    assert "# TYPE intents_total counter" in text
+    assert 'intents_total{intent="time"} 3' in text
+    assert 'intents_total{intent="say \\"hi\\""} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.histogram("stage_seconds", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="recognize")
+    text = metrics.render()
+    assert 'stage_seconds_bucket{stage="recognize",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="recognize",le="1.0"} 3' in text
+    assert 'stage_seconds_bucket{stage="recognize",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="recognize"} 4' in text
+    assert 'stage_seconds_sum{stage="recognize"} 6.05' in text
+
+
+def test_timed_records_even_on_error():
+    try:
+        with metrics.timed("handler_seconds", intent="time"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert 'handler_seconds_count{intent="time"} 1' in metrics.render()
+
+
+def test_gauge_function_is_read_at_render_time():
+    depth = [3]
+    metrics.gauge("queue_depth").set_function(lambda: depth[0])
+    depth[0] = 7
+    assert "queue_depth 7" in metrics.render()
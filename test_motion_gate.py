@@ -0,0 +1,67 @@
+import numpy as np
+
+import motion_gate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(square_at=None):
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    if square_at is not None:
+        x, y = square_at
+        image[y:y + 60, x:x + 60] = 255
+    return image
+
+
+def test_static_scene_goes_idle_after_cooldown():
+    clock = Clock()
+    gate = motion_gate.MotionGate(cooldown=2.0, clock=clock)
+    assert gate.check(frame())          # First frame always runs
+    clock.now = 1.0
+    assert gate.check(frame())          # Still within the cooldown
+    assert gate.changed == 0.0
+    clock.now = 3.5
+    assert not gate.check(frame())
+
+
+def test_motion_wakes_the_pipeline():
+    clock = Clock()
+    gate = motion_gate.MotionGate(cooldown=1.0, clock=clock)
+    gate.check(frame())
+    clock.now = 5.0
+    assert not gate.check(frame())
+    clock.now = 6.0
+    assert gate.check(frame((100, 100)))
+    assert gate.changed > 0.01
+    clock.now = 6.5
+    assert gate.check(frame((100, 100)))
+    clock.now = 7.5
+    assert not gate.check(frame((100, 100)))
+
+
+def test_sensitivity_ignores_small_changes():
+    clock = Clock()
+    gate = motion_gate.MotionGate(sensitivity=0.2, cooldown=0.0, clock=clock)
+    gate.check(frame())
+    clock.now = 1.0
+    assert not gate.check(frame((100, 100)))
+
+
+def test_idle_only_sleeps_for_live_sources(monkeypatch):
+    slept = []
+    monkeypatch.setattr(motion_gate.time, "sleep", slept.append)
+    gate = motion_gate.MotionGate(idle_interval=0.2)
+
+    class Recorded:
+        live = False
+
+    gate.idle(Recorded())
+    assert slept == []
+    gate.idle()
+    assert slept == [0.2]
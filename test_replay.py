@@ -0,0 +1,148 @@
+import math
+import struct
+import sys
+import types
+import wave
+
+import pytest
+import speech_recognition as sr
+
+import dialog
+import journal
+import replay
+import wake_word
+from dialog import get_best_command_match
+
+
+def write_tone(path, seconds=0.5, rate=16000):
+    samples = [int(8000 * math.sin(2 * math.pi * 440 * i / rate)) for i in range(int(seconds * rate))]
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def make_fixtures(tmp_path, transcripts):
+    for i, transcript in enumerate(transcripts):
+        write_tone(tmp_path / f"{i:02d}.wav")
+        if transcript:
+            (tmp_path / f"{i:02d}.txt").write_text(transcript)
+    return replay.load_fixtures(str(tmp_path))
+
+
+def test_virtual_microphone_plays_fixtures_in_order(tmp_path):
+    fixtures = make_fixtures(tmp_path, ["what is the time", None])
+    assert [t for _, t in fixtures] == ["what is the time", None]
+    microphone = replay.VirtualMicrophone(fixtures)
+    recognizer = replay.ScriptedRecognizer(lambda: microphone.current[1], delay=0.01)
+    with microphone() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
+    assert len(audio.get_raw_data()) > 0.5 * 16000 * 2
+    text, nbest = journal.recognize(recognizer, audio)
+    assert text == "what is the time" and nbest[0]["confidence"] == 0.9
+    with microphone():
+        pass
+    try:
+        microphone()
+        assert False, "expected ReplayFinished"
+    except replay.ReplayFinished:
+        pass
+
+
+def test_scripted_recognizer_list_script():
+    recognizer = replay.ScriptedRecognizer(["hello", None])
+    assert recognizer.recognize_google(None) == "hello"
+    try:
+        recognizer.recognize_google(None)
+        assert False, "expected UnknownValueError"
+    except sr.UnknownValueError:
+        pass
+
+
+def fake_voice_module():
+    """A minimal voice loop shaped like assistant.continuous_listen"""
+    module = types.ModuleType("fake_voice")
+    module.recognizer = sr.Recognizer()
+    module.microphone_factory = sr.Microphone
+    module._speak = lambda text: False
+
+    def listen():
+        try:
+            with module.microphone_factory() as source:
+                audio = module.recognizer.listen(source, timeout=5)
+            journal.mark("captured")
+            text, nbest = journal.recognize(module.recognizer, audio)
+            journal.mark("recognized")
+            journal.heard(text, nbest)
+            return text
+        except Exception:
+            return ""
+
+    def continuous_listen(runtime):
+        while not runtime.stopping:
+            turn = journal.begin(source="voice")
+            command = listen()
+            if not command:
+                journal.finish(turn)
+                continue
+            intent = get_best_command_match(command)
+            turn.mark("handled")
+            module._speak(f"You asked for {intent}")
+            turn.mark("spoken")
+            journal.finish(turn, result=intent)
+
+    module.continuous_listen = continuous_listen
+    return module
+
+
+def test_replay_drives_voice_loop(tmp_path, monkeypatch):
+    module = fake_voice_module()
+    monkeypatch.setitem(sys.modules, "fake_voice", module)
+    fixtures = make_fixtures(tmp_path, ["what is the time", "open notepad", "blah blah"])
+    harness = replay.Replay(fixtures, target="fake_voice", delay=0.01)
+    report = harness.run()
+
+    assert report["turns"] == 3 and report["utterances"] == 3
+    assert [t["intent"] for t in report["turn_ms"]] == ["time", "notepad", None]
+    assert abs(report["intent_miss_rate"] - 1 / 3) < 1e-9
+    assert harness.speaker.spoken == ["You asked for time", "You asked for notepad", "You asked for None"]
+    assert report["stages_ms"]["recognized"]["p50"] >= 10
+    assert module.microphone_factory is sr.Microphone
+
+
+class Launcher:
+    """Records programs the handlers would have started"""
+
+    def __init__(self):
+        self.started = []
+
+    def Popen(self, args, **kwargs):
+        self.started.append(args)
+
+
+@pytest.mark.parametrize("target", ["assistant", "app"])
+def test_replay_drives_the_real_voice_loop(tmp_path, monkeypatch, face_recognition_stub, target):
+    # The voice loops import playsound at module level; a replay never plays anything
+    try:
+        import playsound  # noqa: F401
+    except ImportError:
+        monkeypatch.setitem(sys.modules, "playsound", types.ModuleType("playsound"))
+    module = pytest.importorskip(target)
+    launcher = Launcher()
+    monkeypatch.setattr(wake_word, "WAKE_WORD_ENABLED", False)
+    # assistant runs its handlers inline, app through dialog.HANDLERS
+    monkeypatch.setattr(module if target == "assistant" else dialog, "subprocess", launcher)
+    fixtures = make_fixtures(tmp_path, ["tell me the time", "open notepad"])
+    harness = replay.Replay(fixtures, target=target, delay=0.01)
+    report = harness.run()
+
+    assert report["utterances"] == 2 and report["recognizer_calls"] == 2
+    assert [t["transcript"] for t in report["turn_ms"]] == ["tell me the time", "open notepad"]
+    assert launcher.started == ["notepad"]
+    assert harness.speaker.spoken[0].startswith("The time is")
+    assert harness.speaker.spoken[1] == "Opening Notepad."
+    assert report["stages_ms"]["recognized"]["p50"] >= 10
+    assert harness.runtime.reason == "replay finished"
+    assert module.microphone_factory is sr.Microphone
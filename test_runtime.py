@@ -0,0 +1,63 @@
+import threading
+import time
+
+import runtime
+from runtime import Runtime
+
+
+def test_worker_requests_shutdown():
+    """A worker saying goodbye wakes the main thread straight away"""
+    runtime = Runtime()
+    hooks = []
+    runtime.on_shutdown(lambda: hooks.append(threading.current_thread().name))
+
+    def worker():
+        time.sleep(0.05)
+        runtime.request_shutdown("goodbye")
+
+    runtime.spawn("voice", worker)
+    start = time.perf_counter()
+    runtime.wait()
+
+    assert runtime.reason == "goodbye"
+    assert hooks == ["voice"]
+    assert time.perf_counter() - start < 1.0
+    assert runtime.elapsed() < 0.5
+
+
+def test_workers_stop_on_shutdown():
+    runtime = Runtime()
+    stopped = threading.Event()
+
+    def worker():
+        while not runtime.sleep(10):
+            pass
+        stopped.set()
+
+    thread = runtime.spawn("idle", worker)
+    runtime.request_shutdown("test")
+    runtime.shutdown()
+
+    assert stopped.is_set()
+    assert not thread.is_alive()
+
+
+def test_failing_worker_shuts_down():
+    runtime = Runtime()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    runtime.spawn("broken", broken)
+    runtime.wait()
+
+    assert runtime.reason == "broken failed"
+
+
+def test_exit_is_reported_once_for_the_latest_runtime(capsys):
+    for reason in ("first", "second", "third"):
+        Runtime().request_shutdown(reason)
+    capsys.readouterr()
+    runtime._report_exit()
+    out = capsys.readouterr().out
+    assert out.count("Process exit") == 1 and "(third)" in out
@@ -0,0 +1,84 @@
+import argparse
+import os
+import signal
+import socket
+import threading
+from urllib.request import urlopen
+
+import pytest
+from flask import Flask
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def restore_signals():
+    handlers = {sig: signal.getsignal(sig) for sig in server.SHUTDOWN_SIGNALS}
+    yield
+    for sig, handler in handlers.items():
+        signal.signal(sig, handler)
+    server._stop = None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def ping_app():
+    app = Flask(__name__)
+    app.add_url_rule("/ping", "ping", lambda: f"pong {os.getpid()}")
+    return app
+
+
+def serve_and_ping(workers, requests=1):
+    """Serve, fetch /ping from a client thread, then stop; returns the replies"""
+    port = free_port()
+    replies, stopped = [], []
+
+    def client():
+        try:
+            for _ in range(requests):
+                replies.append(urlopen(f"http://127.0.0.1:{port}/ping", timeout=5).read().decode())
+        finally:
+            server.stop()
+
+    server.serve(ping_app(), port=port, workers=workers,
+                 on_ready=lambda: threading.Thread(target=client, daemon=True).start(),
+                 on_shutdown=lambda: stopped.append(True))
+    assert stopped == [True]
+    return replies
+
+
+def test_serves_until_stopped():
+    assert serve_and_ping(workers=1) == [f"pong {os.getpid()}"]
+
+
+def test_stop_without_a_server_is_harmless():
+    server.stop()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="forked workers need fork()")
+def test_forked_workers_serve_and_stop():
+    replies = serve_and_ping(workers=2, requests=4)
+    assert len(replies) == 4
+    assert all(reply.startswith("pong ") and reply != f"pong {os.getpid()}" for reply in replies)
+
+
+def test_workers_fall_back_to_one_process_without_fork(monkeypatch, capsys):
+    monkeypatch.delattr(os, "fork", raising=False)
+    assert serve_and_ping(workers=3) == [f"pong {os.getpid()}"]
+    assert "one threaded process" in capsys.readouterr().out
+
+
+def test_worker_count_parsing():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=server.worker_count, default=1)
+    assert parser.parse_args([]).workers == 1
+    assert parser.parse_args(["--workers", "4"]).workers == 4
+    for bad in ("0", "-2", "many"):
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--workers", bad])
+    with pytest.raises(argparse.ArgumentTypeError, match="at least one"):
+        server.worker_count("0")
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from startup import Startup
+
+
+def test_steps_run_concurrently_and_wait_returns_results_in_order():
+    startup = Startup()
+    release = threading.Event()
+    startup.add("slow", lambda: release.wait(2) and "slow")
+    startup.add("fast", lambda value: value, "fast")
+    assert startup.wait("fast") == "fast"
+    assert not startup.done("slow")
+    release.set()
+    assert startup.wait("slow", "fast") == ["slow", "fast"]
+    assert set(startup.timings) == {"slow", "fast"}
+    startup.finish()
+
+
+def test_a_failed_step_returns_none_and_the_rest_still_finish():
+    startup = Startup()
+
+    def broken():
+        raise RuntimeError("no microphone")
+
+    startup.add("microphone", broken)
+    startup.add("gallery", lambda: 3)
+    assert startup.wait("microphone", "gallery") == [None, 3]
+    assert "microphone" in startup.timings
+    startup.finish()
+
+
+def test_run_stays_on_the_calling_thread_while_added_steps_continue():
+    startup = Startup()
+    release = threading.Event()
+    startup.add("gallery", lambda: release.wait(2))
+    threads = []
+    startup.run("tts", lambda: threads.append(threading.current_thread()) or "engine")
+    assert threads == [threading.current_thread()]
+    assert startup.done("tts") and not startup.done("gallery")
+    assert startup.wait("tts") == "engine"
+    release.set()
+    assert startup.wait("gallery") is True
+    startup.finish()
+
+
+def test_run_failure_is_reported_by_wait():
+    startup = Startup()
+
+    def broken():
+        raise OSError("no TTS driver")
+
+    startup.run("tts", broken)
+    assert startup.done("tts")
+    assert startup.wait("tts") is None
+    startup.finish()
+
+
+def test_marks_are_measured_from_start():
+    startup = Startup()
+    time.sleep(0.01)
+    startup.mark("first_listen")
+    assert startup.marks["first_listen"] >= 0.01
+    startup.finish()
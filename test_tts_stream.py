@@ -0,0 +1,80 @@
+import threading
+import time
+
+from tts_stream import speak_pipelined, split_sentences
+
+
+def test_split_sentences():
+    text = "Here are the top results: one. Two!  Three?\nFour"
+    assert split_sentences(text) == ["Here are the top results:", "one.", "Two!", "Three?", "Four"]
+
+
+def test_long_sentences_split_at_clauses():
+    text = ", ".join(["word " * 5] * 6)
+    chunks = split_sentences(text, max_chars=40)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 40 for chunk in chunks)
+
+
+def test_synthesis_overlaps_playback():
+    """Time to first audio depends on the first chunk, not the whole text"""
+    played = []
+    cleaned = []
+
+    def synthesize(chunk):
+        time.sleep(0.05)
+        return chunk
+
+    def play(audio):
+        time.sleep(0.05)
+        played.append(audio)
+
+    text = " ".join(f"Sentence {i}." for i in range(6))
+    stats = speak_pipelined(text, synthesize, play, cleanup=cleaned.append)
+
+    assert played == [f"Sentence {i}." for i in range(6)]
+    assert cleaned == played
+    assert stats["time_to_first_audio"] < 0.1
+    # Serial synthesis + playback would take 0.6s
+    assert stats["total"] < 0.5
+
+
+def test_cancel_flushes_remaining_chunks():
+    cancel = threading.Event()
+    played = []
+    cleaned = []
+
+    def play(audio):
+        played.append(audio)
+        cancel.set()
+
+    stats = speak_pipelined("One. Two. Three. Four.", lambda c: c, play,
+                            cleanup=cleaned.append, cancel=cancel)
+
+    assert played == ["One."]
+    assert stats["played"] == 1
+    # Everything synthesized ahead is still cleaned up
+    assert cleaned[0] == "One."
+
+
+def test_playback_failure_cleans_up_synthesized_chunks():
+    synthesized = []
+    cleaned = []
+
+    def synthesize(chunk):
+        synthesized.append(chunk)
+        return chunk
+
+    def play(audio):
+        time.sleep(0.05)    # Let the producer fill the queue and block
+        raise OSError("output device lost")
+
+    text = " ".join(f"Sentence {i}." for i in range(6))
+    try:
+        speak_pipelined(text, synthesize, play, cleanup=cleaned.append)
+    except OSError:
+        pass
+    else:
+        assert False, "expected the playback error"
+    assert len(synthesized) < 6
+    assert sorted(cleaned) == sorted(synthesized)
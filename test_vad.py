@@ -0,0 +1,38 @@
+import numpy as np
+
+from vad import EnergyVAD, frame_rms, to_samples
+
+
+def tone(amplitude, count=320):
+    return (np.sin(np.arange(count) / 3.0) * amplitude).astype(np.int16)
+
+
+def test_loud_frames_are_speech_and_quiet_ones_are_not():
+    vad = EnergyVAD()
+    assert not vad.is_speech(tone(50).tobytes())
+    assert vad.is_speech(tone(8000).tobytes())
+
+
+def test_noise_floor_follows_quiet_frames():
+    vad = EnergyVAD(threshold=100)
+    for _ in range(200):
+        assert not vad.is_speech(tone(400))
+    # Loud for an empty room, but only ~1.5x this room's noise
+    assert not vad.is_speech(tone(600))
+    assert vad.is_speech(tone(4000))
+
+
+def test_sample_widths_share_one_scale():
+    wave = np.sin(np.arange(320) / 3.0)
+    as16 = (wave * 16000).astype(np.int16).tobytes()
+    as32 = (wave * 16000 * 65536).astype(np.int32).tobytes()
+    as8 = (wave * 62 + 128).astype(np.uint8).tobytes()
+    rms16 = frame_rms(to_samples(as16, 2))
+    assert abs(frame_rms(to_samples(as32, 4)) - rms16) / rms16 < 0.01
+    assert abs(frame_rms(to_samples(as8, 1)) - rms16) / rms16 < 0.05
+
+
+def test_unsigned_8_bit_silence_is_silent():
+    silence = bytes([128]) * 320
+    assert frame_rms(to_samples(silence, 1)) == 0.0
+    assert not EnergyVAD().is_speech(silence, sample_width=1)
@@ -0,0 +1,145 @@
+import sys
+import threading
+import time
+
+import numpy as np
+
+import barge_in
+import wake_word
+from wake_word import HOP_LEN, SAMPLE_RATE, WakeWordDetector, WakeWordGate
+
+
+def chirp(start_hz, end_hz, seconds=0.6):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    sweep = start_hz + (end_hz - start_hz) / (2 * seconds) * t
+    return np.sin(2 * np.pi * sweep * t) * np.hanning(len(t)) * 8000
+
+
+def feed(detector, signal):
+    hits = 0
+    for i in range(0, len(signal) - HOP_LEN + 1, HOP_LEN):
+        hits += detector.process(signal[i:i + HOP_LEN].astype(np.int16).tobytes())
+    return hits
+
+
+def noise(seconds, rng):
+    return rng.normal(0, 100, int(seconds * SAMPLE_RATE))
+
+
+def test_detects_wake_word_in_noise():
+    rng = np.random.default_rng(0)
+    detector = WakeWordDetector([chirp(300, 1200)])
+    signal = np.concatenate([noise(1, rng), chirp(300, 1200) * 0.8 + noise(0.6, rng), noise(1, rng)])
+    assert feed(detector, signal) == 1
+
+
+def test_ignores_other_sounds():
+    rng = np.random.default_rng(1)
+    detector = WakeWordDetector([chirp(300, 1200)])
+    signal = np.concatenate([noise(1, rng), chirp(1500, 500), rng.normal(0, 3000, SAMPLE_RATE // 2),
+                             noise(1, rng)])
+    assert feed(detector, signal) == 0
+
+
+def test_silence_is_not_compared():
+    """No DTW work is done while the room is quiet"""
+    detector = WakeWordDetector([chirp(300, 1200)])
+    feed(detector, noise(3, np.random.default_rng(2)))
+    assert detector.checks == 0
+
+
+class FakeStream:
+    """A microphone that plays signal at roughly real time, then silence"""
+
+    def __init__(self, signal, speedup=10.0):
+        self.frames = [signal[i:i + HOP_LEN].astype(np.int16).tobytes()
+                       for i in range(0, len(signal) - HOP_LEN + 1, HOP_LEN)]
+        self.delay = HOP_LEN / SAMPLE_RATE / speedup
+        self.done = threading.Event()
+
+    def read(self, frames, exception_on_overflow=True):
+        time.sleep(self.delay)
+        if self.frames:
+            return self.frames.pop(0)
+        self.done.set()
+        return bytes(2 * frames)
+
+
+def test_gate_hears_a_wake_word_spoken_across_short_waits():
+    rng = np.random.default_rng(3)
+    signal = np.concatenate([noise(0.5, rng), chirp(300, 1200) * 0.8 + noise(0.6, rng), noise(0.5, rng)])
+    gate = WakeWordGate(WakeWordDetector([chirp(300, 1200)]), stream=FakeStream(signal, speedup=2.0))
+    try:
+        # Slices far shorter than the word; audio between them stays buffered
+        waits = 0
+        while not gate.wait(timeout=0.02):
+            waits += 1
+            assert waits < 500
+        assert waits > 10
+    finally:
+        gate.close()
+
+
+def test_gate_ignores_audio_heard_while_paused():
+    rng = np.random.default_rng(4)
+    word = chirp(300, 1200) * 0.8 + noise(0.6, rng)
+    stream = FakeStream(np.concatenate([noise(0.3, rng), word, noise(0.3, rng), word, noise(0.3, rng)]))
+    gate = WakeWordGate(WakeWordDetector([chirp(300, 1200)]), stream=stream)
+    try:
+        assert gate.wait(timeout=5.0)
+        # The second word plays while the command would be captured
+        assert stream.done.wait(5.0)
+        assert not gate.wait(timeout=0.2)
+    finally:
+        gate.close()
+
+
+
+class DetectsAt:
+    """Detector stand-in that hears the wake word in the given frame"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.seen = 0
+
+    def process(self, frame):
+        self.seen += 1
+        return self.seen == self.frame
+
+    def reset(self):
+        pass
+
+
+def test_audio_after_the_wake_word_goes_to_the_next_listen():
+    rng = np.random.default_rng(5)
+    command = (np.sin(np.arange(int(0.5 * SAMPLE_RATE)) / 2.0) * 6000).astype(np.int16)
+    stream = FakeStream(np.concatenate([noise(0.5, rng), command, np.zeros(SAMPLE_RATE // 10)]))
+    gate = WakeWordGate(DetectsAt(int(0.5 * SAMPLE_RATE / HOP_LEN)), stream=stream)
+    try:
+        assert gate.wait(timeout=5.0)
+        assert stream.done.wait(5.0)
+        pcm = barge_in.take_pending()
+        # Every frame after the detection, including those read while nobody was waiting
+        assert pcm.startswith(command.tobytes())
+        assert barge_in.take_pending() is None
+    finally:
+        gate.close()
+
+
+def test_silence_after_the_wake_word_is_not_handed_over():
+    rng = np.random.default_rng(6)
+    stream = FakeStream(noise(0.8, rng))
+    gate = WakeWordGate(DetectsAt(20), stream=stream)
+    try:
+        assert gate.wait(timeout=5.0)
+        assert stream.done.wait(5.0)
+        assert barge_in.take_pending() is None
+    finally:
+        gate.close()
+
+
+def test_no_gate_without_pyaudio(monkeypatch):
+    monkeypatch.setattr(wake_word, "WAKE_WORD_ENABLED", True)
+    monkeypatch.setattr(WakeWordDetector, "from_dir", classmethod(lambda cls: cls([chirp(300, 1200)])))
+    monkeypatch.setitem(sys.modules, "pyaudio", None)
+    assert wake_word.load_gate() is None
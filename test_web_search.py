@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from web_search import LocalProvider, search_first
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_first_answer_wins():
+    """The fastest acceptable provider answers and the rest are cancelled"""
+    fast = LocalProvider("fast", "Paris is the capital of France", latency=0.05)
+    slow = LocalProvider("slow", "Paris", latency=2.0)
+
+    start = time.perf_counter()
+    result = run(search_first("capital of france", [slow, fast]))
+    elapsed = time.perf_counter() - start
+
+    assert result.provider == "fast"
+    assert result.answer == "Paris is the capital of France"
+    assert elapsed < 1.0
+    assert slow.cancelled
+
+
+def test_unacceptable_answers_are_skipped():
+    """Empty answers don't win even when they arrive first"""
+    empty = LocalProvider("empty", "", latency=0.01)
+    good = LocalProvider("good", "Forty two", latency=0.1)
+
+    result = run(search_first("meaning of life", [empty, good]))
+
+    assert result.provider == "good"
+
+
+def test_provider_deadline():
+    """A provider slower than its own deadline is dropped"""
+    late = LocalProvider("late", "Too late", latency=1.0, timeout=0.05)
+    ok = LocalProvider("ok", "On time", latency=0.2)
+
+    result = run(search_first("query", [late, ok]))
+
+    assert result.provider == "ok"
+    assert late.cancelled
+
+
+def test_failing_provider():
+    """A provider error doesn't abort the search"""
+    broken = LocalProvider("broken", None, latency=0.0, error=RuntimeError("boom"))
+    ok = LocalProvider("ok", "Still here", latency=0.05)
+
+    result = run(search_first("query", [broken, ok]))
+
+    assert result.provider == "ok"
+
+
+def test_overall_timeout():
+    """Nothing acceptable before the overall deadline returns None"""
+    slow = LocalProvider("slow", "Eventually", latency=1.0)
+
+    start = time.perf_counter()
+    result = run(search_first("query", [slow], timeout=0.1))
+
+    assert result is None
+    assert time.perf_counter() - start < 0.5
+    assert slow.cancelled
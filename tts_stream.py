@@ -0,0 +1,96 @@
+import queue
+import re
+import threading
+import time
+
+MAX_CHUNK_CHARS = 120   # Longer sentences are split again at clause boundaries
+PREFETCH_CHUNKS = 2     # Chunks synthesized ahead of playback
+
+_SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+|\n+')
+_CLAUSE_END = re.compile(r'(?<=,)\s+')
+
+
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into sentence (or clause) sized chunks for synthesis"""
+    chunks = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        # Pack clauses back together up to max_chars
+        current = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def speak_pipelined(text, synthesize, play, cleanup=None, cancel=None):
+    """Speak text chunk by chunk, synthesizing chunk N+1 while chunk N plays.
+
+    synthesize(chunk) returns something play() accepts; cleanup(audio), if
+    given, is called on every synthesized chunk once it is no longer needed.
+    Setting the cancel event stops playback after the current chunk and drops
+    anything already synthesized. Returns timing stats.
+    """
+    start = time.perf_counter()
+    chunks = split_sentences(text)
+    ready = queue.Queue(maxsize=PREFETCH_CHUNKS)
+    stop = cancel or threading.Event()
+    stats = {"chunks": len(chunks), "played": 0, "time_to_first_audio": None, "total": None}
+
+    failed = threading.Event()  # Playback raised; stop without reporting a barge-in
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if stop.is_set() or failed.is_set():
+                    break
+                ready.put(synthesize(chunk))
+        except Exception as e:
+            print(f"Error in speech synthesis: {str(e)}")
+        finally:
+            ready.put(None)
+
+    producer = threading.Thread(target=produce, name="tts-synth", daemon=True)
+    producer.start()
+
+    finished = False
+    try:
+        while True:
+            audio = ready.get()
+            if audio is None:
+                finished = True
+                break
+            try:
+                if not stop.is_set():
+                    if stats["time_to_first_audio"] is None:
+                        stats["time_to_first_audio"] = time.perf_counter() - start
+                        print(f"Time to first audio: {stats['time_to_first_audio'] * 1000:.0f} ms")
+                    play(audio)
+                    stats["played"] += 1
+            finally:
+                if cleanup:
+                    cleanup(audio)
+    finally:
+        if not finished:
+            # Unblock the producer and release everything it already synthesized
+            failed.set()
+            while True:
+                audio = ready.get()
+                if audio is None:
+                    break
+                if cleanup:
+                    cleanup(audio)
+        producer.join()
+
+    stats["total"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,44 @@
+import numpy as np
+
+SPEECH_THRESHOLD = 500   # Minimum RMS (16-bit scale) that can count as speech
+NOISE_RATIO = 3.0        # Speech must be this many times louder than the noise floor
+NOISE_ADAPT = 0.05       # How quickly the noise floor follows quiet frames
+
+
+def to_samples(frame, sample_width=2):
+    """Turn raw little-endian PCM bytes (or an array) into float samples"""
+    if isinstance(frame, np.ndarray):
+        return frame.astype(np.float32)
+    if sample_width == 1:
+        # 8-bit PCM (and WAV) is unsigned, centred on 128
+        samples = np.frombuffer(frame, dtype=np.uint8).astype(np.float32) - 128.0
+        return samples * 256.0
+    dtype = {2: np.int16, 4: np.int32}[sample_width]
+    samples = np.frombuffer(frame, dtype=dtype).astype(np.float32)
+    # Scale everything to the 16-bit range so one threshold fits all widths
+    return samples * (32768.0 / np.iinfo(dtype).max)
+
+
+def frame_rms(samples):
+    if len(samples) == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(samples))))
+
+
+class EnergyVAD:
+    """Energy-based voice activity detector with an adaptive noise floor"""
+
+    def __init__(self, threshold=SPEECH_THRESHOLD, ratio=NOISE_RATIO, adapt=NOISE_ADAPT):
+        self.threshold = threshold
+        self.ratio = ratio
+        self.adapt = adapt
+        self.noise_floor = None
+
+    def is_speech(self, frame, sample_width=2):
+        rms = frame_rms(to_samples(frame, sample_width))
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        speech = rms > max(self.threshold, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor += self.adapt * (rms - self.noise_floor)
+        return speech
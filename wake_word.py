@@ -0,0 +1,324 @@
+"""Local wake-word gate: MFCC template matching in NumPy.
+
+Record a few examples of the wake word with:  python wake_word.py record
+then turn the gate on with:  WAKE_WORD=1 python app.py
+Every microphone frame is turned into MFCCs and compared to the recorded
+templates with DTW; only audio after a match is sent to the recognizer.
+"""
+import collections
+import os
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+import barge_in
+from vad import EnergyVAD, SPEECH_THRESHOLD, frame_rms, to_samples
+
+WAKE_WORD_ENABLED = os.environ.get("WAKE_WORD", "0") not in ("", "0")
+WAKE_WORD_DIR = "wake_word"   # WAV recordings of the wake word
+WAKE_THRESHOLD = 2.5          # Maximum normalised DTW distance for a match
+SAMPLE_RATE = 16000
+FRAME_LEN = 400               # 25 ms analysis window
+HOP_LEN = 160                 # 10 ms hop, also the size of a fed audio frame
+NUM_FFT = 512
+NUM_MELS = 26
+NUM_CEPS = 13
+CHECK_EVERY = 5               # Hops between DTW checks (50 ms)
+BUFFER_SECONDS = 3.0          # Microphone audio kept for the detector between waits
+COMMAND_SECONDS = barge_in.MAX_CAPTURE   # Audio after the wake word kept for the next listen()
+
+
+def _mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _hz(mel):
+    return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+
+class Mfcc:
+    """Precomputed window, mel filterbank and DCT for fast MFCC frames"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.window = np.hamming(FRAME_LEN).astype(np.float32)
+
+        points = _hz(np.linspace(_mel(0), _mel(sample_rate / 2), NUM_MELS + 2))
+        bins = np.floor((NUM_FFT + 1) * points / sample_rate).astype(int)
+        self.filterbank = np.zeros((NUM_MELS, NUM_FFT // 2 + 1), dtype=np.float32)
+        for m in range(1, NUM_MELS + 1):
+            left, centre, right = bins[m - 1], bins[m], bins[m + 1]
+            for k in range(left, centre):
+                self.filterbank[m - 1, k] = (k - left) / max(centre - left, 1)
+            for k in range(centre, right):
+                self.filterbank[m - 1, k] = (right - k) / max(right - centre, 1)
+
+        n = np.arange(NUM_MELS)
+        self.dct = np.cos(np.pi / NUM_MELS * (n[None, :] + 0.5) * np.arange(NUM_CEPS)[:, None]).astype(np.float32)
+
+    def frames(self, samples):
+        """MFCCs for every full frame in samples, shape (frames, NUM_CEPS)"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) < FRAME_LEN:
+            return np.zeros((0, NUM_CEPS), dtype=np.float32)
+        emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])
+        count = 1 + (len(emphasized) - FRAME_LEN) // HOP_LEN
+        idx = np.arange(FRAME_LEN)[None, :] + HOP_LEN * np.arange(count)[:, None]
+        spectrum = np.abs(np.fft.rfft(emphasized[idx] * self.window, NUM_FFT)) ** 2
+        energies = np.log(spectrum @ self.filterbank.T + 1e-6)
+        return energies @ self.dct.T
+
+
+def normalize(features):
+    """Cepstral mean and variance normalisation"""
+    return (features - features.mean(axis=0)) / (features.std(axis=0) + 1e-6)
+
+
+def dtw_distance(template, window):
+    """Subsequence DTW: best match of template anywhere in window, per template frame.
+
+    Steps advance one template frame while moving 0, 1 or 2 window frames,
+    which keeps each row a vectorised NumPy operation.
+    """
+    cost = np.sqrt(((template[:, None, :] - window[None, :, :]) ** 2).sum(axis=2))
+    acc = cost[0].copy()
+    for i in range(1, len(template)):
+        prev = acc.copy()
+        prev[1:] = np.minimum(prev[1:], acc[:-1])
+        prev[2:] = np.minimum(prev[2:], acc[:-2])
+        acc = cost[i] + prev
+    return float(acc.min()) / len(template)
+
+
+def read_wav(path):
+    """Mono 16-bit samples from a WAV file"""
+    with wave.open(path, "rb") as wav:
+        data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if wav.getnchannels() > 1:
+            data = data.reshape(-1, wav.getnchannels()).mean(axis=1)
+        return data.astype(np.float32), wav.getframerate()
+
+
+class WakeWordDetector:
+    """Feed it 10 ms frames; process() returns True when the wake word was heard"""
+
+    def __init__(self, templates, threshold=WAKE_THRESHOLD):
+        self.mfcc = Mfcc()
+        self.templates = [normalize(self.mfcc.frames(t)) for t in templates]
+        self.templates = [t for t in self.templates if len(t)]
+        if not self.templates:
+            raise ValueError("No usable wake word templates")
+        self.threshold = threshold
+        self.window_frames = int(max(len(t) for t in self.templates) * 1.3)
+        self.vad = EnergyVAD()
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._features = np.zeros((0, NUM_CEPS), dtype=np.float32)
+        self._speech_hops = 0
+        self._hops = 0
+        self.checks = 0
+
+    @classmethod
+    def from_dir(cls, directory=WAKE_WORD_DIR, threshold=WAKE_THRESHOLD):
+        templates = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".wav"):
+                samples, rate = read_wav(os.path.join(directory, name))
+                if rate != SAMPLE_RATE:
+                    raise ValueError(f"{name} must be recorded at {SAMPLE_RATE} Hz")
+                templates.append(samples)
+        return cls(templates, threshold)
+
+    def reset(self):
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._features = np.zeros((0, NUM_CEPS), dtype=np.float32)
+        self._speech_hops = 0
+
+    def process(self, frame):
+        """Add one frame of 16-bit PCM (bytes or array)"""
+        samples = np.frombuffer(frame, dtype=np.int16) if isinstance(frame, bytes) else frame
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.vad.is_speech(samples):
+            self._speech_hops = self.window_frames
+        elif self._speech_hops:
+            self._speech_hops -= 1
+
+        # Keep only the tail needed for the next analysis frames
+        self._audio = np.concatenate([self._audio, samples])
+        new = self.mfcc.frames(self._audio)
+        if len(new):
+            self._audio = self._audio[len(new) * HOP_LEN:]
+            self._features = np.concatenate([self._features, new])[-self.window_frames:]
+        self._hops += 1
+
+        # Only compare while there has been recent speech energy
+        if not self._speech_hops or self._hops % CHECK_EVERY:
+            return False
+        if len(self._features) < min(len(t) for t in self.templates):
+            return False
+        self.checks += 1
+        window = normalize(self._features)
+        best = min(dtw_distance(t, window) for t in self.templates)
+        if best <= self.threshold:
+            print(f"Wake word detected (distance {best:.2f})")
+            self.reset()
+            return True
+        return False
+
+
+class WakeWordGate:
+    """Blocks until the wake word is heard on the microphone.
+
+    The microphone stays open between wait() calls: a reader thread keeps
+    filling a ring buffer, so a wake word spoken across two short waits is
+    still heard. After a detection the detector is paused until the next
+    wait(), so the command and the reply aren't fed back into it; instead the
+    audio after the wake word is recorded and handed to the next listen()
+    (see barge_in.listen), so a command spoken straight away isn't clipped
+    while the recognizer opens its own microphone.
+    """
+
+    def __init__(self, detector, stream=None, buffer_seconds=BUFFER_SECONDS):
+        self.detector = detector
+        self._stream = stream       # Anything with read(frames, exception_on_overflow=False)
+        self._audio = None
+        self._frames = collections.deque(maxlen=int(buffer_seconds * SAMPLE_RATE / HOP_LEN))
+        self._ready = threading.Condition()
+        self._reader = None
+        self._armed = True
+        self._command = None        # Frames since the last detection, until listen() takes them
+        self._closed = False
+
+    def start(self):
+        """Open the microphone (once) and start buffering it"""
+        if self._reader is not None:
+            return
+        if self._stream is None:
+            import pyaudio
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(format=pyaudio.paInt16, channels=1, rate=SAMPLE_RATE,
+                                            input=True, frames_per_buffer=HOP_LEN)
+        self._reader = threading.Thread(target=self._read, name="wake-word-mic", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while not self._closed:
+            try:
+                frame = self._stream.read(HOP_LEN, exception_on_overflow=False)
+            except Exception as e:
+                print(f"Wake word microphone stopped: {str(e)}")
+                break
+            with self._ready:
+                if self._armed:
+                    self._frames.append(frame)
+                    self._ready.notify()
+                elif self._command is not None:
+                    self._command.append(frame)
+
+    def wait(self, timeout=None):
+        """Returns True on detection, False if timeout seconds pass first"""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._ready:
+            if not self._armed:
+                # Audio from the command and reply was dropped while paused
+                self._armed = True
+                self._command = None
+                self.detector.reset()
+        while True:
+            with self._ready:
+                while not self._frames:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    if not self._reader.is_alive():
+                        # The microphone is gone; don't let callers spin
+                        self._ready.wait(remaining if remaining is not None else 0.5)
+                        return False
+                    self._ready.wait(remaining if remaining is not None else 0.5)
+                frames = list(self._frames)
+                self._frames.clear()
+            for i, frame in enumerate(frames):
+                if self.detector.process(frame):
+                    with self._ready:
+                        self._armed = False
+                        self._command = collections.deque(
+                            frames[i + 1:] + list(self._frames),
+                            maxlen=int(COMMAND_SECONDS * SAMPLE_RATE / HOP_LEN))
+                        self._frames.clear()
+                    barge_in.set_pending(self._take_command)
+                    return True
+
+    def _take_command(self):
+        """The audio recorded since the wake word, or None if nobody has spoken yet;
+        recording stops once it's taken"""
+        with self._ready:
+            frames, self._command = self._command, None
+        if not frames or not any(frame_rms(to_samples(frame)) > SPEECH_THRESHOLD for frame in frames):
+            # Only silence so far: let listen() wait for the command as usual
+            return None
+        return b"".join(frames)
+
+    def close(self):
+        self._closed = True
+        if self._reader is not None:
+            self._reader.join(timeout=1.0)
+        if self._audio is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            finally:
+                self._audio.terminate()
+
+
+def load_gate():
+    """The configured gate with its microphone open, or None if the wake word is
+    disabled, not recorded, or pyaudio/the microphone isn't available"""
+    if not WAKE_WORD_ENABLED:
+        return None
+    try:
+        gate = WakeWordGate(WakeWordDetector.from_dir())
+        gate.start()
+        return gate
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Wake word disabled: {str(e)}")
+        return None
+
+
+def record_templates(count=3, seconds=1.5):
+    """Record wake word examples into WAKE_WORD_DIR"""
+    import pyaudio
+    os.makedirs(WAKE_WORD_DIR, exist_ok=True)
+    audio = pyaudio.PyAudio()
+    try:
+        for i in range(count):
+            input(f"Press Enter and say the wake word ({i + 1}/{count})...")
+            stream = audio.open(format=pyaudio.paInt16, channels=1, rate=SAMPLE_RATE,
+                                input=True, frames_per_buffer=HOP_LEN)
+            data = stream.read(int(SAMPLE_RATE * seconds), exception_on_overflow=False)
+            stream.stop_stream()
+            stream.close()
+            samples = np.frombuffer(data, dtype=np.int16)
+            # Trim the silence around the word so templates line up
+            vad = EnergyVAD()
+            voiced = [j for j in range(0, len(samples) - HOP_LEN, HOP_LEN)
+                      if vad.is_speech(samples[j:j + HOP_LEN])]
+            if voiced:
+                samples = samples[max(0, voiced[0] - 2 * HOP_LEN):voiced[-1] + 3 * HOP_LEN]
+            path = os.path.join(WAKE_WORD_DIR, f"template_{int(time.time())}_{i}.wav")
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(SAMPLE_RATE)
+                wav.writeframes(samples.tobytes())
+            print(f"Saved {path}")
+    finally:
+        audio.terminate()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "record":
+        record_templates()
+    else:
+        print("Usage: python wake_word.py record")
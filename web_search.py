@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import namedtuple
+
+import httpx
+from bs4 import BeautifulSoup
+
+# Providers queried by default, in order of preference when answers tie
+SEARCH_PROVIDERS = ["duckduckgo", "wikipedia", "google"]
+PROVIDER_TIMEOUT = 3.0   # Per-provider deadline in seconds
+SEARCH_TIMEOUT = 4.0     # Overall deadline for a search
+MIN_ANSWER_LENGTH = 3    # Shorter answers are treated as empty
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+SearchResult = namedtuple("SearchResult", ["provider", "answer", "elapsed"])
+
+
+class DuckDuckGoProvider:
+    """Instant answers from the DuckDuckGo API"""
+    name = "duckduckgo"
+
+    def __init__(self, timeout=PROVIDER_TIMEOUT):
+        self.timeout = timeout
+
+    async def search(self, client, query):
+        response = await client.get("https://api.duckduckgo.com/",
+                                    params={"q": query, "format": "json", "no_html": 1})
+        data = response.json()
+        return data.get("Answer") or data.get("AbstractText") or None
+
+
+class WikipediaProvider:
+    """First matching snippet from the Wikipedia search API"""
+    name = "wikipedia"
+
+    def __init__(self, timeout=PROVIDER_TIMEOUT):
+        self.timeout = timeout
+
+    async def search(self, client, query):
+        response = await client.get("https://en.wikipedia.org/w/api.php",
+                                    params={"action": "query", "list": "search", "srsearch": query,
+                                            "srlimit": 1, "format": "json"})
+        hits = response.json().get("query", {}).get("search", [])
+        if not hits:
+            return None
+        return BeautifulSoup(hits[0]["snippet"], "html.parser").get_text()
+
+
+class GoogleProvider:
+    """Scrape the text snippets from a Google results page"""
+    name = "google"
+
+    def __init__(self, timeout=PROVIDER_TIMEOUT):
+        self.timeout = timeout
+
+    async def search(self, client, query):
+        response = await client.get("https://www.google.com/search", params={"q": query})
+        soup = BeautifulSoup(response.text, "html.parser")
+        results = [g.text for g in soup.find_all('div', class_='BNeawe s3v9rd AP7Wnd')]
+        return " ".join(results[:3]) if results else None
+
+
+class LocalProvider:
+    """Offline stand-in that answers after an injectable latency"""
+
+    def __init__(self, name, answer, latency=0.0, timeout=PROVIDER_TIMEOUT, error=None):
+        self.name = name
+        self.answer = answer
+        self.latency = latency
+        self.timeout = timeout
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def search(self, client, query):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.answer
+
+
+PROVIDERS = {
+    "duckduckgo": DuckDuckGoProvider,
+    "wikipedia": WikipediaProvider,
+    "google": GoogleProvider,
+}
+
+
+def default_providers():
+    """Build the configured providers"""
+    return [PROVIDERS[name]() for name in SEARCH_PROVIDERS if name in PROVIDERS]
+
+
+def is_acceptable(answer):
+    """Reject empty or trivially short answers"""
+    return bool(answer) and len(answer.strip()) >= MIN_ANSWER_LENGTH
+
+
+async def _query_provider(provider, client, query):
+    try:
+        return await asyncio.wait_for(provider.search(client, query), provider.timeout)
+    except asyncio.TimeoutError:
+        print(f"Search provider {provider.name} timed out")
+    except Exception as e:
+        print(f"Error in {provider.name} search: {str(e)}")
+    return None
+
+
+async def search_first(query, providers=None, timeout=SEARCH_TIMEOUT, accept=is_acceptable):
+    """Query all providers concurrently and return the first acceptable answer.
+
+    Slower providers are cancelled as soon as an answer is accepted. Returns
+    None if nothing acceptable arrives before the overall timeout.
+    """
+    if providers is None:
+        providers = default_providers()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async with httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, follow_redirects=True) as client:
+        tasks = {asyncio.ensure_future(_query_provider(p, client, query)): p for p in providers}
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = start + timeout - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                # Prefer providers listed earlier when several finish together
+                for task in sorted(done, key=lambda t: providers.index(tasks[t])):
+                    answer = task.result()
+                    if accept(answer):
+                        return SearchResult(tasks[task].name, answer.strip(), loop.time() - start)
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def first_answer(query, providers=None, timeout=SEARCH_TIMEOUT):
+    """Blocking wrapper around search_first for the voice thread"""
+    start = time.perf_counter()
+    result = asyncio.run(search_first(query, providers, timeout))
+    if result:
+        print(f"Search answer from {result.provider} in {result.elapsed:.2f}s")
+    else:
+        print(f"No search answer after {time.perf_counter() - start:.2f}s")
+    return result